@@ -0,0 +1,143 @@
+"""Memory and throughput of the node classes while parsing a large corpus.
+
+Runs the parser twice in fresh interpreters: once with the compact
+__slots__ node classes and once with dict-backed copies of them patched in,
+then prints peak RSS, traced peak, live allocations and parse throughput
+for both.
+
+    python3 bench/bench_nodes.py --pages 2000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from corpus import CorpusConfig, generate_pages
+
+
+def dict_backed(cls, base, init):
+    # A copy of `cls` without __slots__, so attributes live in a __dict__.
+    # Its methods are shared; __init__ is replaced because the originals
+    # call super() and are bound to the slotted class.
+    slots = ("__slots__", *cls.__slots__)
+    namespace = {key: value for key, value in vars(cls).items() if key not in slots}
+    namespace["__init__"] = init
+    return type(cls.__name__, (base,), namespace)
+
+
+def use_dict_nodes() -> None:
+    # Swap in the node classes as they were before __slots__: attributes in a
+    # __dict__, props kept as passed (even when empty) and a children list
+    # shared by every ParentNode created without one.
+    import block_parser
+    import htmlnode
+    import inline_parser
+    import parser
+    import textnode
+
+    def node_init(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+    def leaf_init(self, tag=None, value=None, props=None):
+        node_init(self, tag=tag, value=value, props=props)
+
+    def parent_init(self, tag, children=[], props=None):
+        node_init(self, tag=tag, children=children, props=props)
+
+    def text_init(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+    html_node = dict_backed(htmlnode.HTMLNode, object, node_init)
+    classes = {
+        "HTMLNode": html_node,
+        "LeafNode": dict_backed(htmlnode.LeafNode, html_node, leaf_init),
+        "ParentNode": dict_backed(htmlnode.ParentNode, html_node, parent_init),
+        "TextNode": dict_backed(textnode.TextNode, object, text_init),
+    }
+    for module in (htmlnode, textnode, inline_parser, parser, block_parser):
+        for name, cls in classes.items():
+            if hasattr(module, name):
+                setattr(module, name, cls)
+
+
+def measure(mode: str, pages: int, seed: int) -> dict:
+    from parser import markdown_to_html_node
+
+    if mode == "dict":
+        use_dict_nodes()
+    corpus = generate_pages(CorpusConfig(pages=pages, seed=seed))
+    size = sum(len(page) for page in corpus)
+
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    trees = [markdown_to_html_node(page) for page in corpus]
+    elapsed = time.perf_counter() - start
+    live_blocks = sys.getallocatedblocks() - blocks_before
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    del trees
+
+    tracemalloc.start()
+    trees = [markdown_to_html_node(page) for page in corpus]
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "pages": len(trees),
+        "input_bytes": size,
+        "seconds": round(elapsed, 4),
+        "mb_per_second": round(size / elapsed / 1e6, 3),
+        "traced_peak_bytes": traced_peak,
+        "live_blocks": live_blocks,
+        "max_rss_kb": max_rss,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=1000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--mode", choices=("slots", "dict"))
+    args = arg_parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.pages, args.seed)))
+        return
+
+    results = {}
+    for mode in ("dict", "slots"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode]
+            + ["--pages", str(args.pages), "--seed", str(args.seed)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output)
+
+    print(f"{'':20}{'dict':>16}{'slots':>16}{'change':>10}")
+    for key in (
+        "mb_per_second",
+        "traced_peak_bytes",
+        "live_blocks",
+        "max_rss_kb",
+    ):
+        old, new = results["dict"][key], results["slots"][key]
+        print(f"{key:20}{old:>16}{new:>16}{(new - old) / old:>+10.1%}")
+
+
+if __name__ == "__main__":
+    main()
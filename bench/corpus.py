@@ -0,0 +1,160 @@
+"""Deterministic synthetic markdown sites for benchmarks.
+
+    python3 bench/corpus.py /tmp/site --pages 1000 --link-density 0.05
+"""
+
+import argparse
+import os
+import random
+from typing import List
+
+WORDS = (
+    "the ring of power was forged in secret by sauron in mount doom while "
+    "elves and dwarves and men of the west held the passes against the dark"
+).split()
+CODE_LINES = [
+    "func main(){",
+    '    fmt.Println("Aiya, Ambar!")',
+    "    for i := 0; i < 10; i++ {",
+    "        total += i",
+    "    }",
+    "}",
+]
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+class CorpusConfig:
+    def __init__(
+        self,
+        pages: int = 100,
+        blocks: int = 30,
+        words: int = 60,
+        link_density: float = 0.03,
+        image_density: float = 0.005,
+        list_ratio: float = 0.15,
+        list_length: int = 6,
+        code_ratio: float = 0.1,
+        seed: int = 0,
+    ) -> None:
+        self.pages = pages
+        self.blocks = blocks
+        self.words = words
+        self.link_density = link_density
+        self.image_density = image_density
+        self.list_ratio = list_ratio
+        self.list_length = list_length
+        self.code_ratio = code_ratio
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def make_sentence(rng: random.Random, config: CorpusConfig, count: int) -> str:
+    words = []
+    urls = config.image_density + config.link_density
+    for _ in range(count):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < config.image_density:
+            word = f"![{word}](/images/{word}.png)"
+        elif roll < urls:
+            target = f"/blog/post-{rng.randrange(config.pages)}"
+            word = f"[{word} {rng.choice(WORDS)}]({target})"
+        elif roll < urls + 0.06:
+            word = f"**{word}**"
+        elif roll < urls + 0.1:
+            word = f"_{word}_"
+        elif roll < urls + 0.12:
+            word = f"`{word}`"
+        words.append(word)
+    return " ".join(words)
+
+
+def make_block(rng: random.Random, config: CorpusConfig) -> str:
+    roll = rng.random()
+    if roll < config.code_ratio:
+        lines = rng.randint(2, len(CODE_LINES))
+        return "```\n" + "\n".join(CODE_LINES[:lines]) + "\n```"
+    if roll < config.code_ratio + config.list_ratio:
+        items = [make_sentence(rng, config, 8) for _ in range(config.list_length)]
+        if rng.random() < 0.5:
+            return "\n".join(f"- {item}" for item in items)
+        return "\n".join(f"{idx}. {item}" for idx, item in enumerate(items, 1))
+    if roll < config.code_ratio + config.list_ratio + 0.05:
+        return f"> {make_sentence(rng, config, config.words // 2)}"
+    if roll < config.code_ratio + config.list_ratio + 0.15:
+        return f"{'#' * rng.randint(2, 4)} {make_sentence(rng, config, 6)}"
+    half = config.words // 2
+    return (
+        make_sentence(rng, config, half)
+        + "\n"
+        + make_sentence(rng, config, config.words - half)
+    )
+
+
+def make_page(rng: random.Random, config: CorpusConfig, title: str) -> str:
+    blocks = [f"# {title}"]
+    blocks.extend(make_block(rng, config) for _ in range(config.blocks))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_pages(config: CorpusConfig) -> List[str]:
+    rng = random.Random(config.seed)
+    return [make_page(rng, config, f"Post {idx}") for idx in range(config.pages)]
+
+
+def write_site(root: str, config: CorpusConfig) -> None:
+    content = os.path.join(root, "content")
+    static = os.path.join(root, "static")
+    os.makedirs(os.path.join(static, "images"), exist_ok=True)
+    for idx, page in enumerate(generate_pages(config)):
+        path = os.path.join(content, "blog", f"post-{idx}", "index.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(page)
+    with open(os.path.join(content, "index.md"), "w") as file:
+        file.write("# Home\n\nWelcome to the synthetic site.\n")
+    with open(os.path.join(root, "template.html"), "w") as file:
+        file.write(TEMPLATE)
+    with open(os.path.join(static, "index.css"), "w") as file:
+        file.write("body {\n  margin: 0 auto;\n  max-width: 60em;\n}\n")
+    for word in sorted(set(WORDS)):
+        with open(os.path.join(static, "images", f"{word}.png"), "wb") as file:
+            file.write(random.Random(word).randbytes(2048))
+
+
+def add_config_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    defaults = CorpusConfig()
+    for name, value in defaults.to_dict().items():
+        arg_parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(value), default=value
+        )
+
+
+def config_from_args(args: argparse.Namespace) -> CorpusConfig:
+    return CorpusConfig(
+        **{name: getattr(args, name) for name in CorpusConfig().to_dict()}
+    )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("root")
+    add_config_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    write_site(args.root, config_from_args(args))
+
+
+if __name__ == "__main__":
+    main()
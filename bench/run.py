@@ -0,0 +1,302 @@
+"""Benchmark suite for the parser and the full site build.
+
+    python3 bench/run.py --pages 500 --output bench/results.json
+    python3 bench/run.py --pages 500 --baseline bench/results.json
+
+Every benchmark runs against the same deterministic corpus (see corpus.py),
+keeps the best and median of --repeat runs and is written out as JSON so
+runs from different commits can be compared with --baseline.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Callable, Dict, List, Tuple
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH, "..", "src"))
+
+from corpus import (
+    CorpusConfig,
+    add_config_arguments,
+    config_from_args,
+    generate_pages,
+    write_site,
+)
+from block_parser import BlockType, block_to_block_type, markdown_to_blocks
+from generator import generate_pages_recursively
+from inline_parser import text_to_textnodes
+from manifest import Manifest, file_digest
+from parser import markdown_to_html_node
+
+
+def timed(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {"best": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def inline_texts(pages: List[str]) -> List[str]:
+    texts = []
+    for page in pages:
+        for block in markdown_to_blocks(page):
+            if block_to_block_type(block) == BlockType.PARAGRAPH:
+                texts.append(block.replace("\n", " "))
+    return texts
+
+
+def bench_inline(pages: List[str]) -> Callable[[], None]:
+    texts = inline_texts(pages)
+
+    def run() -> None:
+        for text in texts:
+            text_to_textnodes(text)
+
+    return run
+
+
+def bench_blocks(pages: List[str]) -> Callable[[], None]:
+    def run() -> None:
+        for page in pages:
+            for block in markdown_to_blocks(page):
+                block_to_block_type(block)
+
+    return run
+
+
+def bench_render(pages: List[str]) -> Callable[[], None]:
+    def run() -> None:
+        for page in pages:
+            markdown_to_html_node(page).to_html()
+
+    return run
+
+
+def long_lists(items: int) -> List[str]:
+    numbers = range(1, items + 1)
+    ordered = "\n".join(f"{number}. item **{number}**" for number in numbers)
+    nested = "\n".join(
+        f"- item {number}" if number % 4 else f"- item {number}\n  - nested {number}"
+        for number in range(items)
+    )
+    return [ordered, nested]
+
+
+def bench_lists(items: int) -> Callable[[], None]:
+    pages = long_lists(items)
+
+    def run() -> None:
+        for page in pages:
+            markdown_to_html_node(page).to_html()
+
+    return run
+
+
+def bench_build(root: str, incremental: bool) -> Callable[[], None]:
+    manifest_path = os.path.join(root, ".build", "manifest.json")
+
+    def run() -> None:
+        manifest = Manifest.load(manifest_path) if incremental else None
+        with redirect_stdout(StringIO()):
+            generate_pages_recursively(
+                "/",
+                src_path=os.path.join(root, "content"),
+                dest_path=os.path.join(root, "docs"),
+                template_path=os.path.join(root, "template.html"),
+                manifest=manifest,
+            )
+
+    return run
+
+
+def published_pages(content: str) -> Dict[str, Tuple[str, str]]:
+    pages = {}
+    for dir_path, _, files in os.walk(content):
+        for name in files:
+            path = os.path.join(dir_path, name)
+            url = "/" + os.path.relpath(path, content).replace(os.sep, "/")
+            pages[path] = (file_digest(path), url[: -len(".md")] + ".html")
+    return pages
+
+
+def bench_search(root: str, incremental: bool) -> Callable[[], None]:
+    # Full runs start from an empty index; incremental runs edit one page.
+    # Imported here so the suite still runs on trees without a search index.
+    from search_index import SEARCH_DIR, SearchIndex, update_search_index
+
+    cache = os.path.join(root, ".build", "search.bin")
+    docs = os.path.join(root, "docs")
+    pages = published_pages(os.path.join(root, "content"))
+    edited = sorted(pages)[0]
+    edits = 0
+
+    def run() -> None:
+        nonlocal edits
+        if incremental:
+            edits += 1
+            with open(edited, "a") as file:
+                file.write(f"\n\nEdit number{edits}.\n")
+            pages[edited] = (file_digest(edited), pages[edited][1])
+        else:
+            shutil.rmtree(os.path.join(docs, SEARCH_DIR), ignore_errors=True)
+            if os.path.exists(cache):
+                os.remove(cache)
+        update_search_index(SearchIndex.load(cache), pages, docs, lambda url: url)
+
+    return run
+
+
+def search_index_size(root: str) -> Dict[str, int]:
+    from search_index import SEARCH_DIR
+
+    search_dir = os.path.join(root, "docs", SEARCH_DIR)
+    names = os.listdir(search_dir)
+    return {
+        "files": len(names),
+        "bytes": sum(os.path.getsize(os.path.join(search_dir, n)) for n in names),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(
+    config, repeat: int, list_items: int = 10000, search_pages: int = 10000
+) -> dict:
+    pages = generate_pages(config)
+    input_bytes = sum(len(page.encode()) for page in pages)
+    benchmarks = {
+        "inline": bench_inline(pages),
+        "blocks": bench_blocks(pages),
+        "render": bench_render(pages),
+    }
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = timed(func, repeat)
+
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, config)
+        results["build"] = timed(bench_build(root, incremental=False), repeat)
+        bench_build(root, incremental=True)()
+        results["build_noop"] = timed(bench_build(root, incremental=True), repeat)
+
+    for result in results.values():
+        result["mb_per_second"] = input_bytes / result["best"] / 1e6
+
+    list_bytes = sum(len(page.encode()) for page in long_lists(list_items))
+    results["lists"] = timed(bench_lists(list_items), repeat)
+    results["lists"]["mb_per_second"] = list_bytes / results["lists"]["best"] / 1e6
+
+    search_index = None
+    if search_pages and importlib.util.find_spec("search_index") is None:
+        print("No search index in this tree, skipping the search benchmarks")
+        search_pages = 0
+    if search_pages:
+        search_config = CorpusConfig(**dict(config.to_dict(), pages=search_pages))
+        with tempfile.TemporaryDirectory() as root:
+            write_site(root, search_config)
+            search_bytes = sum(
+                os.path.getsize(path)
+                for path in published_pages(os.path.join(root, "content"))
+            )
+            results["search"] = timed(bench_search(root, incremental=False), repeat)
+            search_index = search_index_size(root)
+            results["search_edit"] = timed(
+                bench_search(root, incremental=True), repeat
+            )
+            for name in ("search", "search_edit"):
+                results[name]["mb_per_second"] = (
+                    search_bytes / results[name]["best"] / 1e6
+                )
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": dict(
+            config.to_dict(), list_items=list_items, search_pages=search_pages
+        ),
+        "input_bytes": input_bytes,
+        "search_index": search_index,
+        "results": results,
+    }
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    header = f"{'benchmark':12}{'best s':>10}{'median s':>10}{'MB/s':>9}"
+    print(header + (f"{'baseline':>10}{'change':>9}" if baseline else ""))
+    for name, result in report["results"].items():
+        line = (
+            f"{name:12}{result['best']:>10.4f}{result['median']:>10.4f}"
+            f"{result['mb_per_second']:>9.2f}"
+        )
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            change = (result["best"] - previous["best"]) / previous["best"]
+            line += f"{previous['best']:>10.4f}{change:>+9.1%}"
+        print(line)
+    search_index = report.get("search_index")
+    if search_index:
+        pages = report["config"]["search_pages"]
+        print(
+            f"search index for {pages} pages: {search_index['files']} files, "
+            f"{search_index['bytes']} bytes"
+        )
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_config_arguments(arg_parser)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--list-items", type=int, default=10000, help="items in the long-list benchmark"
+    )
+    arg_parser.add_argument(
+        "--search-pages",
+        type=int,
+        default=10000,
+        help="pages in the search index corpus (0 to skip)",
+    )
+    arg_parser.add_argument("--output", help="write results as JSON to this file")
+    arg_parser.add_argument("--baseline", help="JSON results to compare against")
+    args = arg_parser.parse_args()
+
+    report = run_suite(
+        config_from_args(args), args.repeat, args.list_items, args.search_pages
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("config") != report["config"]:
+            print("warning: baseline was run with a different corpus config")
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+
+
+if __name__ == "__main__":
+    main()
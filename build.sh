@@ -1 +1 @@
-python3 src/main.py "/static_site_gen/"
+python3 src/client.py "/static_site_gen/" --site-url https://prince2412k2.github.io
@@ -0,0 +1,84 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from block_parser import PARSER_VERSION, BlockType
+from file_handler import atomic_open
+
+
+def block_key(block_type: BlockType, text: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{PARSER_VERSION}\0{block_type.value}\0".encode())
+    digest.update(text.encode())
+    return digest.hexdigest()
+
+
+class BlockCache:
+    def __init__(self, capacity: int = 4096, path: Optional[str] = None) -> None:
+        self.capacity: int = capacity
+        self.path: Optional[str] = path
+        self.entries: OrderedDict[str, str] = OrderedDict()
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key[2:])
+
+    def get(self, key: str) -> Optional[str]:
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+        if self.path:
+            try:
+                with open(self.entry_path(key), "r") as file:
+                    html = file.read()
+            except OSError:
+                pass
+            else:
+                self.disk_hits += 1
+                self.remember(key, html)
+                return html
+        self.misses += 1
+        return None
+
+    def remember(self, key: str, html: str) -> None:
+        self.entries[key] = html
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def put(self, key: str, html: str) -> None:
+        self.remember(key, html)
+        if self.path:
+            path = self.entry_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_open(path, "w") as file:
+                file.write(html)
+
+    def render(
+        self,
+        block_type: BlockType,
+        text: str,
+        render: Callable[[BlockType, str], str],
+    ) -> str:
+        key = block_key(block_type, text)
+        html = self.get(key)
+        if html is None:
+            html = render(block_type, text)
+            self.put(key, html)
+        return html
+
+    def take_counts(self) -> Dict[str, int]:
+        counts = {
+            "cache_hits": self.hits,
+            "cache_disk_hits": self.disk_hits,
+            "cache_misses": self.misses,
+        }
+        self.hits = self.disk_hits = self.misses = 0
+        return counts
+
+    def __len__(self) -> int:
+        return len(self.entries)
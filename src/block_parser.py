@@ -1,12 +1,17 @@
 from enum import Enum
 import re
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from inline_parser import text_to_textnodes
 from textnode import text_node_to_html_node
 
 
+# Bump when the HTML produced for the same markdown changes, so output
+# cached by earlier builds is not reused.
+PARSER_VERSION = "4"
+
+
 class BlockType(Enum):
     PARAGRAPH = "PARAGRAPH"
     HEADING = "HEADING"
@@ -16,8 +21,158 @@ class BlockType(Enum):
     ORDERED_LIST = "ORDERED_LIST"
 
 
+class Block:
+    __slots__ = ("block_type", "lines", "start", "end")
+
+    def __init__(
+        self, block_type: BlockType, lines: List[str], start: int, end: int
+    ) -> None:
+        self.block_type: BlockType = block_type
+        self.lines: List[str] = lines
+        self.start: int = start
+        self.end: int = end
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def __eq__(self, obj):
+        return (
+            self.block_type == obj.block_type
+            and self.lines == obj.lines
+            and self.start == obj.start
+            and self.end == obj.end
+        )
+
+    def __repr__(self) -> str:
+        return f"Block({self.block_type}, lines {self.start}-{self.end}, {self.lines})"
+
+
+ORDERED_MARKER = re.compile(r"(\d{1,9})\.(?:\s|$)")
+
+
+def list_marker(line: str) -> Optional[Tuple[BlockType, int, int]]:
+    # Returns (list type, number, offset of the item text) for a list item line.
+    # A bare marker is an empty item, like "1." for ordered lists.
+    if line.startswith("- ") or line == "-":
+        return BlockType.UNORDERED_LIST, 0, 2
+    match = ORDERED_MARKER.match(line)
+    if match:
+        return BlockType.ORDERED_LIST, int(match.group(1)), match.end()
+    return None
+
+
+class _LineTypes:
+    __slots__ = ("heading", "quote", "list_type", "next_number")
+
+    def __init__(self, first_line: str) -> None:
+        self.heading: bool = first_line.startswith("#")
+        self.quote: bool = True
+        marker = list_marker(first_line)
+        self.list_type: Optional[BlockType] = marker[0] if marker else None
+        self.next_number: int = marker[1] if marker else 0
+
+    def continues_list(self, line: str) -> bool:
+        marker = list_marker(line)
+        return (
+            marker is not None
+            and marker[0] == self.list_type
+            and (marker[0] == BlockType.UNORDERED_LIST or marker[1] == self.next_number)
+        )
+
+    def add(self, line: str) -> None:
+        self.quote = self.quote and line.startswith(">")
+        if self.list_type is None or line[:1].isspace():
+            # Indented lines are nested items or continuations of an item.
+            return
+        if self.continues_list(line):
+            self.next_number += 1
+        else:
+            self.list_type = None
+
+    def block_type(self) -> BlockType:
+        if self.heading:
+            return BlockType.HEADING
+        if self.quote:
+            return BlockType.QUOTE
+        if self.list_type is not None:
+            return self.list_type
+        return BlockType.PARAGRAPH
+
+
+def scan_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    # One pass over the lines: blank lines end a block unless a ``` fence is
+    # open or a list continues after them (a loose list), and the block type
+    # is worked out as each line arrives.
+    block: List[str] = []
+    types = None
+    fenced = False
+    start = 0
+    gap_start = None
+    # After a blank line inside a list, `run` is the index in `block` where
+    # the lines following it begin, `run_line` their line number and
+    # `list_end` the line number the list part ends at.
+    run = run_line = list_end = 0
+    number = -1
+    for number, line in enumerate(lines):
+        line = line.rstrip("\r\n")
+        if fenced:
+            block.append(line)
+            if "```" in line:
+                yield Block(BlockType.CODE, block, start, number + 1)
+                block, fenced = [], False
+            continue
+        if not line.strip():
+            if block and types.list_type is not None:
+                gap_start = number if gap_start is None else gap_start
+            elif block:
+                block[-1] = block[-1].rstrip()
+                yield Block(types.block_type(), block, start, number)
+                block = []
+            continue
+        if gap_start is not None:
+            if line[:1].isspace() or types.continues_list(line):
+                block[-1] = block[-1].rstrip()
+                block.append("")
+                run, run_line, list_end = len(block), number, gap_start
+            else:
+                block[-1] = block[-1].rstrip()
+                yield Block(types.block_type(), block, start, gap_start)
+                block = []
+            gap_start = None
+        if not block:
+            line = line.lstrip()
+            start, run = number, 0
+            if line.startswith("```"):
+                if "```" in line[3:]:
+                    yield Block(BlockType.CODE, [line.rstrip()], start, number + 1)
+                else:
+                    block, fenced = [line], True
+                continue
+            types = _LineTypes(line)
+        list_type = types.list_type
+        types.add(line)
+        block.append(line)
+        if run and list_type is not None and types.list_type is None:
+            # The lines after the last blank line do not belong to the list:
+            # close the list there and type those lines as a block of their own.
+            yield Block(list_type, block[: run - 1], start, list_end)
+            block = block[run:]
+            block[0] = block[0].lstrip()
+            start, run = run_line, 0
+            types = _LineTypes(block[0])
+            for block_line in block:
+                types.add(block_line)
+    if block:
+        block_type = BlockType.CODE if fenced else types.block_type()
+        if not fenced:
+            block[-1] = block[-1].rstrip()
+        end = gap_start if gap_start is not None else number + 1
+        yield Block(block_type, block, start, end)
+
+
 def markdown_to_blocks(markdown: str) -> List[str]:
-    return [block.strip() for block in markdown.split("\n\n")]
+    return [block.text for block in scan_blocks(markdown.split("\n"))]
 
 
 def block_to_block_type(block: str) -> BlockType:
@@ -26,13 +181,7 @@ def block_to_block_type(block: str) -> BlockType:
     if block.startswith("```"):
         return BlockType.CODE
 
-    if all([line.startswith(">") for line in block.split("\n")]):
-        return BlockType.QUOTE
-    if all([line.startswith("- ") for line in block.split("\n")]):
-        return BlockType.UNORDERED_LIST
-    if all(
-        [line.startswith(f"{idx + 1}.") for idx, line in enumerate(block.split("\n"))]
-    ):
-        return BlockType.ORDERED_LIST
-    else:
-        return BlockType.PARAGRAPH
+    types = _LineTypes(block)
+    for line in block.split("\n"):
+        types.add(line)
+    return types.block_type()
@@ -0,0 +1,243 @@
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from compressor import compress_tree
+from file_handler import clear_dir, list_files, remove_file, sync_dir, sync_paths
+from fingerprint import ASSET_MANIFEST, fingerprint_assets, write_asset_manifest
+from generator import (
+    STREAM_THRESHOLD,
+    BuildError,
+    RenderOptions,
+    generate_pages_recursively,
+    regenerate_pages,
+)
+from manifest import Manifest
+from profiler import BuildProfile
+from stats import BuildStats
+from watcher import create_watcher
+
+CACHE_DIR = ".build"
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+BLOCK_CACHE_DIR = os.path.join(CACHE_DIR, "blocks")
+PAGE_CACHE_DIR = os.path.join(CACHE_DIR, "pages")
+SEARCH_CACHE = os.path.join(CACHE_DIR, "search.bin")
+
+
+def is_within(path: str, root: str) -> bool:
+    path, root = os.path.abspath(path), os.path.abspath(root)
+    return path == root or path.startswith(root + os.sep)
+
+
+class Builder:
+    def __init__(
+        self,
+        base_path: str = "/",
+        static: str = "static",
+        public: str = "docs",
+        content: str = "content",
+        template: str = "template.html",
+        manifest_path: str = MANIFEST_PATH,
+        workers: int = 1,
+        checksum: bool = False,
+        publish: str = "auto",
+        quiet: bool = False,
+        profile: bool = False,
+        cache_size: int = 4096,
+        cache_dir: Optional[str] = None,
+        page_cache_dir: Optional[str] = PAGE_CACHE_DIR,
+        gzip_threshold: Optional[int] = None,
+        minify: bool = False,
+        fingerprint: bool = False,
+        stream_threshold: Optional[int] = STREAM_THRESHOLD,
+        listings: bool = True,
+        site_url: str = "",
+        search_cache: Optional[str] = None,
+        check_links: bool = True,
+        trace_memory: bool = False,
+    ) -> None:
+        self.base_path = base_path
+        self.static = static
+        self.public = public
+        self.content = content
+        self.template = template
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self.checksum = checksum
+        self.publish = publish
+        self.gzip_threshold = gzip_threshold
+        self.fingerprint = fingerprint
+        self.options = RenderOptions(
+            quiet=quiet,
+            profile=profile,
+            cache_size=cache_size,
+            cache_dir=cache_dir,
+            page_cache_dir=page_cache_dir,
+            minify=minify,
+            stream_threshold=stream_threshold,
+            listings=listings,
+            site_url=site_url,
+            search_cache=search_cache,
+            check_links=check_links,
+            trace_memory=trace_memory,
+        )
+        self.profile: Optional[BuildProfile] = None
+        self.stats = BuildStats()
+        self.manifest = Manifest.load(manifest_path)
+
+    def build(self, full: bool = False, dry_run: bool = False) -> List[str]:
+        if full and not dry_run:
+            clear_dir(self.public)
+            for cache_dir in (self.options.cache_dir, self.options.page_cache_dir):
+                if cache_dir:
+                    clear_dir(cache_dir)
+            search_cache = self.options.search_cache
+            if search_cache and os.path.exists(search_cache):
+                remove_file(search_cache)
+            self.manifest = Manifest(self.manifest_path)
+
+        names = self.asset_names(dry_run)
+        report = sync_dir(
+            self.static,
+            self.public,
+            checksum=self.checksum,
+            dry_run=dry_run,
+            published=self.manifest.assets,
+            strategy=self.publish,
+            minify=self.options.minify,
+            names=names,
+            minified=self.manifest.minified,
+        )
+        self.stats = BuildStats()
+        self.stats.add(report.minify)
+        if dry_run:
+            for action in report.actions():
+                print(action)
+        print(report)
+        if not dry_run:
+            self.manifest.assets = report.assets
+            self.manifest.minified = report.minified
+            self.write_asset_manifest(names)
+        self.options.assets = names
+
+        self.profile = BuildProfile() if self.options.profile else None
+        try:
+            generated = generate_pages_recursively(
+                self.base_path,
+                src_path=self.content,
+                dest_path=self.public,
+                template_path=self.template,
+                manifest=self.manifest,
+                workers=self.workers,
+                dry_run=dry_run,
+                options=self.options,
+                profile=self.profile,
+                stats=self.stats,
+            )
+        finally:
+            if self.profile is not None:
+                self.profile.finish()
+            if self.stats.lines():
+                print(self.stats)
+        if not dry_run:
+            self.compress()
+        return generated
+
+    def asset_names(self, dry_run: bool = False) -> Optional[Dict[str, str]]:
+        if not self.fingerprint:
+            return None
+        names, entries, hashed = fingerprint_assets(
+            self.static, list_files(self.static), self.manifest.fingerprints
+        )
+        print(f"Fingerprinted {len(names)} assets, {len(hashed)} hashed")
+        if not dry_run:
+            self.manifest.fingerprints = entries
+        return names
+
+    def write_asset_manifest(self, names: Optional[Dict[str, str]]) -> None:
+        path = os.path.join(self.public, ASSET_MANIFEST)
+        if names is not None:
+            write_asset_manifest(path, names)
+        elif os.path.exists(path):
+            remove_file(path)
+
+    def rebuild(self, paths: Iterable[str]) -> List[str]:
+        paths = sorted(paths)
+        template = os.path.abspath(self.template)
+        if any(os.path.abspath(path) == template for path in paths):
+            return self.build()
+
+        assets = [path for path in paths if is_within(path, self.static)]
+        sources = [path for path in paths if is_within(path, self.content)]
+        if assets and self.fingerprint:
+            # A changed asset changes its name, and so every page linking it.
+            return self.build()
+        if assets:
+            report = sync_paths(
+                self.static,
+                self.public,
+                assets,
+                checksum=self.checksum,
+                published=self.manifest.assets,
+                strategy=self.publish,
+                minify=self.options.minify,
+                minified=self.manifest.minified,
+            )
+            self.manifest.assets = report.assets
+            self.manifest.minified = report.minified
+            print(report)
+        if not sources:
+            if assets and self.manifest_path:
+                self.manifest.save()
+            if assets:
+                self.compress()
+            return []
+        self.stats = BuildStats()
+        try:
+            generated = regenerate_pages(
+                self.base_path,
+                sources,
+                src_path=self.content,
+                dest_path=self.public,
+                template_path=self.template,
+                manifest=self.manifest,
+                workers=self.workers,
+                options=self.options,
+                stats=self.stats,
+            )
+        finally:
+            if self.stats.lines():
+                print(self.stats)
+        self.compress()
+        return generated
+
+    def compress(self) -> None:
+        # With --gzip off, only walk the output when an earlier build left
+        # .gz copies in it.
+        if self.gzip_threshold is None and self.manifest.gzip is None:
+            return
+        report = compress_tree(
+            self.public, self.gzip_threshold, keep=self.manifest.assets
+        )
+        print(report)
+        if self.manifest.gzip != self.gzip_threshold:
+            self.manifest.gzip = self.gzip_threshold
+            if self.manifest_path:
+                self.manifest.save()
+
+    def watch(self, polling: bool = False, debounce: float = 0.1) -> None:
+        roots = [self.content, self.static, self.template]
+        with create_watcher(roots, debounce=debounce, polling=polling) as watcher:
+            print(f"Watching {', '.join(roots)} with {type(watcher).__name__}")
+            for changed in watcher.changes():
+                start = time.perf_counter()
+                try:
+                    generated = self.rebuild(changed)
+                except BuildError as e:
+                    print(e)
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                print(
+                    f"Rebuilt {len(generated)} page(s) for {len(changed)} "
+                    f"change(s) in {elapsed:.1f} ms"
+                )
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import BinaryIO, List, Optional, Tuple
+
+# Kept free of the builder's imports: the client is started for every build
+# and only talks to a daemon that already has them loaded.
+SOCKET_PATH = os.path.join(".build", "daemon.sock")
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def read_message(file: BinaryIO) -> Optional[dict]:
+    # One JSON object per line in each direction.
+    line = file.readline()
+    return json.loads(line) if line else None
+
+
+def write_message(file: BinaryIO, message: dict) -> None:
+    file.write(json.dumps(message).encode() + b"\n")
+    file.flush()
+
+
+def request(message: dict, socket_path: str = SOCKET_PATH) -> dict:
+    # Raises OSError when no daemon listens on `socket_path`.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as file:
+            write_message(file, message)
+            response = read_message(file)
+    if response is None:
+        raise ConnectionError("Build daemon closed the connection")
+    return response
+
+
+def parse_args(args=None) -> Tuple[argparse.Namespace, List[str]]:
+    # Anything not listed here is passed on as src/main.py arguments.
+    arg_parser = argparse.ArgumentParser(
+        description="Build the static site through a running build daemon "
+        "(src/main.py --serve), or with src/main.py when none is running",
+        allow_abbrev=False,
+    )
+    arg_parser.add_argument(
+        "--socket",
+        default=SOCKET_PATH,
+        help=f"Unix socket of the daemon (default: {SOCKET_PATH})",
+    )
+    arg_parser.add_argument(
+        "--rebuild",
+        action="append",
+        metavar="PATH",
+        help="only rebuild what depends on PATH (may be repeated)",
+    )
+    arg_parser.add_argument(
+        "--stop", action="store_true", help="stop the daemon and exit"
+    )
+    return arg_parser.parse_known_args(args)
+
+
+def fallback(args: List[str]) -> None:
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, MAIN, *args])
+
+
+def main() -> None:
+    args, forwarded = parse_args()
+    if args.stop:
+        message = {"command": "stop"}
+    else:
+        message = {
+            "command": "build",
+            "args": forwarded,
+            "cwd": os.getcwd(),
+            "paths": [os.path.abspath(path) for path in args.rebuild or []],
+        }
+    try:
+        response = request(message, args.socket)
+    except OSError:
+        if args.stop:
+            sys.exit(f"No build daemon listening on {args.socket}")
+        fallback(forwarded)
+        return
+    if response.get("fallback"):
+        print(f"Building without the daemon: {response['error']}")
+        fallback(forwarded)
+        return
+    print(response.get("output", ""), end="")
+    timings = response.get("timings")
+    if timings:
+        print(
+            f"Daemon build {response['builds']}: {response['generated']} page(s) "
+            f"in {timings['build_ms']:.1f} ms ({timings['request_ms']:.1f} ms "
+            "with the request)"
+        )
+    if not response["ok"]:
+        sys.exit(response["error"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from file_handler import atomic_open
+
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+
+
+def gzip_path(path: str) -> str:
+    return f"{path}.gz"
+
+
+def should_compress(path: str, size: int, threshold: Optional[int]) -> bool:
+    return threshold is not None and path.endswith(COMPRESSIBLE) and size >= threshold
+
+
+def is_compressed(path: str) -> bool:
+    # A .gz sibling carries the mtime of the file it was made from.
+    try:
+        return os.stat(gzip_path(path)).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path: str, level: int = 9) -> Tuple[int, int]:
+    stat = os.stat(path)
+    dest_path = gzip_path(path)
+    with open(path, "rb") as src, atomic_open(dest_path, "wb") as dest:
+        # mtime=0 and no file name keep the output byte-for-byte reproducible.
+        with gzip.GzipFile("", "wb", level, dest, mtime=0) as file:
+            while chunk := src.read(1 << 16):
+                file.write(chunk)
+    os.utime(dest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return stat.st_size, os.path.getsize(dest_path)
+
+
+class CompressReport:
+    def __init__(self) -> None:
+        self.compressed: List[str] = []
+        self.unchanged: List[str] = []
+        self.removed: List[str] = []
+        self.input_bytes: int = 0
+        self.output_bytes: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.output_bytes / self.input_bytes if self.input_bytes else 1.0
+
+    def __str__(self) -> str:
+        summary = (
+            f"Compressed {len(self.compressed)} files, {len(self.unchanged)} up to "
+            f"date, {len(self.removed)} removed"
+        )
+        if self.compressed:
+            summary += (
+                f": {self.input_bytes} -> {self.output_bytes} bytes "
+                f"({self.ratio:.1%} of original)"
+            )
+        return summary
+
+
+def compress_tree(
+    root: str,
+    threshold: Optional[int] = 1024,
+    level: int = 9,
+    workers: Optional[int] = None,
+    keep: Iterable[str] = (),
+) -> CompressReport:
+    # Files in `keep` (relative to root, e.g. published static assets) are
+    # never removed or overwritten, even when they look like a .gz sibling.
+    # A threshold of None compresses nothing and removes every .gz sibling.
+    keep = set(keep)
+    report = CompressReport()
+    stale = []
+    for dir_path, _, names in os.walk(root):
+        files = set(names)
+        for name in sorted(names):
+            path = os.path.join(dir_path, name)
+            rel_path = os.path.relpath(path, root)
+            if name.endswith(".gz"):
+                source = path[: -len(".gz")]
+                if (
+                    rel_path not in keep
+                    and source.endswith(COMPRESSIBLE)
+                    and (
+                        name[: -len(".gz")] not in files
+                        or not should_compress(
+                            source, os.path.getsize(source), threshold
+                        )
+                    )
+                ):
+                    os.remove(path)
+                    report.removed.append(rel_path)
+            elif gzip_path(rel_path) in keep:
+                continue
+            elif should_compress(path, os.path.getsize(path), threshold):
+                if is_compressed(path):
+                    report.unchanged.append(rel_path)
+                else:
+                    stale.append(path)
+
+    # zlib releases the GIL while compressing, so threads scale here.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, (size, compressed) in zip(
+            stale, executor.map(lambda path: compress_file(path, level), stale)
+        ):
+            report.compressed.append(os.path.relpath(path, root))
+            report.input_bytes += size
+            report.output_bytes += compressed
+    return report
@@ -0,0 +1,157 @@
+import os
+import socket
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from typing import Callable, List, Optional, Tuple
+
+from builder import Builder
+from client import read_message, request, write_message
+from generator import BuildError
+from manifest import Manifest
+
+# Options a request may choose itself; every other option has to match the
+# ones the daemon was started with, or the client builds without it.
+PER_REQUEST = ("full", "quiet")
+# Options that only start the daemon, and so never reach it in a request.
+DAEMON_ONLY = ("serve", "socket")
+
+
+class BuildDaemon:
+    # Serves builds over a Unix socket from one long-running process, so the
+    # manifest, asset fingerprints, compiled template and block cache stay
+    # warm between builds and no build pays for interpreter startup or
+    # imports. Requests are handled one at a time.
+    def __init__(
+        self,
+        builder: Builder,
+        socket_path: str,
+        options: dict,
+        parse_args: Callable[[List[str]], object],
+    ) -> None:
+        self.builder: Builder = builder
+        self.socket_path: str = socket_path
+        self.options: dict = options
+        self.parse_args = parse_args
+        self.cwd: str = os.getcwd()
+        self.builds: int = 0
+        self.running: bool = False
+        self.manifest_stamp: Optional[Tuple[int, int]] = self.stamp()
+
+    def stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.builder.manifest_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def mismatch(self, message: dict) -> Optional[str]:
+        # Why the request cannot be served with this daemon's builder.
+        if message.get("cwd", self.cwd) != self.cwd:
+            return f"daemon runs in {self.cwd}"
+        try:
+            # main.py reports the error itself when the client falls back.
+            with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+                options = vars(self.parse_args(message.get("args", [])))
+        except SystemExit:
+            return "invalid arguments"
+        for name, value in options.items():
+            if name in PER_REQUEST or name in DAEMON_ONLY:
+                continue
+            if value != self.options.get(name):
+                return f"daemon runs with different --{name.replace('_', '-')}"
+        return None
+
+    def local_path(self, path: str) -> str:
+        # Manifest entries use the same form of path as the content directory.
+        return path if os.path.isabs(self.builder.content) else os.path.relpath(path)
+
+    def build(self, message: dict) -> dict:
+        reason = self.mismatch(message)
+        if reason is not None:
+            return {"ok": False, "fallback": True, "error": reason}
+        options = vars(self.parse_args(message.get("args", [])))
+        if self.stamp() != self.manifest_stamp:
+            # Another process built the site; start from what it recorded.
+            self.builder.manifest = Manifest.load(self.builder.manifest_path)
+        self.builder.options.quiet = options["quiet"]
+        paths = [self.local_path(path) for path in message.get("paths") or []]
+        output = StringIO()
+        error = None
+        generated: List[str] = []
+        start = time.perf_counter()
+        with redirect_stdout(output):
+            try:
+                if paths and not options["full"]:
+                    generated = self.builder.rebuild(paths)
+                else:
+                    generated = self.builder.build(full=options["full"])
+            except BuildError as e:
+                error = str(e)
+            except Exception as e:
+                # A failed build must not take the daemon down with it.
+                error = f"{type(e).__name__}: {e}"
+        build_ms = (time.perf_counter() - start) * 1000
+        self.builder.options.quiet = self.options["quiet"]
+        self.manifest_stamp = self.stamp()
+        self.builds += 1
+        return {
+            "ok": error is None,
+            "error": error,
+            "output": output.getvalue(),
+            "generated": len(generated),
+            "builds": self.builds,
+            "timings": {"build_ms": build_ms},
+        }
+
+    def handle(self, message: Optional[dict]) -> dict:
+        start = time.perf_counter()
+        command = (message or {}).get("command")
+        if command == "build":
+            response = self.build(message)
+        elif command == "ping":
+            response = {"ok": True, "builds": self.builds}
+        elif command == "stop":
+            self.running = False
+            response = {"ok": True, "output": "Build daemon stopped\n"}
+        else:
+            response = {"ok": False, "error": f"Unknown command {command!r}"}
+        if "timings" in response:
+            response["timings"]["request_ms"] = (time.perf_counter() - start) * 1000
+        return response
+
+    def serve(self) -> None:
+        if os.path.isdir(self.socket_path):
+            raise ValueError(f"Socket path {self.socket_path} is a directory")
+        if os.path.exists(self.socket_path):
+            try:
+                request({"command": "ping"}, self.socket_path)
+            except OSError:
+                os.remove(self.socket_path)
+            else:
+                raise ValueError(
+                    f"A build daemon already listens on {self.socket_path}"
+                )
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(self.socket_path)
+            server.listen()
+            print(f"Build daemon listening on {self.socket_path}")
+            self.running = True
+            try:
+                while self.running:
+                    connection, _ = server.accept()
+                    with connection, connection.makefile("rwb") as file:
+                        try:
+                            message = read_message(file)
+                        except ValueError:
+                            message = None
+                        try:
+                            write_message(file, self.handle(message))
+                        except OSError:
+                            # The client went away; the build still counts.
+                            pass
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.remove(self.socket_path)
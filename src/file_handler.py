@@ -1,5 +1,26 @@
+import errno
 import os
 import shutil
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+from manifest import file_digest
+from minifier import MINIFIER_VERSION, minify_counts, minify_css
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w"):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, mode) as file:
+            yield file
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 def remove_file(path: str):
@@ -17,22 +38,297 @@ def move_dir(src: str, dest: str):
         if os.path.isfile(src_path):
             shutil.copy2(src_path, dest_path)
         else:
-            shutil.copytree(src_path, dest_path)
+            shutil.copytree(src_path, dest_path, dirs_exist_ok=True)
+
+
+def clear_dir(path: str, root: Optional[str] = None):
+    if not os.path.exists(path):
+        return
+    root = path if root is None else root
+    for item in os.listdir(path):
+        new_path = os.path.join(path, item)
+        if os.path.isfile(new_path):
+            remove_file(new_path)
+        else:
+            clear_dir(new_path, root)
+    if path != root:
+        os.rmdir(path)
+
+
+def prune_file(path: str, root: str):
+    if os.path.exists(path):
+        remove_file(path)
+    root = os.path.abspath(root)
+    parent = os.path.dirname(os.path.abspath(path))
+    while parent.startswith(root + os.sep) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
 
 
 def move(source: str, destination: str):
-    def remove_dir(path: str):
-        if not os.path.exists(path):
-            return
-        for item in os.listdir(path):
-            new_path = os.path.join(path, item)
-            if os.path.isfile(new_path):
-                remove_file(new_path)
-            else:
-                remove_dir(new_path)
-        if path != destination:
-            os.rmdir(path)
-
-    remove_dir(destination)
+    clear_dir(destination)
     os.makedirs(destination, exist_ok=True)
     move_dir(source, destination)
+
+
+FICLONE = 0x40049409
+
+
+def link_file(src: str, dest: str):
+    if os.stat(src).st_dev != os.stat(os.path.dirname(dest) or ".").st_dev:
+        raise OSError(errno.EXDEV, "Not on the same filesystem", dest)
+    os.link(src, dest)
+
+
+def reflink_file(src: str, dest: str):
+    import fcntl
+
+    with open(src, "rb") as src_file, open(dest, "wb") as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, src_file.fileno())
+
+
+def copy_file_range_file(src: str, dest: str):
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is not available", dest)
+    with open(src, "rb") as src_file, open(dest, "wb") as dest_file:
+        remaining = os.fstat(src_file.fileno()).st_size
+        while remaining > 0:
+            sent = os.copy_file_range(src_file.fileno(), dest_file.fileno(), remaining)
+            if sent == 0:
+                break
+            remaining -= sent
+
+
+def sendfile_file(src: str, dest: str):
+    with open(src, "rb") as src_file, open(dest, "wb") as dest_file:
+        size = os.fstat(src_file.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dest_file.fileno(), src_file.fileno(), offset, size)
+            if sent == 0:
+                break
+            offset += sent
+
+
+def copy_file(src: str, dest: str):
+    shutil.copyfile(src, dest)
+
+
+PUBLISHERS: Dict[str, Callable[[str, str], None]] = {
+    "hardlink": link_file,
+    "reflink": reflink_file,
+    "copy_file_range": copy_file_range_file,
+    "sendfile": sendfile_file,
+    "copy": copy_file,
+}
+PUBLISH_STRATEGIES = ("auto", *PUBLISHERS)
+
+
+def publish_file(src: str, dest: str, strategy: str = "auto") -> str:
+    if strategy != "auto" and strategy not in PUBLISHERS:
+        raise ValueError(f"Unknown publish strategy {strategy}")
+    candidates = list(PUBLISHERS) if strategy == "auto" else [strategy]
+    for candidate in candidates:
+        # Never write through an existing file: it may be a hardlink to the
+        # source from an earlier build.
+        if os.path.lexists(dest):
+            remove_file(dest)
+        try:
+            PUBLISHERS[candidate](src, dest)
+        except OSError:
+            if candidate == candidates[-1]:
+                raise
+            continue
+        if candidate != "hardlink":
+            shutil.copystat(src, dest)
+        return candidate
+    raise ValueError(f"Unknown publish strategy {strategy}")
+
+
+def minify_file(src: str, dest: str) -> Dict[str, int]:
+    with open(src, "r") as file:
+        css = file.read()
+    start = time.perf_counter()
+    minified = minify_css(css)
+    seconds = time.perf_counter() - start
+    with atomic_open(dest) as file:
+        file.write(minified)
+    shutil.copystat(src, dest)
+    return minify_counts(len(css.encode()), len(minified.encode()), seconds)
+
+
+def minify_stamp(src_path: str) -> str:
+    # What a minified copy was made from, recorded in the manifest: a copy
+    # without one was published before minification was turned on.
+    stat = os.stat(src_path)
+    return f"{MINIFIER_VERSION}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def list_files(root: str) -> List[str]:
+    files = []
+    for dir_path, _, file_names in os.walk(root):
+        for name in file_names:
+            files.append(os.path.relpath(os.path.join(dir_path, name), root))
+    return sorted(files)
+
+
+def file_changed(src_path: str, dest_path: str, checksum: bool = False) -> bool:
+    src_stat, dest_stat = os.stat(src_path), os.stat(dest_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+    if checksum:
+        return file_digest(src_path) != file_digest(dest_path)
+    return src_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+
+class SyncReport:
+    def __init__(self, dry_run: bool = False) -> None:
+        self.dry_run: bool = dry_run
+        self.copied: List[str] = []
+        self.updated: List[str] = []
+        self.removed: List[str] = []
+        self.unchanged: List[str] = []
+        self.strategies: Counter = Counter()
+        self.minify: Counter = Counter()
+        self.assets: List[str] = []
+        # Published name -> minify_stamp() of every minified asset.
+        self.minified: Dict[str, str] = {}
+
+    def actions(self) -> List[str]:
+        return (
+            [f"copy {path}" for path in self.copied]
+            + [f"update {path}" for path in self.updated]
+            + [f"remove {path}" for path in self.removed]
+        )
+
+    def __str__(self) -> str:
+        prefix = "Would sync" if self.dry_run else "Synced"
+        summary = (
+            f"{prefix} assets: {len(self.copied)} copied, {len(self.updated)} "
+            f"updated, {len(self.removed)} removed, {len(self.unchanged)} unchanged"
+        )
+        if self.strategies:
+            used = ", ".join(f"{k}={v}" for k, v in sorted(self.strategies.items()))
+            summary += f" ({used})"
+        return summary
+
+
+def _sync_files(
+    src: str,
+    dest: str,
+    paths: Iterable[str],
+    report: SyncReport,
+    checksum: bool,
+    strategy: str,
+    minify: bool = False,
+    names: Optional[Dict[str, str]] = None,
+    minified: Optional[Dict[str, str]] = None,
+):
+    for path in paths:
+        src_path = os.path.join(src, path)
+        name = names.get(path, path) if names else path
+        dest_path = os.path.join(dest, name)
+        stamp = minify_stamp(src_path) if minify and path.endswith(".css") else None
+        recorded = minified.get(name) if minified else None
+        if stamp is not None:
+            report.minified[name] = stamp
+        if not os.path.exists(dest_path):
+            report.copied.append(name)
+        elif (
+            stamp != recorded
+            if stamp is not None or recorded is not None
+            else file_changed(src_path, dest_path, checksum)
+        ):
+            report.updated.append(name)
+        else:
+            report.unchanged.append(name)
+            continue
+        if report.dry_run:
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        if stamp is not None:
+            report.minify.update(minify_file(src_path, dest_path))
+            report.strategies["minify"] += 1
+        else:
+            report.strategies[publish_file(src_path, dest_path, strategy)] += 1
+
+
+def _prune_files(dest: str, paths: Iterable[str], report: SyncReport):
+    for path in sorted(paths):
+        dest_path = os.path.join(dest, path)
+        if not os.path.exists(dest_path):
+            continue
+        report.removed.append(path)
+        if not report.dry_run:
+            prune_file(dest_path, dest)
+
+
+def sync_dir(
+    src: str,
+    dest: str,
+    checksum: bool = False,
+    dry_run: bool = False,
+    published: Iterable[str] = (),
+    strategy: str = "copy",
+    minify: bool = False,
+    names: Optional[Dict[str, str]] = None,
+    minified: Optional[Dict[str, str]] = None,
+) -> SyncReport:
+    # `names` maps source paths to the names they are published under
+    # (fingerprinted assets); files not in it keep their own name.
+    # `minified` is the SyncReport.minified of the previous sync.
+    if not os.path.exists(src):
+        raise ValueError("Path not set for syncing")
+
+    report = SyncReport(dry_run)
+    sources = list_files(src)
+    _sync_files(
+        src, dest, sources, report, checksum, strategy, minify, names, minified
+    )
+    current = sorted(names.get(path, path) for path in sources) if names else sources
+    # Only files this sync published before are pruned, so generated pages
+    # living in the same output directory are left alone.
+    _prune_files(dest, set(published) - set(current), report)
+    report.assets = current
+    return report
+
+
+def sync_paths(
+    src: str,
+    dest: str,
+    paths: Iterable[str],
+    checksum: bool = False,
+    dry_run: bool = False,
+    published: Iterable[str] = (),
+    strategy: str = "copy",
+    minify: bool = False,
+    minified: Optional[Dict[str, str]] = None,
+) -> SyncReport:
+    published = set(published)
+    current, gone = set(), set()
+    for path in paths:
+        rel_path = os.path.relpath(path, src)
+        if os.path.isdir(path):
+            current.update(os.path.join(rel_path, f) for f in list_files(path))
+        elif os.path.isfile(path):
+            current.add(rel_path)
+        prefix = rel_path + os.sep
+        gone.update(
+            asset
+            for asset in published
+            if (asset == rel_path or asset.startswith(prefix))
+            and not os.path.exists(os.path.join(src, asset))
+        )
+
+    report = SyncReport(dry_run)
+    report.minified = {
+        name: stamp
+        for name, stamp in (minified or {}).items()
+        if name not in gone and name not in current
+    }
+    _sync_files(
+        src, dest, sorted(current), report, checksum, strategy, minify, None, minified
+    )
+    _prune_files(dest, gone, report)
+    report.assets = sorted((published - gone) | current)
+    return report
@@ -0,0 +1,99 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from file_handler import atomic_open
+from manifest import file_digest
+
+FINGERPRINTED = (
+    ".css",
+    ".js",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".svg",
+    ".ico",
+    ".woff",
+    ".woff2",
+)
+HASH_LENGTH = 10
+ASSET_MANIFEST = "asset-manifest.json"
+CSS_REFERENCE = re.compile(
+    r"""url\(\s*(["']?)([^"')]+)\1\s*\)|@import\s+(["'])([^"']+)\3"""
+)
+
+
+def fingerprinted_name(path: str, digest: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def css_references(root: str, path: str) -> List[str]:
+    # Assets a stylesheet loads through url(...) or @import, relative to root.
+    with open(os.path.join(root, path), "r", errors="replace") as file:
+        css = file.read()
+    references = set()
+    for match in CSS_REFERENCE.finditer(css):
+        url = (match.group(2) or match.group(4)).strip()
+        url = url.split("#", 1)[0].split("?", 1)[0]
+        if not url or ":" in url or url.startswith("//"):
+            continue
+        if url.startswith("/"):
+            reference = url.lstrip("/")
+        else:
+            reference = os.path.join(os.path.dirname(path), url)
+        references.add(os.path.normpath(reference))
+    return sorted(references)
+
+
+def fingerprint_assets(
+    root: str, paths: Iterable[str], cache: Dict[str, dict]
+) -> Tuple[Dict[str, str], Dict[str, dict], List[str]]:
+    # Returns the published name of every fingerprinted asset, the updated
+    # hash cache and the assets that had to be hashed. Files whose size and
+    # mtime match the cache keep their recorded hash without being read.
+    # Published CSS is not rewritten, so assets a stylesheet refers to keep
+    # their own name.
+    names, entries, hashed = {}, {}, []
+    referenced = set()
+    for path in paths:
+        if not path.endswith(FINGERPRINTED):
+            continue
+        stat = os.stat(os.path.join(root, path))
+        entry = cache.get(path)
+        if (
+            entry is None
+            or entry.get("size") != stat.st_size
+            or entry.get("mtime") != stat.st_mtime_ns
+            or (path.endswith(".css") and "references" not in entry)
+        ):
+            entry = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": file_digest(os.path.join(root, path)),
+            }
+            if path.endswith(".css"):
+                entry["references"] = css_references(root, path)
+            hashed.append(path)
+        entries[path] = entry
+        referenced.update(entry.get("references", ()))
+        names[path] = fingerprinted_name(path, entry["hash"])
+    for path in referenced:
+        names.pop(path, None)
+    return names, entries, hashed
+
+
+def write_asset_manifest(path: str, names: Dict[str, str]) -> bool:
+    data = json.dumps(names, indent=1, sort_keys=True)
+    try:
+        with open(path, "r") as file:
+            if file.read() == data:
+                return False
+    except OSError:
+        pass
+    with atomic_open(path) as file:
+        file.write(data)
+    return True
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import List, Optional
+
+from builder import Builder
+from generator import RenderOptions, generate_pages_recursively
+from manifest import Manifest
+from stats import BuildStats
+
+
+class SiteTestCase(unittest.TestCase):
+    # A site in a temporary directory, laid out like the repository:
+    # content/, static/, template.html, docs/ and .build/. Paths given to the
+    # helpers are relative to the site root unless they are absolute.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root: str = self.tmp.name
+        self.content: str = self.path("content")
+        self.static: str = self.path("static")
+        self.docs: str = self.path("docs")
+        self.template: str = self.path("template.html")
+        self.manifest_path: str = self.path(".build", "manifest.json")
+        # What the last quietly() call printed.
+        self.output: str = ""
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    def write(self, path: str, text: str) -> str:
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def read(self, *parts: str) -> str:
+        with open(self.path(*parts)) as file:
+            return file.read()
+
+    def quietly(self, func, *args, **kwargs):
+        output = StringIO()
+        with redirect_stdout(output):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.output = output.getvalue()
+
+    def make_builder(self, base_path: str = "/", **kwargs) -> Builder:
+        options = {
+            "static": self.static,
+            "public": self.docs,
+            "content": self.content,
+            "template": self.template,
+            "manifest_path": self.manifest_path,
+            "publish": "copy",
+            "page_cache_dir": None,
+        }
+        options.update(kwargs)
+        return Builder(base_path, **options)
+
+    def generate(
+        self,
+        base_path: str = "/",
+        options: Optional[RenderOptions] = None,
+        workers: int = 1,
+        stats: Optional[BuildStats] = None,
+        manifest: bool = True,
+    ) -> List[str]:
+        # generate_pages_recursively() over the site, with the manifest kept
+        # between calls unless `manifest` is off.
+        return self.quietly(
+            generate_pages_recursively,
+            base_path,
+            src_path=self.content,
+            dest_path=self.docs,
+            template_path=self.template,
+            manifest=Manifest.load(self.manifest_path) if manifest else None,
+            workers=workers,
+            options=options,
+            stats=stats,
+        )
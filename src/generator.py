@@ -1,50 +1,807 @@
+import hashlib
 import os
-from parser import markdown_to_html_node, extract_title
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+from xml.sax.saxutils import escape
+from parser import (
+    extract_title,
+    iter_markdown_html,
+    markdown_to_html_node,
+    stream_title,
+)
+from block_cache import BlockCache
+from block_parser import PARSER_VERSION
+from page_cache import PageCache
+from pipeline import Pipeline
+from search_index import SearchIndex, update_search_index
+from site_index import (
+    FEED_PATH,
+    PageMeta,
+    SiteIndex,
+    listing_pages,
+    page_url,
+    read_meta,
+    rss_feed,
+    split_front_matter,
+    strip_front_matter,
+)
+from file_handler import atomic_open, prune_file
+from htmlnode import ParentNode
+from link_check import LinkChecker, LinkReport, output_path, page_links, scan_links
+from manifest import Manifest, file_digest
+from minifier import MINIFIER_VERSION, MinifyingWriter
+from profiler import BuildProfile, PageProfile
+from stats import BuildStats
+from template import Template
+from urls import URL_MARK, UrlResolver, mark_url, resolve_marked
 
+# Sources at least this large are streamed instead of read into memory whole.
+STREAM_THRESHOLD = 8 << 20
 
-def generate_pages_recursively(base_path):
-    src_path = "content/"
-    dest_path = "docs/"
-    template_path = "template.html"
 
-    def generate_pages(src_path, template_path, dest_path):
-        for file in os.listdir(src_path):
-            src_file_path = os.path.join(src_path, file)
-            dest_file_path = os.path.join(dest_path, file)
-            if os.path.isdir(src_file_path):
-                os.makedirs(dest_file_path, exist_ok=True)
-                generate_pages(src_file_path, template_path, dest_file_path)
+def html_path(dest_path: str) -> str:
+    *dest_dir, name = dest_path.split(os.sep)
+    name = os.path.splitext(name.strip())[0]
+    return os.path.join((os.sep).join(dest_dir), f"{name}.html")
 
-            else:
-                if os.path.exists(src_file_path):
-                    generate_page(
-                        base_path, src_file_path, template_path, dest_file_path
-                    )
-                else:
-                    raise Exception(src_file_path, " Does not exists")
 
-    generate_pages(src_path, template_path, dest_path)
+def collect_pages(src_path: str, dest_path: str) -> List[Tuple[str, str]]:
+    pages = []
+    for file in sorted(os.listdir(src_path)):
+        src_file_path = os.path.join(src_path, file)
+        dest_file_path = os.path.join(dest_path, file)
+        if os.path.isdir(src_file_path):
+            pages.extend(collect_pages(src_file_path, dest_file_path))
+        elif os.path.exists(src_file_path):
+            pages.append((src_file_path, html_path(dest_file_path)))
+        else:
+            raise Exception(src_file_path, " Does not exists")
+    return pages
 
 
-def generate_page(base_path, from_path, template_path, dest_path):
-    *dest_path, name = dest_path.split(os.sep)
-    name = os.path.splitext(name.strip())[0]
-    dest_path = os.path.join((os.sep).join(dest_path), f"{name}.html")
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+class RenderOptions:
+    def __init__(
+        self,
+        quiet: bool = False,
+        profile: bool = False,
+        cache_size: int = 0,
+        cache_dir: Optional[str] = None,
+        page_cache_dir: Optional[str] = None,
+        minify: bool = False,
+        assets: Optional[Dict[str, str]] = None,
+        stream_threshold: Optional[int] = STREAM_THRESHOLD,
+        listings: bool = True,
+        site_url: str = "",
+        search_cache: Optional[str] = None,
+        check_links: bool = True,
+        trace_memory: bool = False,
+    ) -> None:
+        self.quiet: bool = quiet
+        self.profile: bool = profile
+        # Also trace the peak memory of every profiled phase.
+        self.trace_memory: bool = trace_memory
+        self.cache_size: int = cache_size
+        self.cache_dir: Optional[str] = cache_dir
+        self.page_cache_dir: Optional[str] = page_cache_dir
+        self.minify: bool = minify
+        # Published names of fingerprinted static assets, by source path.
+        self.assets: Optional[Dict[str, str]] = assets
+        self.stream_threshold: Optional[int] = stream_threshold
+        # Generate blog and tag listings and a feed from the site index; feed
+        # links are prefixed with `site_url` when it is set.
+        self.listings: bool = listings
+        self.site_url: str = site_url
+        # Where the search index is kept between builds; None disables it.
+        self.search_cache: Optional[str] = search_cache
+        # Collect the links of every page and report the ones that point at
+        # no output or static asset.
+        self.check_links: bool = check_links
 
-    with open(from_path, "r") as file:
-        markdown = file.read()
+    def streams(self, path: str) -> bool:
+        return (
+            self.stream_threshold is not None
+            and os.path.getsize(path) >= self.stream_threshold
+        )
+
+    def output_settings(self) -> dict:
+        # Options that change the generated pages, and the version of the
+        # parser that rendered them; a change rebuilds them all.
+        settings = {"parser": PARSER_VERSION}
+        if self.minify:
+            settings["minify"] = MINIFIER_VERSION
+        if self.assets:
+            settings["assets"] = hashlib.sha256(
+                repr(sorted(self.assets.items())).encode()
+            ).hexdigest()
+        return settings
+
+
+# One block cache per process, so worker processes keep theirs between pages
+# and watch mode keeps it between rebuilds.
+_block_caches: Dict[tuple, BlockCache] = {}
+_page_caches: Dict[str, PageCache] = {}
+# Counters and links of the page being generated, collected by _render_page.
+_page_counts: Counter = Counter()
+_page_links: Set[str] = set()
+# The last template compiled from each path, with what it was compiled from.
+_templates: Dict[str, Tuple[tuple, Template]] = {}
+
+
+def load_template(
+    template_path, base_path, assets: Optional[Dict[str, str]] = None
+) -> Template:
+    # Compiled once per build, and only again after a change in long-running
+    # processes; keyed by the file's content, so a rewrite is never missed.
     with open(template_path, "r") as file:
-        template = file.read()
+        source = file.read()
+    key = (source, base_path, sorted((assets or {}).items()))
+    cached = _templates.get(template_path)
+    if cached is None or cached[0] != key:
+        template = Template(source, base_path, assets)
+        cached = _templates[template_path] = (key, template)
+    return cached[1]
+
+
+def block_cache(options: RenderOptions) -> Optional[BlockCache]:
+    if options.cache_size <= 0:
+        return None
+    key = (options.cache_size, options.cache_dir)
+    if key not in _block_caches:
+        _block_caches[key] = BlockCache(options.cache_size, options.cache_dir)
+    return _block_caches[key]
+
+
+def page_cache(options: RenderOptions) -> Optional[PageCache]:
+    if not options.page_cache_dir:
+        return None
+    if options.page_cache_dir not in _page_caches:
+        _page_caches[options.page_cache_dir] = PageCache(options.page_cache_dir)
+    return _page_caches[options.page_cache_dir]
+
+
+class BuildError(Exception):
+    def __init__(self, failures: List[Tuple[str, str]]) -> None:
+        self.failures = failures
+        super().__init__(f"{len(failures)} page(s) failed to generate")
+
+
+PageResult = Tuple[Optional[str], Optional[dict], Dict[str, int], List[str]]
+
+
+def _take_counts(options: RenderOptions) -> Dict[str, int]:
+    counts = dict(_page_counts)
+    _page_counts.clear()
+    for cache in (block_cache(options), page_cache(options)):
+        if cache is not None:
+            counts.update(cache.take_counts())
+    return counts
+
+
+def _take_links() -> List[str]:
+    links = sorted(_page_links)
+    _page_links.clear()
+    return links
+
 
-    html = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
+def _render_page(job: tuple) -> PageResult:
+    error, record = None, None
+    try:
+        record = generate_page(*job)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return error, record, _take_counts(job[-1] or RenderOptions()), _take_links()
+
+
+def _generate_page_job(job: tuple) -> Tuple[str, PageResult]:
+    output = StringIO()
+    with redirect_stdout(output):
+        result = _render_page(job)
+    return output.getvalue(), result
+
+
+def _run_page_jobs(jobs: List[tuple], workers: int) -> Iterator[PageResult]:
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _render_page(job)
+        return
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_generate_page_job, jobs, chunksize=chunksize)
+        for output, result in results:
+            print(output, end="")
+            yield result
+
+
+# Stages of the page pipeline. They take the same job tuples as _render_page
+# and run in reader threads, worker processes and writer threads.
+def _read_job(job: tuple) -> Optional[str]:
+    return read_page(job[1], job[-1])
+
+
+def _render_job(
+    job: tuple, markdown: Optional[str]
+) -> Tuple[str, Optional[str], Dict[str, int], List[str]]:
+    # What rendering printed, the page (None if it was streamed to disk), the
+    # page's counters and the links in it.
+    output = StringIO()
+    try:
+        with redirect_stdout(output):
+            page = render_page(*job, markdown)
+    finally:
+        counts, links = _take_counts(job[-1]), _take_links()
+    return output.getvalue(), page, counts, links
+
+
+def _write_job(job: tuple, rendered: tuple) -> None:
+    page = rendered[1]
+    if page is not None:
+        write_output(html_path(job[3]), page)
+
+
+def _pipeline_page_jobs(
+    jobs: List[tuple], workers: int, stats: Optional[BuildStats] = None
+) -> Iterator[PageResult]:
+    executor = None
+    if workers > 1 and len(jobs) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    pipeline = Pipeline(
+        _read_job,
+        _render_job,
+        _write_job,
+        depth=max(16, workers * 4),
+        executor=executor,
+        render_workers=workers,
+    )
+    results: List[PageResult] = [(None, None, {}, [])] * len(jobs)
+    # Pages finish in any order; what they printed is held back until every
+    # page before them is done, so the log reads the same on every run.
+    outputs: Dict[int, str] = {}
+    printed = 0
+    try:
+        for index, error, rendered in pipeline.run(jobs):
+            output, _, counts, links = rendered or ("", None, {}, [])
+            results[index] = (error, None, counts, links)
+            outputs[index] = output
+            while printed in outputs:
+                print(outputs.pop(printed), end="")
+                printed += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    if stats is not None:
+        stats.add(pipeline.counts())
+    yield from results
+
+
+def generate_pages(
+    base_path,
+    pages: List[Tuple[str, str]],
+    template_path,
+    workers: int = 1,
+    options: Optional[RenderOptions] = None,
+    profile: Optional[BuildProfile] = None,
+    stats: Optional[BuildStats] = None,
+    links: Optional[Dict[str, List[str]]] = None,
+) -> Tuple[List[str], List[Tuple[str, str]]]:
+    for dest_dir in sorted({os.path.dirname(dest) for _, dest in pages}):
+        os.makedirs(dest_dir, exist_ok=True)
+    options = options or RenderOptions()
     template = (
-        template.replace("{{ Title }}", title)
-        .replace("{{ Content }}", html)
-        .replace('href="/', f'href="{base_path}')
-        .replace('src="/', f'src="{base_path}')
+        load_template(template_path, base_path, options.assets) if pages else None
+    )
+    jobs = [
+        (base_path, src, template_path, dest, template, options)
+        for src, dest in pages
+    ]
+    generated, failures = [], []
+    if options.profile:
+        # Profiling times every phase of a page in one place.
+        results = _run_page_jobs(jobs, workers)
+    else:
+        results = _pipeline_page_jobs(jobs, workers, stats)
+    for (src, dest), (error, record, counts, urls) in zip(pages, results):
+        if stats is not None:
+            stats.add(counts)
+        if error is None:
+            generated.append(dest)
+            if links is not None:
+                links[src] = urls
+            if profile is not None:
+                profile.add(record)
+        else:
+            print(f"Failed to generate {dest} from {src}: {error}")
+            failures.append((src, error))
+    return generated, failures
+
+
+def generate_pages_recursively(
+    base_path,
+    src_path="content/",
+    dest_path="docs/",
+    template_path="template.html",
+    manifest: Optional[Manifest] = None,
+    workers: int = 1,
+    dry_run: bool = False,
+    options: Optional[RenderOptions] = None,
+    profile: Optional[BuildProfile] = None,
+    stats: Optional[BuildStats] = None,
+) -> List[str]:
+    pages = collect_pages(src_path, dest_path)
+    if manifest is None:
+        generated, failures = generate_pages(
+            base_path, pages, template_path, workers, options, profile, stats
+        )
+        if failures:
+            raise BuildError(failures)
+        return generated
+
+    template_digest = file_digest(template_path)
+    settings = (options or RenderOptions()).output_settings()
+    rebuild_all = manifest.inputs_changed(template_digest, base_path, settings)
+    stale, digests = [], {}
+    for src_file_path, dest_file_path in pages:
+        digest = digests[src_file_path] = file_digest(src_file_path)
+        fresh = manifest.is_fresh(src_file_path, digest, dest_file_path)
+        if rebuild_all or not fresh:
+            stale.append((src_file_path, dest_file_path))
+    deleted = sorted(set(manifest.pages) - set(digests))
+
+    if dry_run:
+        for src_file_path, dest_file_path in stale:
+            print(f"Would generate {dest_file_path} from {src_file_path}")
+        for src_file_path in deleted:
+            print(f"Would remove {manifest.pages[src_file_path]['dest']}")
+        return [dest for _, dest in stale]
+
+    manifest.template = template_digest
+    manifest.base_path = base_path
+    manifest.settings = settings
+    if (options or RenderOptions()).listings:
+        for src_file_path in set(manifest.index) - set(digests):
+            del manifest.index[src_file_path]
+        index_pages(manifest, pages, digests, dest_path)
+    return update_pages(
+        base_path,
+        stale,
+        deleted,
+        digests,
+        template_path,
+        dest_path,
+        manifest,
+        workers,
+        options,
+        profile,
+        stats,
+        rebuild_all=rebuild_all,
     )
 
-    with open(dest_path, "w") as file:
-        file.write(template)
+
+def regenerate_pages(
+    base_path,
+    sources: Iterable[str],
+    src_path="content/",
+    dest_path="docs/",
+    template_path="template.html",
+    manifest: Optional[Manifest] = None,
+    workers: int = 1,
+    options: Optional[RenderOptions] = None,
+    profile: Optional[BuildProfile] = None,
+    stats: Optional[BuildStats] = None,
+) -> List[str]:
+    manifest = Manifest() if manifest is None else manifest
+    stale, deleted, digests = [], set(), {}
+    for source in sources:
+        if os.path.isdir(source):
+            for src_file_path, dest_file_path in collect_pages(
+                source, page_path(source, src_path, dest_path)
+            ):
+                digests[src_file_path] = file_digest(src_file_path)
+                stale.append((src_file_path, dest_file_path))
+        elif os.path.isfile(source):
+            digests[source] = file_digest(source)
+            stale.append((source, html_path(page_path(source, src_path, dest_path))))
+        prefix = source.rstrip(os.sep) + os.sep
+        deleted.update(
+            src_file_path
+            for src_file_path in manifest.pages
+            if (src_file_path == source or src_file_path.startswith(prefix))
+            and not os.path.exists(src_file_path)
+        )
+    return update_pages(
+        base_path,
+        stale,
+        sorted(deleted),
+        digests,
+        template_path,
+        dest_path,
+        manifest,
+        workers,
+        options,
+        profile,
+        stats,
+    )
+
+
+def index_pages(
+    manifest: Manifest,
+    pages: List[Tuple[str, str]],
+    digests: Dict[str, str],
+    dest_path,
+) -> None:
+    # The pre-pass behind listings and feeds: front matter and title of every
+    # page whose source changed since it was last indexed.
+    for src_file_path, dest_file_path in pages:
+        entry = manifest.index.get(src_file_path)
+        digest = digests[src_file_path]
+        if entry and entry["hash"] == digest and entry["dest"] == dest_file_path:
+            continue
+        url = page_url(dest_file_path, dest_path)
+        try:
+            meta = read_meta(src_file_path, url)
+        except (OSError, ValueError) as e:
+            print(f"Leaving {src_file_path} out of the site index: {e}")
+            manifest.index.pop(src_file_path, None)
+            continue
+        manifest.index[src_file_path] = {
+            "hash": digest,
+            "dest": dest_file_path,
+            "meta": meta.to_dict(),
+        }
+
+
+def update_listings(
+    base_path,
+    template_path,
+    dest_path,
+    manifest: Manifest,
+    options: RenderOptions,
+    rebuild_all: bool = False,
+) -> List[str]:
+    # Blog index, tag pages and feed are worked out from the index alone;
+    # only the ones whose content changed are rendered and written again.
+    index = SiteIndex(
+        {
+            src_file_path: PageMeta.from_dict(entry["meta"])
+            for src_file_path, entry in manifest.index.items()
+        }
+    )
+    template = load_template(template_path, base_path, options.assets)
+    resolve = template.resolver
+    outputs: Dict[str, Union[str, Tuple[str, ParentNode]]] = {}
+    for url, title, body in listing_pages(index):
+        outputs[os.path.join(dest_path, url.strip("/"), "index.html")] = (title, body)
+    posts = index.posts()
+    if posts and not options.site_url:
+        # RSS needs absolute links, so there is no feed without a site URL.
+        print(f"Skipping {FEED_PATH}: no site URL to make its links absolute")
+    elif posts:
+        site_url = options.site_url.rstrip("/")
+        outputs[os.path.join(dest_path, FEED_PATH)] = rss_feed(
+            posts, "Blog", lambda url: site_url + resolve(url)
+        )
+
+    owned = {entry["dest"] for entry in manifest.pages.values()}
+    written = []
+    for dest_file_path, output in outputs.items():
+        if dest_file_path in owned:
+            # A page from the content directory takes precedence.
+            continue
+        try:
+            if isinstance(output, tuple):
+                title, body = output
+                source = f"{title}\0{body.to_html()}"
+            else:
+                source = output
+            digest = hashlib.sha256(source.encode()).hexdigest()
+            if (
+                not rebuild_all
+                and manifest.listings.get(dest_file_path) == digest
+                and os.path.exists(dest_file_path)
+            ):
+                continue
+            if isinstance(output, tuple):
+                page = StringIO()
+                write_page(
+                    page, template, options, escape(title), body.iter_html(resolve)
+                )
+                output = page.getvalue()
+            os.makedirs(os.path.dirname(dest_file_path), exist_ok=True)
+            write_output(dest_file_path, output)
+        except Exception as e:
+            # One bad listing must not fail the build; it is tried again on
+            # the next one.
+            print(f"Failed to generate {dest_file_path}: {type(e).__name__}: {e}")
+            manifest.listings.pop(dest_file_path, None)
+            continue
+        manifest.listings[dest_file_path] = digest
+        written.append(dest_file_path)
+    for dest_file_path in sorted(set(manifest.listings) - set(outputs)):
+        print(f"Removing listing {dest_file_path}")
+        if dest_file_path not in owned:
+            prune_file(dest_file_path, dest_path)
+        del manifest.listings[dest_file_path]
+    if written:
+        print(f"Generated {len(written)} listing page(s) and feeds from the site index")
+    return written
+
+
+def check_links(
+    base_path, template_path, dest_path, manifest: Manifest, options: RenderOptions
+) -> LinkReport:
+    # Links were collected while pages rendered and are kept in the manifest,
+    # so pages this build skipped are checked too, without reading docs/.
+    outputs = [entry["dest"] for entry in manifest.pages.values()]
+    outputs.extend(manifest.listings)
+    targets = {output_path(dest, dest_path) for dest in outputs}
+    checker = LinkChecker(base_path, targets.union(manifest.assets))
+    report = LinkReport()
+    # Links in the template are on every page; they are checked once, as if
+    # from the home page.
+    template = load_template(template_path, base_path, options.assets)
+    template_links = sorted(page_links("".join(template.segments)))
+    report.check(checker, "index.html", template_links, template_path)
+    for entry in manifest.pages.values():
+        page = output_path(entry["dest"], dest_path)
+        report.check(checker, page, entry.get("links", []), entry["dest"])
+    return report
+
+
+def page_path(source: str, src_path: str, dest_path: str) -> str:
+    return os.path.join(dest_path, os.path.relpath(source, src_path))
+
+
+def update_pages(
+    base_path,
+    stale: List[Tuple[str, str]],
+    deleted: List[str],
+    digests: Dict[str, str],
+    template_path,
+    dest_path,
+    manifest: Manifest,
+    workers: int = 1,
+    options: Optional[RenderOptions] = None,
+    profile: Optional[BuildProfile] = None,
+    stats: Optional[BuildStats] = None,
+    rebuild_all: bool = False,
+) -> List[str]:
+    options = options or RenderOptions()
+    links: Dict[str, List[str]] = {}
+    generated, failures = generate_pages(
+        base_path, stale, template_path, workers, options, profile, stats, links
+    )
+    failed = {src for src, _ in failures}
+    for src_file_path, dest_file_path in stale:
+        if src_file_path in failed:
+            manifest.pages.pop(src_file_path, None)
+        else:
+            manifest.record(
+                src_file_path,
+                digests[src_file_path],
+                dest_file_path,
+                links.get(src_file_path) if options.check_links else None,
+            )
+
+    pages = page_cache(options)
+    for src_file_path in deleted:
+        dest_file_path = manifest.pages.pop(src_file_path)["dest"]
+        print(f"Removing page {dest_file_path} for deleted {src_file_path}")
+        prune_file(dest_file_path, dest_path)
+        if pages is not None:
+            pages.remove(src_file_path)
+
+    if options.listings:
+        for src_file_path in failed.union(deleted):
+            manifest.index.pop(src_file_path, None)
+        index_pages(
+            manifest,
+            [page for page in stale if page[0] not in failed],
+            digests,
+            dest_path,
+        )
+        update_listings(
+            base_path, template_path, dest_path, manifest, options, rebuild_all
+        )
+    if options.search_cache and manifest.path:
+        # The search index covers every page recorded in the manifest.
+        published = {
+            src_file_path: (entry["hash"], page_url(entry["dest"], dest_path))
+            for src_file_path, entry in manifest.pages.items()
+        }
+        resolve = UrlResolver(base_path, options.assets)
+        search = SearchIndex.load(options.search_cache)
+        print(update_search_index(search, published, dest_path, resolve, rebuild_all))
+    if options.check_links:
+        print(check_links(base_path, template_path, dest_path, manifest, options))
+
+    if manifest.path:
+        manifest.save()
+    if failures:
+        raise BuildError(failures)
+    return generated
+
+
+def generate_page(
+    base_path,
+    from_path,
+    template_path,
+    dest_path,
+    template: Optional[Template] = None,
+    options: Optional[RenderOptions] = None,
+) -> Optional[dict]:
+    # Reads, renders and writes one page in turn; generate_pages runs these
+    # steps as overlapping stages instead.
+    options = options or RenderOptions()
+    if options.profile:
+        dest_path, template = start_page(
+            base_path, from_path, template_path, dest_path, template, options
+        )
+        return profile_page(base_path, from_path, dest_path, template, options)
+    markdown = read_page(from_path, options)
+    page = render_page(
+        base_path, from_path, template_path, dest_path, template, options, markdown
+    )
+    if page is not None:
+        write_output(html_path(dest_path), page)
+    return None
+
+
+def start_page(
+    base_path,
+    from_path,
+    template_path,
+    dest_path,
+    template: Optional[Template],
+    options: RenderOptions,
+) -> Tuple[str, Template]:
+    dest_path = html_path(dest_path)
+    # Pages generated directly rather than as a job never had their links
+    # taken; only this page's belong to it.
+    _page_links.clear()
+    if not options.quiet:
+        print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if template is None:
+        template = load_template(template_path, base_path, options.assets)
+    return dest_path, template
+
+
+def read_page(from_path, options: RenderOptions) -> Optional[str]:
+    # None for sources large enough to be streamed instead of read whole.
+    if options.streams(from_path):
+        return None
+    with open(from_path, "r") as file:
+        return file.read()
+
+
+def write_output(dest_path, page: str) -> None:
+    with atomic_open(dest_path) as file:
+        file.write(page)
+
+
+def render_page(
+    base_path,
+    from_path,
+    template_path,
+    dest_path,
+    template: Optional[Template],
+    options: RenderOptions,
+    markdown: Optional[str],
+) -> Optional[str]:
+    # The finished page, or None when the source was streamed straight to
+    # its output.
+    dest_path, template = start_page(
+        base_path, from_path, template_path, dest_path, template, options
+    )
+    if markdown is None:
+        stream_page(from_path, dest_path, template, options)
+        return None
+    cache = block_cache(options)
+    # Front matter only feeds the site index.
+    _, markdown = split_front_matter(markdown)
+
+    # URLs are resolved while the page is serialized, with the resolver the
+    # template was compiled with.
+    resolve = template.resolver
+    pages = page_cache(options)
+    content: Union[str, Iterable[str]]
+    if pages is None or URL_MARK in markdown:
+        node = markdown_to_html_node(markdown, cache=cache, resolve=resolve)
+        title = extract_title(markdown)
+        content = node.iter_html(resolve)
+    else:
+        # Bodies are stored with their URLs marked, and resolved on every
+        # use, so a new base path or asset names only refill the template.
+        digest = hashlib.sha256(markdown.encode()).hexdigest()
+        entry = pages.load(from_path, digest)
+        if entry is None:
+            title = extract_title(markdown)
+            node = markdown_to_html_node(markdown, cache=cache, resolve=mark_url)
+            body = node.to_html(mark_url)
+            pages.store(from_path, digest, title, body)
+        else:
+            title, body = entry
+        content = resolve_marked(body, resolve)
+
+    page = StringIO()
+    write_page(page, template, options, title, collect_links(content, options))
+    return page.getvalue()
+
+
+def stream_page(
+    from_path, dest_path, template: Template, options: RenderOptions
+) -> None:
+    # Peak memory stays bounded by the largest block, not the document: the
+    # title comes from a first pass that stops at the heading, then the body
+    # is parsed and written block by block between the template's header
+    # and footer. Streamed pages bypass the page cache, which keeps bodies
+    # whole.
+    with open(from_path, "r") as file:
+        title = stream_title(strip_front_matter(file))
+    with open(from_path, "r") as file, atomic_open(dest_path) as out:
+        lines = strip_front_matter(file)
+        content = iter_markdown_html(lines, block_cache(options), template.resolver)
+        write_page(out, template, options, title, collect_links(content, options))
+
+
+def collect_links(
+    content: Union[str, Iterable[str]], options: RenderOptions
+) -> Union[str, Iterable[str]]:
+    # Links of the page body are picked up as it is written; the template's
+    # are checked separately.
+    if not options.check_links:
+        return content
+    if isinstance(content, str):
+        _page_links.update(page_links(content))
+        return content
+    return scan_links(content, _page_links)
+
+
+def write_page(
+    file: TextIO,
+    template: Template,
+    options: RenderOptions,
+    title: str,
+    content: Union[str, Iterable[str]],
+) -> None:
+    if not options.minify:
+        template.write_to(file, Title=title, Content=content)
+        return
+    writer = MinifyingWriter(file)
+    template.write_to(writer, Title=title, Content=content)
+    writer.close()
+    _page_counts.update(writer.counts())
+
+
+def profile_page(
+    base_path,
+    from_path,
+    dest_path,
+    template: Template,
+    options: RenderOptions,
+) -> dict:
+    # Same steps as generate_page, but each phase runs to completion on its
+    # own so the time spent in it can be attributed.
+    profile = PageProfile(from_path, options.trace_memory)
+    with profile.phase("read"):
+        with open(from_path, "r") as file:
+            _, markdown = split_front_matter(file.read())
+    resolve = template.resolver
+    node = markdown_to_html_node(markdown, profile, block_cache(options), resolve)
+    with profile.phase("serialize"):
+        html = node.to_html(resolve)
+    collect_links(html, options)
+    with profile.phase("template"):
+        page = template.render(Title=extract_title(markdown), Content=html)
+    with profile.phase("write"):
+        with atomic_open(dest_path) as file:
+            if not options.minify:
+                file.write(page)
+            else:
+                writer = MinifyingWriter(file)
+                writer.write(page)
+                writer.close()
+                _page_counts.update(writer.counts())
+    return profile.to_dict()
@@ -1,50 +1,91 @@
-from typing import List, Optional, Type
+from typing import Callable, Iterator, List, Optional, TextIO, Type
+
+# Props holding URLs, passed through the resolver given to serialization.
+URL_PROPS = ("href", "src")
+Resolver = Callable[[str], str]
 
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None) -> None:
         self.tag: Optional[str] = tag
         self.value: Optional[str] = value
         self.children: Optional[list] = children
-        self.props: Optional[dict] = props
+        self.props: Optional[dict] = props or None
 
-    def to_html(self):
+    def iter_html(self, resolve: Optional[Resolver] = None) -> Iterator[str]:
         raise NotImplementedError
 
-    def props_to_html(self):
-        if self.props:
+    def to_html(self, resolve: Optional[Resolver] = None):
+        return "".join(self.iter_html(resolve))
+
+    def write_to(self, fp: TextIO, resolve: Optional[Resolver] = None) -> None:
+        fp.writelines(self.iter_html(resolve))
+
+    def props_to_html(self, resolve: Optional[Resolver] = None):
+        if not self.props:
+            return ""
+        if resolve is None:
             return "".join(f' {key}="{val}"' for key, val in self.props.items())
-        return ""
+        return "".join(
+            f' {key}="{resolve(val) if key in URL_PROPS else val}"'
+            for key, val in self.props.items()
+        )
 
     def __repr__(self) -> str:
         return f"HTMLNode(\n\ttag={self.tag}, \n\tvalue={self.value}, \n\tchildren={self.children}, \n\tprops={self.props}\n\t)"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None) -> None:
         super().__init__(tag=tag, value=value, props=props)
 
-    def to_html(self):
+    def iter_html(self, resolve: Optional[Resolver] = None) -> Iterator[str]:
+        yield self.to_html(resolve)
+
+    def to_html(self, resolve: Optional[Resolver] = None):
         if self.value is None:
             raise ValueError("No value in LeafNode")
         if not self.tag:
             return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html(resolve)}>{self.value}</{self.tag}>"
 
     def __repr__(self) -> str:
         return f"LeafNode(\n\ttag={self.tag}, \n\tvalue={self.value}, \n\tprops={self.props}\n\t)"
 
 
 class ParentNode(HTMLNode):
-    def __init__(self, tag: str, children=[], props=None) -> None:
+    __slots__ = ()
+
+    def __init__(self, tag: str, children=None, props=None) -> None:
         super().__init__(tag=tag, children=children, props=props)
 
-    def to_html(self):
+    def open_tag(self, resolve: Optional[Resolver] = None) -> str:
         if not self.tag:
             raise ValueError("Tag is a reqired field in ParentNode")
         if not self.children:
             raise ValueError("children is a reqired field in ParentNode")
-        return f"<{self.tag}{self.props_to_html()}>{''.join(i.to_html() for i in self.children)}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html(resolve)}>"
+
+    def iter_html(self, resolve: Optional[Resolver] = None) -> Iterator[str]:
+        # Walk the tree with an explicit stack so every chunk is yielded
+        # straight to the consumer instead of through one generator per level.
+        yield self.open_tag(resolve)
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield f"</{node.tag}>"
+            elif isinstance(child, ParentNode):
+                yield child.open_tag(resolve)
+                stack.append((child, iter(child.children)))
+            else:
+                yield from child.iter_html(resolve)
 
     def __repr__(self) -> str:
         return f"ParentNode(\n\ttag={self.tag}, \n\tchildren={self.children}, \n\tprops={self.props}\n\t)"
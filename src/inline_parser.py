@@ -1,20 +1,96 @@
-from typing import List
+from functools import lru_cache
+from typing import Dict, List
 from textnode import TextNode, TextType
 import re
 
+DELIMITERS: Dict[str, TextType] = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+URL_TYPES = (TextType.IMAGE, TextType.LINK)
+
+
+@lru_cache(maxsize=None)
+def token_pattern(delimiters: tuple, images: bool, links: bool) -> re.Pattern:
+    tokens = [re.escape(delimiter) for delimiter in delimiters]
+    if images:
+        tokens.append(r"!\[")
+    if links:
+        tokens.append(r"\[")
+    return re.compile("|".join(tokens))
+
+
+def tokenize(
+    text: str,
+    delimiters: Dict[str, TextType] = DELIMITERS,
+    images: bool = True,
+    links: bool = True,
+    strict: bool = True,
+) -> List[TextNode]:
+    # Single left-to-right scan: a delimiter jumps straight to its closing
+    # delimiter and images/links are matched in place, so the text is never
+    # re-split. Span contents are kept verbatim (nesting is expanded when
+    # rendering) and a lone space next to an image or link is dropped, like
+    # the old per-pattern splitters did.
+    pattern = token_pattern(tuple(delimiters), images, links)
+    nodes: List[TextNode] = []
+    start = position = 0
+
+    def flush(end: int, before_url: bool) -> None:
+        if end <= start:
+            return
+        section = text[start:end]
+        after_url = bool(nodes) and nodes[-1].text_type in URL_TYPES
+        if section == " " and (before_url or after_url):
+            return
+        nodes.append(TextNode(section, TextType.TEXT))
+
+    while (match := pattern.search(text, position)) is not None:
+        token = match.group()
+        if token in delimiters:
+            close = text.find(token, match.end())
+            if close == -1:
+                if strict:
+                    raise ValueError(
+                        f"There was no closing delimiter for delimiter={token!r}"
+                    )
+                position = match.end()
+                continue
+            flush(match.start(), before_url=False)
+            if close > match.end():
+                nodes.append(TextNode(text[match.end() : close], delimiters[token]))
+            start = position = close + len(token)
+            continue
+
+        url_pattern, text_type = (
+            (IMAGE_PATTERN, TextType.IMAGE)
+            if token == "!["
+            else (LINK_PATTERN, TextType.LINK)
+        )
+        url_match = url_pattern.match(text, match.start())
+        if url_match is None:
+            position = match.end()
+            continue
+        flush(match.start(), before_url=True)
+        name, url = url_match.groups()
+        nodes.append(TextNode(name, text_type, url))
+        start = position = url_match.end()
+
+    flush(len(text), before_url=False)
+    return nodes
+
 
-def text_to_textnodes(text: str) -> List[TextNode]:
+def text_to_textnodes(text: str, strict: bool = True) -> List[TextNode]:
     if not text:
         return []
-    input_node = [TextNode(text=text, text_type=TextType.TEXT)]
+    return tokenize(text, strict=strict)
 
-    bold_nodes = split_nodes_delimiter(input_node, "**", TextType.BOLD)
-    italic_nodes = split_nodes_delimiter(bold_nodes, "_", TextType.ITALIC)
-    code_nodes = split_nodes_delimiter(italic_nodes, "`", TextType.CODE)
 
-    image_nodes = split_nodes_image(code_nodes)
-    all_nodes = split_nodes_link(image_nodes)
-    return all_nodes
+def has_inline_markup(text: str) -> bool:
+    return token_pattern(tuple(DELIMITERS), True, True).search(text) is not None
 
 
 def split_nodes_delimiter(
@@ -25,69 +101,40 @@ def split_nodes_delimiter(
         if node.text_type is not TextType.TEXT:
             new_nodes.append(node)
             continue
-
-        parts = node.text.split(delimiter)
-
-        if (len(parts) - 1) % 2 != 0:
-            raise ValueError(f"There was no closing delimiter for {delimiter=}")
-
         new_nodes.extend(
-            [
-                TextNode(sec, text_type)
-                if (idx + 1) % 2 == 0
-                else TextNode(sec, TextType.TEXT)
-                for idx, sec in enumerate(parts)
-                if sec
-            ]
+            tokenize(node.text, {delimiter: text_type}, images=False, links=False)
         )
     return new_nodes
 
 
 def extract_markdown_images(text: str):
-    matches = re.findall(r"\!\[(.+?)\]\((.+?)\)", text)
+    matches = IMAGE_PATTERN.findall(text)
     return matches
 
 
 def extract_markdown_urls(text: str):
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = LINK_PATTERN.findall(text)
     return matches
 
 
-def split_nodes_pattern(old_nodes, func, text_type):
+def split_nodes_pattern(old_nodes, text_type):
     new_nodes = []
-    pattern = "!" if text_type == TextType.IMAGE else ""
-
+    images = text_type == TextType.IMAGE
     for node in old_nodes:
-        text = node.text
-        urls = func(text)
-        if not urls:
+        if node.text_type is not TextType.TEXT:
             new_nodes.append(node)
             continue
-        for name, url in urls:
-            section = text.split(f"{pattern}[{name}]({url})", maxsplit=1)
-            if section[0] not in ("", " "):
-                new_nodes.append(TextNode(section[0], TextType.TEXT))
-            if len(section) == 1:
-                text = ""
-                break
-            new_nodes.append(TextNode(name, text_type, url))
-            text = section[-1]
-        if text not in ("", " "):
-            new_nodes.append(TextNode(text, TextType.TEXT))
+        nodes = tokenize(node.text, {}, images=images, links=not images)
+        if any(new_node.text_type is text_type for new_node in nodes):
+            new_nodes.extend(nodes)
+        else:
+            new_nodes.append(node)
     return new_nodes
 
 
 def split_nodes_link(old_nodes: List[TextNode]) -> List[TextNode]:
-    return split_nodes_pattern(
-        old_nodes,
-        func=extract_markdown_urls,
-        text_type=TextType.LINK,
-    )
+    return split_nodes_pattern(old_nodes, text_type=TextType.LINK)
 
 
 def split_nodes_image(old_nodes: List[TextNode]) -> List[TextNode]:
-    return split_nodes_pattern(
-        old_nodes,
-        func=extract_markdown_images,
-        text_type=TextType.IMAGE,
-    )
+    return split_nodes_pattern(old_nodes, text_type=TextType.IMAGE)
@@ -0,0 +1,103 @@
+import os
+import posixpath
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import unquote
+
+from urls import URL_ATTRIBUTE
+
+# Links with a scheme (https:, mailto:, data:) leave the site and are not
+# checked.
+SCHEME = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+def page_links(html: str) -> Set[str]:
+    return {match.group(2) for match in URL_ATTRIBUTE.finditer(html)}
+
+
+def scan_links(chunks: Iterable[str], links: Set[str]) -> Iterator[str]:
+    # Passes HTML through unchanged, adding the href/src of every tag in it
+    # to `links`; chunks are whole tags, as serialization yields them.
+    for chunk in chunks:
+        links.update(match.group(2) for match in URL_ATTRIBUTE.finditer(chunk))
+        yield chunk
+
+
+def output_path(dest: str, dest_root: str) -> str:
+    return os.path.relpath(dest, dest_root).replace(os.sep, "/")
+
+
+class LinkChecker:
+    # Checks emitted links against the set of files the build publishes, so
+    # every link is a few set lookups however large the site is.
+    def __init__(self, base_path: str, targets: Iterable[str]) -> None:
+        self.base_path: str = base_path
+        self.targets: Set[str] = set(targets)
+
+    def target(self, url: str, page: str) -> Optional[str]:
+        # Output path `url` points at from `page` (both relative to the output
+        # root), "" for a path outside the site, None when it is not checked.
+        if url.startswith("//") or SCHEME.match(url):
+            return None
+        path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+        if not path:
+            return None
+        if path.startswith("/"):
+            if not path.startswith(self.base_path):
+                return ""
+            path = path[len(self.base_path) :]
+        else:
+            path = posixpath.join(posixpath.dirname(page), path)
+        directory = not path or path.endswith("/")
+        path = posixpath.normpath(path or ".")
+        if path == ".." or path.startswith("../"):
+            return ""
+        if path == ".":
+            return "index.html"
+        return f"{path}/index.html" if directory else path
+
+    def resolves(self, path: str) -> bool:
+        # Servers answer /dir and /page with dir/index.html and page.html.
+        return (
+            path in self.targets
+            or f"{path}.html" in self.targets
+            or f"{path}/index.html" in self.targets
+        )
+
+    def broken(self, page: str, links: Iterable[str]) -> List[str]:
+        broken = []
+        for url in links:
+            path = self.target(url, page)
+            if path is not None and not (path and self.resolves(path)):
+                broken.append(url)
+        return sorted(broken)
+
+
+class LinkReport:
+    def __init__(self) -> None:
+        self.pages: int = 0
+        self.links: int = 0
+        self.broken: Dict[str, List[str]] = {}
+
+    def check(
+        self,
+        checker: LinkChecker,
+        page: str,
+        links: List[str],
+        name: Optional[str] = None,
+    ) -> None:
+        # Reported under `name`, the file the links are in, when given.
+        self.pages += 1
+        self.links += len(links)
+        broken = checker.broken(page, links)
+        if broken:
+            self.broken[name or page] = broken
+
+    def __str__(self) -> str:
+        count = sum(len(urls) for urls in self.broken.values())
+        lines = [
+            f"Links: {self.links} checked on {self.pages} page(s), {count} broken"
+        ]
+        for page, urls in sorted(self.broken.items()):
+            lines.append(f"  {page}: {', '.join(urls)}")
+        return "\n".join(lines)
@@ -0,0 +1,100 @@
+from typing import Iterable, List, Union
+
+from block_parser import BlockType, list_marker
+
+
+class ListItem:
+    __slots__ = ("parts",)
+
+    def __init__(self) -> None:
+        # Paragraphs (lists of lines) and nested lists, in document order.
+        self.parts: List[Union[List[str], "ListBlock"]] = []
+
+    def add_text(self, text: str, paragraph: bool = False) -> None:
+        if paragraph or not self.parts or not isinstance(self.parts[-1], list):
+            self.parts.append([text])
+        else:
+            self.parts[-1].append(text)
+
+    def __repr__(self) -> str:
+        return f"ListItem({self.parts})"
+
+
+class ListBlock:
+    __slots__ = ("list_type", "start", "indent", "items", "loose")
+
+    def __init__(self, list_type: BlockType, start: int = 1, indent: int = 0) -> None:
+        self.list_type: BlockType = list_type
+        self.start: int = start
+        self.indent: int = indent
+        self.items: List[ListItem] = []
+        self.loose: bool = False
+
+    @property
+    def ordered(self) -> bool:
+        return self.list_type == BlockType.ORDERED_LIST
+
+    def add_item(self, text: str) -> ListItem:
+        item = ListItem()
+        if text:
+            item.add_text(text)
+        self.items.append(item)
+        return item
+
+    def __repr__(self) -> str:
+        loose = ", loose" if self.loose else ""
+        return f"ListBlock({self.list_type}, start={self.start}{loose}, {self.items})"
+
+
+def new_list(list_type: BlockType, number: int, indent: int) -> ListBlock:
+    start = number if list_type == BlockType.ORDERED_LIST else 1
+    return ListBlock(list_type, start, indent)
+
+
+def parse_list(lines: Iterable[str]) -> ListBlock:
+    # One pass over the lines with a stack of the lists that are still open,
+    # innermost last; a list is closed once a line is indented less than it.
+    stack: List[ListBlock] = []
+    blank = False
+    for line in lines:
+        text = line.lstrip()
+        if not text:
+            blank = bool(stack)
+            continue
+        indent = len(line) - len(text)
+        marker = list_marker(text)
+        if not stack:
+            if marker is None:
+                raise ValueError(f"Not a list item: {line!r}")
+            stack.append(new_list(marker[0], marker[1], indent))
+        if marker is None:
+            while len(stack) > 1 and stack[-1].indent >= indent:
+                stack.pop()
+            current = stack[-1]
+            current.loose = current.loose or blank
+            if not current.items:
+                current.add_item("")
+            current.items[-1].add_text(text, paragraph=blank)
+            blank = False
+            continue
+        list_type, number, offset = marker
+        while len(stack) > 1 and stack[-1].indent > indent:
+            stack.pop()
+        current = stack[-1]
+        if current.indent == indent and current.list_type != list_type:
+            if len(stack) > 1:
+                stack.pop()
+            current = stack[-1]
+        if current.indent < indent or current.list_type != list_type:
+            nested = new_list(list_type, number, indent)
+            if not current.items:
+                current.add_item("")
+            current.items[-1].parts.append(nested)
+            stack.append(nested)
+            current = nested
+        current.loose = current.loose or (blank and bool(current.items))
+        current.add_item(text[offset:].strip())
+        blank = False
+    if not stack:
+        raise ValueError("List block has no items")
+    return stack[0]
@@ -1,21 +1,239 @@
+import argparse
+import cProfile
 import os
-from file_handler import move
-from generator import generate_pages_recursively
+import signal
 import sys
+from builder import BLOCK_CACHE_DIR, PAGE_CACHE_DIR, SEARCH_CACHE, Builder
+from client import SOCKET_PATH
+from daemon import BuildDaemon
+from file_handler import PUBLISH_STRATEGIES
+from generator import STREAM_THRESHOLD, BuildError
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    arg_parser = argparse.ArgumentParser(description="Build the static site")
+    arg_parser.add_argument("base_path", nargs="?", default="/")
+    arg_parser.add_argument(
+        "--content", default="content", help="markdown sources (default: content)"
+    )
+    arg_parser.add_argument(
+        "--static", default="static", help="assets copied as is (default: static)"
+    )
+    arg_parser.add_argument(
+        "--output", default="docs", help="where the site is written (default: docs)"
+    )
+    arg_parser.add_argument(
+        "--template",
+        default="template.html",
+        help="page template (default: template.html)",
+    )
+    arg_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="wipe the output directory and regenerate every page",
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages in a pool of N worker processes (0 = one per CPU)",
+    )
+    arg_parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static assets by content hash instead of mtime",
+    )
+    arg_parser.add_argument(
+        "--publish",
+        choices=PUBLISH_STRATEGIES,
+        default="auto",
+        help="how static assets are placed in the output (default: auto)",
+    )
+    arg_parser.add_argument(
+        "--block-cache",
+        type=int,
+        default=4096,
+        metavar="N",
+        help="keep up to N rendered blocks in memory (0 disables the cache)",
+    )
+    arg_parser.add_argument(
+        "--no-disk-cache",
+        action="store_true",
+        help="do not persist rendered pages (or blocks) under .build/ between builds",
+    )
+    arg_parser.add_argument(
+        "--disk-block-cache",
+        action="store_true",
+        help="also persist every rendered block under .build/blocks/ (one file "
+        "per block, kept until --full)",
+    )
+    arg_parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="publish static assets as name.<hash>.ext, link pages to those names "
+        "and write asset-manifest.json",
+    )
+    arg_parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify generated HTML and published CSS (<pre> content is kept)",
+    )
+    arg_parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write .gz copies of HTML, CSS and other text files next to them",
+    )
+    arg_parser.add_argument(
+        "--gzip-min-size",
+        type=int,
+        default=1024,
+        metavar="BYTES",
+        help="only compress files of at least BYTES (default: 1024)",
+    )
+    arg_parser.add_argument(
+        "--no-listings",
+        action="store_true",
+        help="do not generate the blog index, tag pages and feed.xml",
+    )
+    arg_parser.add_argument(
+        "--site-url",
+        default="",
+        metavar="URL",
+        help="scheme and host the site is served from (e.g. https://example.com), "
+        "prepended to links in feed.xml, which is only written when this is set",
+    )
+    arg_parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a sharded search index of every page under docs/search/",
+    )
+    arg_parser.add_argument(
+        "--no-link-check",
+        action="store_true",
+        help="do not report links and images that point at no page or asset",
+    )
+    arg_parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        default=STREAM_THRESHOLD,
+        metavar="BYTES",
+        help="render markdown files of at least BYTES block by block without "
+        f"reading them into memory (default: {STREAM_THRESHOLD})",
+    )
+    arg_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="report what would be copied, generated or removed and exit",
+    )
+    arg_parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="do not print a line for every generated page",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        metavar="REPORT",
+        help="time each build phase per page and write a .json or .csv report",
+    )
+    arg_parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="with --profile, also trace the peak bytes allocated in each phase "
+        "(several times slower)",
+    )
+    arg_parser.add_argument(
+        "--cprofile",
+        metavar="STATS",
+        help="dump cProfile stats for the build (main process only) to this file",
+    )
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild pages and assets as sources change",
+    )
+    arg_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="watch by polling the file tree instead of using inotify",
+    )
+    arg_parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="keep running as a build daemon for src/client.py, listening on "
+        "the --socket path",
+    )
+    arg_parser.add_argument(
+        "--socket",
+        default=SOCKET_PATH,
+        metavar="PATH",
+        help=f"Unix socket of the build daemon (default: {SOCKET_PATH})",
+    )
+    return arg_parser.parse_args(args)
+
+
+def create_builder(args: argparse.Namespace) -> Builder:
+    return Builder(
+        args.base_path,
+        static=args.static,
+        public=args.output,
+        content=args.content,
+        template=args.template,
+        workers=args.jobs or os.cpu_count() or 1,
+        checksum=args.checksum,
+        publish=args.publish,
+        quiet=args.quiet,
+        profile=bool(args.profile),
+        trace_memory=args.profile_memory,
+        cache_size=args.block_cache,
+        cache_dir=(
+            BLOCK_CACHE_DIR
+            if args.disk_block_cache and not args.no_disk_cache
+            else None
+        ),
+        page_cache_dir=None if args.no_disk_cache else PAGE_CACHE_DIR,
+        gzip_threshold=args.gzip_min_size if args.gzip else None,
+        minify=args.minify,
+        fingerprint=args.fingerprint,
+        stream_threshold=args.stream_threshold,
+        listings=not args.no_listings,
+        site_url=args.site_url,
+        search_cache=SEARCH_CACHE if args.search else None,
+        check_links=not args.no_link_check,
+    )
 
 
 def main() -> None:
-    args = sys.argv
-    if len(args) > 1:
-        base_path = args[-1]
-    else:
-        base_path = "/"
-    print(base_path)
-    static = "./static"
-    public = "./docs"
-    move(static, public)
-
-    generate_pages_recursively(base_path)
+    args = parse_args()
+    print(args.base_path)
+    builder = create_builder(args)
+    if args.serve:
+        # Stopped with SIGTERM, the daemon still removes its socket.
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        BuildDaemon(builder, args.socket, vars(args), parse_args).serve()
+        return
+    profiler = cProfile.Profile() if args.cprofile else None
+    try:
+        if profiler is not None:
+            profiler.runcall(builder.build, full=args.full, dry_run=args.dry_run)
+        else:
+            builder.build(full=args.full, dry_run=args.dry_run)
+    except BuildError as e:
+        if not args.watch:
+            sys.exit(str(e))
+        print(e)
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(args.cprofile)
+        if builder.profile is not None:
+            builder.profile.write(args.profile)
+            print(builder.profile)
+    if args.watch and not args.dry_run:
+        try:
+            builder.watch(polling=args.poll)
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":
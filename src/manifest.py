@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: Optional[str] = path
+        self.template: Optional[str] = None
+        self.base_path: Optional[str] = None
+        self.settings: dict = {}
+        self.pages: Dict[str, dict] = {}
+        self.assets: List[str] = []
+        self.fingerprints: Dict[str, dict] = {}
+        # How each minified asset was made (file_handler.minify_stamp).
+        self.minified: Dict[str, str] = {}
+        # Front matter and titles of pages, and digests of the listing pages
+        # and feed generated from them.
+        self.index: Dict[str, dict] = {}
+        self.listings: Dict[str, str] = {}
+        # The --gzip-min-size the output was last compressed with, if any.
+        self.gzip: Optional[int] = None
+
+    @classmethod
+    def load(cls, path: str) -> "Manifest":
+        manifest = cls(path)
+        if not os.path.exists(path):
+            return manifest
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return manifest
+        manifest.template = data.get("template")
+        manifest.base_path = data.get("base_path")
+        manifest.settings = data.get("settings", {})
+        manifest.pages = data.get("pages", {})
+        manifest.assets = data.get("assets", [])
+        manifest.fingerprints = data.get("fingerprints", {})
+        manifest.minified = data.get("minified", {})
+        manifest.index = data.get("index", {})
+        manifest.listings = data.get("listings", {})
+        manifest.gzip = data.get("gzip")
+        return manifest
+
+    def save(self) -> None:
+        if not self.path:
+            raise ValueError("Path not set for saving manifest")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "template": self.template,
+            "base_path": self.base_path,
+            "settings": self.settings,
+            "pages": self.pages,
+            "assets": self.assets,
+            "fingerprints": self.fingerprints,
+            "minified": self.minified,
+            "index": self.index,
+            "listings": self.listings,
+            "gzip": self.gzip,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def inputs_changed(
+        self, template_digest: str, base_path: str, settings: Optional[dict] = None
+    ) -> bool:
+        return (
+            self.template != template_digest
+            or self.base_path != base_path
+            or self.settings != (settings or {})
+        )
+
+    def is_fresh(self, src: str, digest: str, dest: str) -> bool:
+        entry = self.pages.get(src)
+        return (
+            entry is not None
+            and entry.get("hash") == digest
+            and entry.get("dest") == dest
+            and os.path.exists(dest)
+        )
+
+    def record(
+        self, src: str, digest: str, dest: str, links: Optional[List[str]] = None
+    ) -> None:
+        self.pages[src] = {"hash": digest, "dest": dest}
+        if links is not None:
+            self.pages[src]["links"] = links
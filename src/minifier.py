@@ -0,0 +1,175 @@
+import re
+import time
+from typing import Dict, Iterable, List, TextIO
+
+# Bump when the minified output for the same input changes, so pages and
+# assets minified by earlier builds are minified again.
+MINIFIER_VERSION = "2"
+
+TAG_NAME = re.compile(r"<(/?)([a-zA-Z][\w-]*)")
+WHITESPACE = re.compile(r"\s+")
+# Elements whose content is whitespace-sensitive or not HTML at all.
+RAW_ELEMENTS = ("pre", "textarea", "script", "style")
+# Elements that start a new line box (or are not rendered at all), so
+# whitespace next to their tags is never displayed.
+BLOCK_ELEMENTS = frozenset(
+    "address article aside base blockquote body br dd details dialog div dl dt "
+    "fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 head header hgroup "
+    "hr html li link main meta nav ol option p pre script section style summary "
+    "table tbody td tfoot th thead title tr ul".split()
+)
+
+CSS_TOKEN = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)|([^"'/\s]+|/)""",
+    re.S,
+)
+CSS_TIGHT = re.compile(r"\s*([{};,>])\s*")
+CSS_COLON = re.compile(r":\s+")
+
+
+class HtmlMinifier:
+    # Collapses whitespace between and inside text runs and drops comments,
+    # fed one chunk at a time. Whitespace-only runs next to a block-level tag
+    # (or the start or end of the document) are removed, other runs become
+    # one space; the content of <pre> and the other RAW_ELEMENTS is passed
+    # through untouched.
+    def __init__(self) -> None:
+        self.buffer: str = ""
+        self.raw: str = ""
+        # Whether the last tag written was block-level.
+        self.block: bool = True
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        return "".join(self.tokens(final=False))
+
+    def close(self) -> str:
+        return "".join(self.tokens(final=True))
+
+    def tokens(self, final: bool) -> Iterable[str]:
+        buffer, position, length = self.buffer, 0, len(self.buffer)
+        while position < length:
+            if buffer.startswith("<!--", position):
+                end = buffer.find("-->", position + 4)
+                end = end + 3 if end >= 0 else -1
+            elif buffer[position] == "<":
+                end = buffer.find(">", position)
+                end = end + 1 if end >= 0 else -1
+            else:
+                end = buffer.find("<", position)
+                if end < 0 and final:
+                    end = length
+            if end < 0:
+                if not final:
+                    break
+                end = length
+            token = buffer[position:end]
+            if not self.raw and token.isspace() and not self.block:
+                # Kept as a space unless the next tag is block-level.
+                close = buffer.find(">", end)
+                if close < 0 and not final:
+                    break
+                if end == length or is_block_tag(buffer[end : close + 1]):
+                    token = ""
+            yield self.token(token)
+            position = end
+        self.buffer = buffer[position:]
+
+    def token(self, token: str) -> str:
+        if token.startswith("<"):
+            match = TAG_NAME.match(token)
+            if match is not None:
+                closing, name = match.group(1), match.group(2).lower()
+                if not self.raw and not closing and name in RAW_ELEMENTS:
+                    self.raw = name
+                elif self.raw == name and closing:
+                    self.raw = ""
+                self.block = name in BLOCK_ELEMENTS
+                return token
+            if token.startswith("<!--") and not token.startswith("<!--["):
+                return "" if not self.raw else token
+            # A doctype or processing instruction.
+            self.block = True
+            return token
+        if self.raw or not token:
+            return token
+        if token.isspace():
+            return "" if self.block else " "
+        self.block = False
+        return WHITESPACE.sub(" ", token)
+
+
+def is_block_tag(token: str) -> bool:
+    match = TAG_NAME.match(token)
+    return match is not None and match.group(2).lower() in BLOCK_ELEMENTS
+
+
+class MinifyingWriter:
+    # File-like wrapper that minifies everything written through it and
+    # counts the bytes and time spent.
+    def __init__(self, fp: TextIO) -> None:
+        self.fp: TextIO = fp
+        self.minifier = HtmlMinifier()
+        self.input_bytes: int = 0
+        self.output_bytes: int = 0
+        self.seconds: float = 0.0
+
+    def write(self, text: str) -> None:
+        start = time.perf_counter()
+        output = self.minifier.feed(text)
+        self.seconds += time.perf_counter() - start
+        self.input_bytes += len(text.encode())
+        self.output_bytes += len(output.encode())
+        self.fp.write(output)
+
+    def writelines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+    def close(self) -> None:
+        start = time.perf_counter()
+        output = self.minifier.close()
+        self.seconds += time.perf_counter() - start
+        self.output_bytes += len(output.encode())
+        self.fp.write(output)
+
+    def counts(self) -> Dict[str, int]:
+        return minify_counts(self.input_bytes, self.output_bytes, self.seconds)
+
+
+def minify_html(html: str) -> str:
+    minifier = HtmlMinifier()
+    return minifier.feed(html) + minifier.close()
+
+
+def tighten_css(text: str) -> str:
+    text = CSS_TIGHT.sub(r"\1", text)
+    return CSS_COLON.sub(":", text).replace(";}", "}")
+
+
+def minify_css(css: str) -> str:
+    # Comments go, whitespace collapses and is removed around punctuation;
+    # quoted strings are copied unchanged.
+    output: List[str] = []
+    text: List[str] = []
+    for string, _, space, other in CSS_TOKEN.findall(css):
+        if string:
+            output.append(tighten_css("".join(text)))
+            output.append(string)
+            text.clear()
+        elif space:
+            text.append(" ")
+        elif other:
+            text.append(other)
+    output.append(tighten_css("".join(text)))
+    return "".join(output).strip()
+
+
+def minify_counts(
+    input_bytes: int, output_bytes: int, seconds: float
+) -> Dict[str, int]:
+    return {
+        "minify_input_bytes": input_bytes,
+        "minify_output_bytes": output_bytes,
+        "minify_ns": int(seconds * 1e9),
+    }
@@ -0,0 +1,59 @@
+import hashlib
+import marshal
+import os
+import zlib
+from typing import Dict, Optional, Tuple
+
+from block_parser import PARSER_VERSION
+from file_handler import atomic_open
+
+
+class PageCache:
+    # Keeps the title and rendered body of every source file, so a page
+    # whose markdown is unchanged only needs its template filled again.
+    # Entries stay in memory too, so long-running processes skip the disk.
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.entries: Dict[str, Tuple[str, str, str]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def entry_path(self, source: str) -> str:
+        name = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.path, f"{name}.bin")
+
+    def load(self, source: str, digest: str) -> Optional[Tuple[str, str]]:
+        entry = self.entries.get(source)
+        if entry is not None and entry[0] == digest:
+            self.hits += 1
+            return entry[1], entry[2]
+        try:
+            with open(self.entry_path(source), "rb") as file:
+                entry = marshal.loads(zlib.decompress(file.read()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            entry = None
+        if entry is None or entry[:2] != (PARSER_VERSION, digest):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries[source] = (digest, entry[2], entry[3])
+        return entry[2], entry[3]
+
+    def store(self, source: str, digest: str, title: str, body: str) -> None:
+        self.entries[source] = (digest, title, body)
+        os.makedirs(self.path, exist_ok=True)
+        data = marshal.dumps((PARSER_VERSION, digest, title, body))
+        with atomic_open(self.entry_path(source), "wb") as file:
+            file.write(zlib.compress(data, 1))
+
+    def remove(self, source: str) -> None:
+        self.entries.pop(source, None)
+        try:
+            os.remove(self.entry_path(source))
+        except FileNotFoundError:
+            pass
+
+    def take_counts(self) -> Dict[str, int]:
+        counts = {"page_cache_hits": self.hits, "page_cache_misses": self.misses}
+        self.hits = self.misses = 0
+        return counts
@@ -1,42 +1,86 @@
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 import re
-from inline_parser import text_to_textnodes
+from inline_parser import has_inline_markup, text_to_textnodes
 from textnode import TextNode, TextType, text_node_to_html_node
-from htmlnode import HTMLNode, LeafNode, ParentNode
-from block_parser import (
-    BlockType,
-    block_to_block_type,
-    markdown_to_blocks,
-)
+from htmlnode import LeafNode, ParentNode, Resolver
+from profiler import PageProfile
+from list_parser import ListBlock, parse_list
+from block_cache import BlockCache
+from urls import URL_MARK, mark_url, resolve_marked
+from block_parser import BlockType, scan_blocks
+
+
+TITLE = re.compile(r"\#\s(.+?)\s")
 
 
 def extract_title(md: str) -> str:
     if "# " not in md:
         raise ValueError("No title")
-    return re.findall(r"\#\s(.+?)\s", md)[0]
+    return TITLE.findall(md)[0]
+
+
+def stream_title(lines: Iterable[str]) -> str:
+    # extract_title for a source read line by line (with line endings kept);
+    # stops reading at the first match.
+    for line in lines:
+        match = TITLE.search(line)
+        if match is not None:
+            return match.group(1)
+    raise ValueError("No title")
+
+
+NESTED_TYPES = (TextType.BOLD, TextType.ITALIC, TextType.LINK)
+
 
+def text_to_child(text: str, strict: bool = True) -> List[LeafNode | ParentNode]:
+    text_nodes = text_to_textnodes(text, strict=strict)
 
-def text_to_child(text: str) -> List[LeafNode]:
-    text_nodes = text_to_textnodes(text)
+    return [inline_to_html_node(text_node) for text_node in text_nodes]
 
-    return [text_node_to_html_node(text_node) for text_node in text_nodes]
+
+def inline_to_html_node(text_node: TextNode) -> LeafNode | ParentNode:
+    html_node = text_node_to_html_node(text_node)
+    if text_node.text_type not in NESTED_TYPES or not has_inline_markup(
+        text_node.text
+    ):
+        return html_node
+    children = text_to_child(text_node.text, strict=False)
+    if not children or (len(children) == 1 and not children[0].tag):
+        return html_node
+    return ParentNode(tag=html_node.tag, children=children, props=html_node.props)
+
+
+def text_to_html(tag: str, text: str) -> ParentNode | LeafNode:
+    children = text_to_child(text)
+    return ParentNode(tag=tag, children=children) if children else LeafNode(tag, text)
+
+
+def list_to_html(list_block: ListBlock) -> ParentNode:
+    items = []
+    for item in list_block.items:
+        children = []
+        for part in item.parts:
+            if isinstance(part, ListBlock):
+                children.append(list_to_html(part))
+            elif list_block.loose:
+                children.append(text_to_html("p", " ".join(part)))
+            else:
+                children.extend(text_to_child(" ".join(part)))
+        items.append(
+            ParentNode(tag="li", children=children) if children else LeafNode("li", "")
+        )
+    props = None
+    if list_block.ordered and list_block.start != 1:
+        props = {"start": str(list_block.start)}
+    tag = "ol" if list_block.ordered else "ul"
+    return ParentNode(tag=tag, children=items, props=props)
 
 
 def list_handler(
     block: str, tag: str = "li", sep: str = "- "
 ) -> List[ParentNode | LeafNode]:
     final_list = []
-    if sep == "ol":
-        seps = re.findall(r"(\d.\s)", block, re.MULTILINE)
-        temp = [block]
-        for i in seps:
-            for j in temp:
-                if i in j:
-                    temp.extend(j.split(i))
-                    temp.remove(j)
-        lines = temp
-    else:
-        lines = block.split(sep)
+    lines = block.split(sep)
     for li in lines:
         if li:
             nodes = text_to_child(li)
@@ -67,12 +111,8 @@ def block_to_html(block_type: BlockType, block: str) -> LeafNode | ParentNode:
     match block_type:
         case BlockType.HEADING:
             return header_handler(block)
-        case BlockType.ORDERED_LIST:
-            return ParentNode(
-                tag="ol", children=list_handler(block, tag="li", sep="ol")
-            )
-        case BlockType.UNORDERED_LIST:
-            return ParentNode(tag="ul", children=list_handler(block, tag="li"))
+        case BlockType.ORDERED_LIST | BlockType.UNORDERED_LIST:
+            return list_to_html(parse_list(block.split("\n")))
         case BlockType.QUOTE:
             return ParentNode(
                 tag="blockquote", children=list_handler(block, tag="q", sep=">")
@@ -90,16 +130,79 @@ def block_to_html(block_type: BlockType, block: str) -> LeafNode | ParentNode:
     )
 
 
-def markdown_to_html_node(markdown: str):
-    parent = ParentNode(tag="div")
-    parent.children = []
-    blocks = markdown_to_blocks(markdown.strip())
-    for block in blocks:
-        block = block.strip()
-        block_type = block_to_block_type(block)
+LINE_TYPES = (BlockType.CODE, BlockType.ORDERED_LIST, BlockType.UNORDERED_LIST)
+
+
+def typed_blocks(lines: Iterable[str]) -> Iterator[tuple]:
+    empty = True
+    for block in scan_blocks(lines):
+        empty = False
+        if block.block_type in LINE_TYPES:
+            yield block.block_type, block.text
+        else:
+            yield block.block_type, " ".join(block.lines)
+    if empty:
+        # Blank markdown still renders as one empty paragraph.
+        yield BlockType.PARAGRAPH, ""
+
+
+def marked_fragment(block_type: BlockType, block: str) -> str:
+    return block_to_html(block_type, block).to_html(mark_url)
+
+
+def cached_block(
+    cache: BlockCache, block_type: BlockType, block: str, resolve: Optional[Resolver]
+) -> str:
+    # Fragments are cached with their URLs marked instead of resolved, so
+    # they are reused whatever the base path and asset names.
+    if URL_MARK in block:
+        return block_to_html(block_type, block).to_html(resolve)
+    return resolve_marked(cache.render(block_type, block, marked_fragment), resolve)
+
+
+def blocks_to_html(
+    blocks: Iterable[tuple],
+    cache: Optional[BlockCache] = None,
+    resolve: Optional[Resolver] = None,
+) -> ParentNode:
+    if cache is None:
+        return ParentNode(tag="div", children=[block_to_html(*b) for b in blocks])
+
+    # Cached blocks are kept as their serialized HTML in untagged leaves, so
+    # their URLs are resolved here rather than when the tree is serialized.
+    children = [LeafNode(value=cached_block(cache, *b, resolve)) for b in blocks]
+    return ParentNode(tag="div", children=children)
+
+
+def iter_markdown_html(
+    lines: Iterable[str],
+    cache: Optional[BlockCache] = None,
+    resolve: Optional[Resolver] = None,
+) -> Iterator[str]:
+    # The HTML of markdown_to_html_node(...).to_html(resolve), produced one
+    # block at a time: only the block being rendered is held in memory, never
+    # the whole document or its node tree.
+    yield "<div>"
+    for block_type, block in typed_blocks(lines):
+        if cache is None:
+            yield from block_to_html(block_type, block).iter_html(resolve)
+        else:
+            yield cached_block(cache, block_type, block, resolve)
+    yield "</div>"
+
 
-        if block_type != BlockType.CODE:
-            block = block.replace("\n", " ")
-        html_block = block_to_html(block_type, block)
-        parent.children.append(html_block)
-    return parent
+def markdown_to_html_node(
+    markdown: str,
+    profile: Optional[PageProfile] = None,
+    cache: Optional[BlockCache] = None,
+    resolve: Optional[Resolver] = None,
+):
+    # `resolve` is only needed with a cache: other nodes resolve their URLs
+    # when serialized with one.
+    lines = markdown.split("\n")
+    if profile is None:
+        return blocks_to_html(typed_blocks(lines), cache, resolve)
+    with profile.phase("blocks"):
+        blocks = list(typed_blocks(lines))
+    with profile.phase("inline"):
+        return blocks_to_html(blocks, cache, resolve)
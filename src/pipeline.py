@@ -0,0 +1,209 @@
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# Outcome of one item: its index in the input, an error message if a stage
+# failed, and what the render stage produced for it.
+PipelineResult = Tuple[int, Optional[str], Any]
+
+_DONE = object()
+
+
+def describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def _timed(fn: Callable, *args) -> Tuple[int, Any]:
+    # Runs in worker processes, so render time is measured where it is spent.
+    start = time.perf_counter_ns()
+    value = fn(*args)
+    return time.perf_counter_ns() - start, value
+
+
+class MeteredQueue(queue.Queue):
+    # Bounded queue that samples its depth every time an item is added.
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize)
+        self.depth_total: int = 0
+        self.samples: int = 0
+        self.max_depth: int = 0
+
+    def _put(self, item) -> None:
+        # Called with the queue's mutex held.
+        super()._put(item)
+        if item is _DONE:
+            return
+        depth = len(self.queue)
+        self.depth_total += depth
+        self.samples += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    def counts(self, name: str) -> Dict[str, int]:
+        return {
+            f"pipeline_{name}_queue_total": self.depth_total,
+            f"pipeline_{name}_queue_samples": self.samples,
+            f"pipeline_{name}_queue_max": self.max_depth,
+        }
+
+
+class Stage:
+    def __init__(self, name: str, workers: int) -> None:
+        self.name: str = name
+        self.workers: int = workers
+        self.busy_ns: int = 0
+        self.lock = threading.Lock()
+
+    def add(self, ns: int) -> None:
+        with self.lock:
+            self.busy_ns += ns
+
+    def run(self, fn: Callable, *args) -> Any:
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args)
+        finally:
+            self.add(time.perf_counter_ns() - start)
+
+    def counts(self, wall_ns: int) -> Dict[str, int]:
+        return {
+            f"pipeline_{self.name}_ns": self.busy_ns,
+            f"pipeline_{self.name}_capacity_ns": wall_ns * self.workers,
+        }
+
+
+class Pipeline:
+    # Overlaps the three steps of producing a file, so slow disks are read
+    # from and written to while pages render: reader threads load inputs
+    # ahead of the render stage, which runs in the calling thread or on
+    # `executor`, and writer threads put its output on disk. The queues in
+    # between hold at most `depth` items, which bounds memory.
+    def __init__(
+        self,
+        read: Callable[[Any], Any],
+        render: Callable[[Any, Any], Any],
+        write: Callable[[Any, Any], None],
+        readers: int = 4,
+        writers: int = 4,
+        depth: int = 16,
+        executor: Optional[Executor] = None,
+        render_workers: int = 1,
+    ) -> None:
+        self.read = read
+        self.render = render
+        self.write = write
+        self.depth: int = depth
+        self.executor: Optional[Executor] = executor
+        self.reading = Stage("read", readers)
+        self.rendering = Stage("render", render_workers if executor else 1)
+        self.writing = Stage("write", writers)
+        self.loaded = MeteredQueue(depth)
+        self.rendered = MeteredQueue(depth)
+        self.wall_ns: int = 0
+
+    def run(self, items: Sequence[Any]) -> Iterator[PipelineResult]:
+        start = time.perf_counter_ns()
+        sources: queue.Queue = queue.Queue()
+        for entry in enumerate(items):
+            sources.put(entry)
+        results: queue.Queue = queue.Queue()
+        threads = [
+            threading.Thread(target=self.read_loop, args=(sources,), daemon=True)
+            for _ in range(self.reading.workers)
+        ] + [
+            threading.Thread(target=self.write_loop, args=(results,), daemon=True)
+            for _ in range(self.writing.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        for _ in self.render_loop(len(items)):
+            while not results.empty():
+                finished += 1
+                yield results.get()
+        for _ in range(self.writing.workers):
+            self.rendered.put(_DONE)
+        while finished < len(items):
+            finished += 1
+            yield results.get()
+        for thread in threads:
+            thread.join()
+        self.wall_ns += time.perf_counter_ns() - start
+
+    def read_loop(self, sources: queue.Queue) -> None:
+        while True:
+            try:
+                index, item = sources.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self.loaded.put((index, item, None, self.reading.run(self.read, item)))
+            except Exception as e:
+                self.loaded.put((index, item, describe(e), None))
+
+    def render_loop(self, count: int) -> Iterator[None]:
+        # Yields after every rendered item so the caller can collect results.
+        if self.executor is None:
+            for _ in range(count):
+                index, item, error, data = self.loaded.get()
+                value = None
+                if error is None:
+                    try:
+                        value = self.rendering.run(self.render, item, data)
+                    except Exception as e:
+                        error = describe(e)
+                self.rendered.put((index, item, error, value))
+                yield
+            return
+
+        # A couple of pages per worker in flight keeps every process busy
+        # without letting rendered pages pile up ahead of the writers.
+        limit = self.rendering.workers * 2
+        pending: Dict[Any, Tuple[int, Any]] = {}
+        received = 0
+        while received < count or pending:
+            while received < count and len(pending) < limit:
+                index, item, error, data = self.loaded.get()
+                received += 1
+                if error is not None:
+                    self.rendered.put((index, item, error, None))
+                    continue
+                future = self.executor.submit(_timed, self.render, item, data)
+                pending[future] = (index, item)
+            if not pending:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, item = pending.pop(future)
+                try:
+                    ns, value = future.result()
+                except Exception as e:
+                    self.rendered.put((index, item, describe(e), None))
+                else:
+                    self.rendering.add(ns)
+                    self.rendered.put((index, item, None, value))
+            yield
+
+    def write_loop(self, results: queue.Queue) -> None:
+        while True:
+            entry = self.rendered.get()
+            if entry is _DONE:
+                return
+            index, item, error, value = entry
+            if error is None:
+                try:
+                    self.writing.run(self.write, item, value)
+                except Exception as e:
+                    error = describe(e)
+            results.put((index, error, value))
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {"pipeline_wall_ns": self.wall_ns}
+        for stage in (self.reading, self.rendering, self.writing):
+            counts.update(stage.counts(self.wall_ns))
+        counts.update(self.loaded.counts("render"))
+        counts.update(self.rendered.counts("write"))
+        return counts
+
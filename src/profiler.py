@@ -0,0 +1,150 @@
+import csv
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+PHASES = ("read", "blocks", "inline", "serialize", "template", "write")
+
+
+class PageProfile:
+    def __init__(self, page: str, trace_memory: bool = False) -> None:
+        self.page: str = page
+        self.seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        # Net change in live pymalloc blocks over each phase. Cheap enough to
+        # take around every phase, but it does not see large objects (such as
+        # whole-page strings) and is negative when a phase frees more than it
+        # keeps.
+        self.live_blocks: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        # Most memory a phase had allocated at once, traced with tracemalloc,
+        # which slows the build down several times; None when not traced.
+        self.peak_bytes: Optional[Dict[str, int]] = None
+        if trace_memory:
+            self.peak_bytes = dict.fromkeys(PHASES, 0)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        blocks = sys.getallocatedblocks()
+        if self.peak_bytes is not None:
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.live_blocks[name] += sys.getallocatedblocks() - blocks
+            if self.peak_bytes is not None:
+                peak = tracemalloc.get_traced_memory()[1] - traced
+                self.peak_bytes[name] = max(self.peak_bytes[name], peak)
+
+    def to_dict(self) -> dict:
+        record = {
+            "page": self.page,
+            "seconds": self.seconds,
+            "live_blocks": self.live_blocks,
+            "total": sum(self.seconds.values()),
+        }
+        if self.peak_bytes is not None:
+            record["peak_bytes"] = self.peak_bytes
+        return record
+
+
+class BuildProfile:
+    def __init__(self) -> None:
+        self.pages: List[dict] = []
+        self.started: float = time.perf_counter()
+        self.wall_seconds: Optional[float] = None
+
+    def add(self, record: Optional[dict]) -> None:
+        if record is not None:
+            self.pages.append(record)
+
+    def finish(self) -> None:
+        self.wall_seconds = time.perf_counter() - self.started
+
+    def totals(self) -> Dict[str, dict]:
+        seconds = sum(record["total"] for record in self.pages) or 1.0
+        totals = {}
+        for name in PHASES:
+            phase_seconds = sum(record["seconds"][name] for record in self.pages)
+            totals[name] = {
+                "seconds": phase_seconds,
+                "share": phase_seconds / seconds,
+                "live_blocks": sum(
+                    record["live_blocks"][name] for record in self.pages
+                ),
+            }
+            if self.traced():
+                totals[name]["peak_bytes"] = max(
+                    record["peak_bytes"][name] for record in self.pages
+                )
+        return totals
+
+    def traced(self) -> bool:
+        return bool(self.pages) and all(
+            "peak_bytes" in record for record in self.pages
+        )
+
+    def slowest(self, count: int = 10) -> List[dict]:
+        pages = sorted(self.pages, key=lambda record: record["total"], reverse=True)
+        return pages[:count]
+
+    def report(self, count: int = 10) -> dict:
+        return {
+            "pages": len(self.pages),
+            "wall_seconds": self.wall_seconds,
+            "page_seconds": sum(record["total"] for record in self.pages),
+            "phases": self.totals(),
+            "slowest": self.slowest(count),
+        }
+
+    def write(self, path: str, count: int = 10) -> None:
+        if path.endswith(".csv"):
+            self.write_csv(path)
+            return
+        with open(path, "w") as file:
+            json.dump(self.report(count), file, indent=1)
+
+    def write_csv(self, path: str) -> None:
+        header = ["page", "total"]
+        header += [f"{name}_seconds" for name in PHASES]
+        header += [f"{name}_live_blocks" for name in PHASES]
+        traced = self.traced()
+        if traced:
+            header += [f"{name}_peak_bytes" for name in PHASES]
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            for record in self.slowest(len(self.pages)):
+                row = (
+                    [record["page"], f"{record['total']:.6f}"]
+                    + [f"{record['seconds'][name]:.6f}" for name in PHASES]
+                    + [record["live_blocks"][name] for name in PHASES]
+                )
+                if traced:
+                    row += [record["peak_bytes"][name] for name in PHASES]
+                writer.writerow(row)
+
+    def __str__(self) -> str:
+        totals = self.totals()
+        traced = self.traced()
+        header = f"{'phase':10}{'seconds':>10}{'share':>8}{'live blocks':>12}"
+        lines = [header + (f"{'peak bytes':>12}" if traced else "")]
+        for name in PHASES:
+            phase = totals[name]
+            line = (
+                f"{name:10}{phase['seconds']:>10.4f}{phase['share']:>8.1%}"
+                f"{phase['live_blocks']:>12}"
+            )
+            if traced:
+                line += f"{phase['peak_bytes']:>12}"
+            lines.append(line)
+        lines.append("slowest pages:")
+        for record in self.slowest(5):
+            lines.append(f"  {record['total'] * 1000:8.2f} ms  {record['page']}")
+        return "\n".join(lines)
@@ -0,0 +1,240 @@
+import bisect
+import json
+import marshal
+import os
+import re
+import time
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from block_parser import BlockType
+from file_handler import atomic_open
+from inline_parser import text_to_textnodes
+from parser import typed_blocks
+from site_index import split_front_matter
+
+SEARCH_DIR = "search"
+PAGES_FILE = "pages.json"
+SHARD_COUNT = 64
+# Bumped whenever tokenizing or the cache layout changes.
+SEARCH_VERSION = 1
+TOKEN = re.compile(r"\w+")
+MIN_TERM_LENGTH = 2
+# List markers, quote markers and heading hashes at the start of a line.
+LINE_MARKER = re.compile(r"^\s*(?:[-*>]|\d+\.|#+)\s*", re.M)
+
+
+@lru_cache(maxsize=1 << 16)
+def shard_of(term: str) -> int:
+    # 32-bit FNV-1a of the term's UTF-8 bytes; easy to repeat in the browser.
+    digest = 0x811C9DC5
+    for byte in term.encode():
+        digest = ((digest ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return digest % SHARD_COUNT
+
+
+def shard_name(shard: int) -> str:
+    return f"{shard:02x}.json"
+
+
+def tokenize(text: str) -> Set[str]:
+    terms = TOKEN.findall(text.lower())
+    return {term for term in terms if len(term) >= MIN_TERM_LENGTH}
+
+
+def page_terms(markdown: str) -> Tuple[str, List[str]]:
+    # Title and distinct terms of a page, from the text nodes the parser
+    # renders: link text and image alt text count, URLs and code blocks do not.
+    _, body = split_front_matter(markdown)
+    title = ""
+    words: List[str] = []
+    for block_type, text in typed_blocks(body.split("\n")):
+        if block_type == BlockType.CODE:
+            continue
+        if not title and block_type == BlockType.HEADING and text.startswith("# "):
+            title = text[2:].strip()
+        text = LINE_MARKER.sub("", text)
+        words.extend(node.text for node in text_to_textnodes(text, strict=False))
+    # One pass over all of the page's text; nodes are separated so words
+    # on either side of a link do not run together.
+    return title, sorted(tokenize("\n".join(words)))
+
+
+def delta_encode(ids: List[int]) -> List[int]:
+    # Sorted page IDs as the first ID followed by the gaps between them.
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])] if ids else []
+
+
+def delta_decode(deltas: Iterable[int]) -> List[int]:
+    ids, total = [], 0
+    for delta in deltas:
+        total += delta
+        ids.append(total)
+    return ids
+
+
+class SearchReport:
+    def __init__(self) -> None:
+        self.indexed: int = 0
+        self.removed: int = 0
+        self.pages: int = 0
+        self.terms: int = 0
+        self.shards: List[str] = []
+        self.bytes: int = 0
+        self.seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Search index: {self.pages} pages, {self.terms} terms; "
+            f"{self.indexed} indexed, {self.removed} removed, "
+            f"{len(self.shards)} files ({self.bytes} bytes) written "
+            f"in {self.seconds * 1000:.1f} ms"
+        )
+
+
+class SearchIndex:
+    # Inverted index of the site kept between builds. Every page keeps its
+    # numeric ID for as long as it exists, so a change to one page only
+    # touches the posting lists, and shard files, of the terms it gained or
+    # lost.
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: Optional[str] = path
+        # source -> [digest, page ID, URL, title, terms]
+        self.pages: Dict[str, list] = {}
+        self.postings: Dict[str, List[int]] = {}
+        self.free: List[int] = []
+        self.next_id: int = 0
+        self.dirty: Set[int] = set()
+        self.pages_changed: bool = False
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        index = cls(path)
+        try:
+            with open(path, "rb") as file:
+                data = marshal.loads(zlib.decompress(file.read()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return index
+        if data[0] != SEARCH_VERSION:
+            return index
+        _, index.pages, index.postings, index.free, index.next_id = data
+        return index
+
+    def save(self) -> None:
+        if not self.path:
+            raise ValueError("Path not set for saving search index")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = (SEARCH_VERSION, self.pages, self.postings, self.free, self.next_id)
+        with atomic_open(self.path, "wb") as file:
+            file.write(zlib.compress(marshal.dumps(data), 1))
+
+    def is_fresh(self, source: str, digest: str, url: str) -> bool:
+        entry = self.pages.get(source)
+        return entry is not None and entry[0] == digest and entry[2] == url
+
+    def allocate(self) -> int:
+        if self.free:
+            return self.free.pop(0)
+        self.next_id += 1
+        return self.next_id - 1
+
+    def update(
+        self, source: str, digest: str, url: str, title: str, terms: List[str]
+    ) -> None:
+        entry = self.pages.get(source)
+        if entry is None:
+            page_id, old_terms = self.allocate(), []
+        else:
+            page_id, old_terms = entry[1], entry[4]
+        old, new = set(old_terms), set(terms)
+        for term in old - new:
+            self.unpost(term, page_id)
+        for term in new - old:
+            bisect.insort(self.postings.setdefault(term, []), page_id)
+            self.dirty.add(shard_of(term))
+        self.pages[source] = [digest, page_id, url, title, terms]
+        self.pages_changed = True
+
+    def remove(self, source: str) -> None:
+        _, page_id, _, _, terms = self.pages.pop(source)
+        for term in terms:
+            self.unpost(term, page_id)
+        bisect.insort(self.free, page_id)
+        self.pages_changed = True
+
+    def unpost(self, term: str, page_id: int) -> None:
+        ids = self.postings[term]
+        del ids[bisect.bisect_left(ids, page_id)]
+        if not ids:
+            del self.postings[term]
+        self.dirty.add(shard_of(term))
+
+    def write(
+        self, root: str, resolve: Callable[[str], str], force: bool = False
+    ) -> Tuple[List[str], int]:
+        # Writes the shards that changed or are missing under root/search/,
+        # plus pages.json when any page did (or `force`, as URLs depend on
+        # the base path); returns the files written and their total size.
+        search_dir = os.path.join(root, SEARCH_DIR)
+        os.makedirs(search_dir, exist_ok=True)
+        shards = {
+            shard
+            for shard in range(SHARD_COUNT)
+            if shard in self.dirty
+            or not os.path.exists(os.path.join(search_dir, shard_name(shard)))
+        }
+        contents: Dict[int, Dict[str, List[int]]] = {shard: {} for shard in shards}
+        if shards:
+            for term, ids in self.postings.items():
+                shard = shard_of(term)
+                if shard in contents:
+                    contents[shard][term] = delta_encode(ids)
+        files = {shard_name(shard): terms for shard, terms in contents.items()}
+        pages_path = os.path.join(search_dir, PAGES_FILE)
+        if force or self.pages_changed or not os.path.exists(pages_path):
+            table: List[Optional[list]] = [None] * self.next_id
+            for _, page_id, url, title, _ in self.pages.values():
+                table[page_id] = [resolve(url), title]
+            files[PAGES_FILE] = {"shards": SHARD_COUNT, "pages": table}
+
+        written, size = [], 0
+        for name, data in sorted(files.items()):
+            text = json.dumps(data, separators=(",", ":"), sort_keys=True)
+            with atomic_open(os.path.join(search_dir, name)) as file:
+                file.write(text)
+            written.append(name)
+            size += len(text.encode())
+        self.dirty.clear()
+        self.pages_changed = False
+        return written, size
+
+
+def update_search_index(
+    index: SearchIndex,
+    pages: Dict[str, Tuple[str, str]],
+    root: str,
+    resolve: Callable[[str], str],
+    force: bool = False,
+) -> SearchReport:
+    # `pages` maps every published source to its digest and site URL; only
+    # sources whose digest or URL changed are read and tokenized again.
+    report = SearchReport()
+    start = time.perf_counter()
+    for source in sorted(set(index.pages) - set(pages)):
+        index.remove(source)
+        report.removed += 1
+    for source, (digest, url) in sorted(pages.items()):
+        if index.is_fresh(source, digest, url):
+            continue
+        with open(source, "r") as file:
+            title, terms = page_terms(file.read())
+        index.update(source, digest, url, title, terms)
+        report.indexed += 1
+    report.shards, report.bytes = index.write(root, resolve, force)
+    if index.path:
+        index.save()
+    report.pages = len(index.pages)
+    report.terms = len(index.postings)
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,275 @@
+import datetime
+import os
+import re
+from email.utils import format_datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from htmlnode import LeafNode, ParentNode
+
+FENCE = "---"
+BLOG_SECTION = "blog"
+PAGE_SIZE = 10
+FEED_SIZE = 20
+FEED_PATH = "feed.xml"
+HEADING = re.compile(r"#\s+(.+)")
+SLUG_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+def parse_fields(lines: Iterable[str]) -> Dict[str, str]:
+    fields = {}
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        if not separator:
+            raise ValueError(f"Invalid front matter line: {line!r}")
+        fields[key.strip().lower()] = value.strip()
+    return fields
+
+
+def split_front_matter(markdown: str) -> Tuple[Dict[str, str], str]:
+    # A page may start with `key: value` lines between two `---` lines.
+    if not markdown.startswith(FENCE + "\n"):
+        return {}, markdown
+    end = markdown.find(f"\n{FENCE}\n", len(FENCE))
+    if end < 0:
+        if not markdown.endswith(f"\n{FENCE}"):
+            return {}, markdown
+        end = len(markdown) - len(FENCE) - 1
+    fields = parse_fields(markdown[len(FENCE) + 1 : end].split("\n"))
+    return fields, markdown[end + len(FENCE) + 2 :]
+
+
+def strip_front_matter(lines: Iterable[str]) -> Iterator[str]:
+    # The body lines of a page read line by line.
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    if first.rstrip("\r\n") != FENCE:
+        yield first
+    else:
+        for line in lines:
+            if line.rstrip("\r\n") == FENCE:
+                break
+    yield from lines
+
+
+def parse_date(value: str) -> str:
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD") from None
+
+
+def parse_tags(value: str) -> List[str]:
+    value = value.strip().removeprefix("[").removesuffix("]")
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+
+def slug(text: str) -> str:
+    return SLUG_CHARS.sub("-", text.lower()).strip("-")
+
+
+def page_url(dest: str, dest_root: str) -> str:
+    rel_path = os.path.relpath(dest, dest_root).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[: -len("index.html")]
+    return "/" + rel_path
+
+
+class PageMeta:
+    __slots__ = ("url", "title", "date", "tags", "summary")
+
+    def __init__(
+        self,
+        url: str,
+        title: str,
+        date: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        summary: str = "",
+    ) -> None:
+        self.url: str = url
+        self.title: str = title
+        self.date: Optional[str] = date
+        self.tags: List[str] = tags or []
+        self.summary: str = summary
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageMeta":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PageMeta) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"PageMeta({self.url}, {self.title!r}, date={self.date})"
+
+
+def read_meta(source: str, url: str) -> PageMeta:
+    # Reads the front matter and lines up to the first heading, without
+    # rendering anything.
+    fields: Dict[str, str] = {}
+    with open(source, "r") as file:
+        first = file.readline()
+        if first.rstrip("\r\n") == FENCE:
+            front = []
+            for line in file:
+                if line.rstrip("\r\n") == FENCE:
+                    break
+                front.append(line.rstrip("\r\n"))
+            fields = parse_fields(front)
+        elif first:
+            file.seek(0)
+        for line in file:
+            match = HEADING.match(line)
+            if match is not None and not line.startswith("##"):
+                title = match.group(1).strip()
+                break
+        else:
+            raise ValueError("No title")
+    return PageMeta(
+        url,
+        title,
+        parse_date(fields["date"]) if fields.get("date") else None,
+        parse_tags(fields.get("tags", "")),
+        fields.get("summary", ""),
+    )
+
+
+class SiteIndex:
+    # Metadata of every page, by source path.
+    def __init__(self, pages: Optional[Dict[str, PageMeta]] = None) -> None:
+        self.pages: Dict[str, PageMeta] = pages or {}
+
+    def posts(self, section: str = BLOG_SECTION) -> List[PageMeta]:
+        # Newest first; posts without a date come last, by URL.
+        prefix = f"/{section}/"
+        posts = [
+            page
+            for page in self.pages.values()
+            if page.url.startswith(prefix) and page.url != prefix
+        ]
+        posts.sort(key=lambda page: page.url)
+        posts.sort(key=lambda page: page.date or "", reverse=True)
+        return posts
+
+    def tags(self, posts: List[PageMeta]) -> Dict[str, List[PageMeta]]:
+        tagged: Dict[str, List[PageMeta]] = {}
+        for post in posts:
+            for tag in post.tags:
+                tagged.setdefault(tag, []).append(post)
+        return dict(sorted(tagged.items()))
+
+
+# Listings are built as nodes rather than markdown, so titles, summaries
+# and tags are shown as written instead of being parsed.
+def text_leaf(text: str, tag: Optional[str] = None, url: Optional[str] = None):
+    return LeafNode(tag, escape(text), {"href": url} if url else None)
+
+
+def post_node(post: PageMeta) -> ParentNode:
+    children = [text_leaf(post.title, "a", post.url)]
+    if post.date:
+        children.append(text_leaf(f" ({post.date})"))
+    if post.summary:
+        children.append(text_leaf(f" {post.summary}"))
+    return ParentNode("li", children)
+
+
+def listing_node(
+    heading: str, posts: List[PageMeta], newer: Optional[str], older: Optional[str]
+) -> ParentNode:
+    children = [text_leaf(heading, "h1")]
+    if posts:
+        children.append(ParentNode("ul", [post_node(post) for post in posts]))
+    links = []
+    if newer:
+        links.append(text_leaf("Newer posts", "a", newer))
+    if older:
+        if links:
+            links.append(text_leaf(" "))
+        links.append(text_leaf("Older posts", "a", older))
+    if links:
+        children.append(ParentNode("p", links))
+    return ParentNode("div", children)
+
+
+def paginate(
+    heading: str, posts: List[PageMeta], url: str
+) -> Iterator[Tuple[str, str, ParentNode]]:
+    # (URL, title, body) of each page of a listing: the first page at `url`,
+    # the others at `url`page/N/.
+    count = max(1, -(-len(posts) // PAGE_SIZE))
+
+    def page_link(number: int) -> str:
+        return url if number == 1 else f"{url}page/{number}/"
+
+    for number in range(1, count + 1):
+        chunk = posts[(number - 1) * PAGE_SIZE : number * PAGE_SIZE]
+        newer = page_link(number - 1) if number > 1 else None
+        older = page_link(number + 1) if number < count else None
+        title = heading if number == 1 else f"{heading} (page {number})"
+        yield page_link(number), title, listing_node(title, chunk, newer, older)
+
+
+def listing_pages(index: SiteIndex) -> Iterator[Tuple[str, str, ParentNode]]:
+    # (URL, title, body) of the blog index, tag pages and tag overview.
+    posts = index.posts()
+    if not posts:
+        return
+    yield from paginate("Blog", posts, f"/{BLOG_SECTION}/")
+    tags = index.tags(posts)
+    if not tags:
+        return
+    overview = [
+        ParentNode(
+            "li",
+            [
+                text_leaf(tag, "a", f"/tags/{slug(tag)}/"),
+                text_leaf(f" ({len(tagged)})"),
+            ],
+        )
+        for tag, tagged in tags.items()
+    ]
+    yield "/tags/", "Tags", ParentNode(
+        "div", [text_leaf("Tags", "h1"), ParentNode("ul", overview)]
+    )
+    for tag, tagged in tags.items():
+        yield from paginate(f"Tagged {tag}", tagged, f"/tags/{slug(tag)}/")
+
+
+def rss_feed(posts: List[PageMeta], title: str, link: Callable[[str], str]) -> str:
+    # RSS 2.0 with the newest posts; `link` turns a site URL into the
+    # address readers should use.
+    items = []
+    for post in posts[:FEED_SIZE]:
+        url = escape(link(post.url))
+        item = [
+            f"<title>{escape(post.title)}</title>",
+            f"<link>{url}</link>",
+            f'<guid isPermaLink="true">{url}</guid>',
+        ]
+        if post.date:
+            date = datetime.datetime.fromisoformat(post.date)
+            published = format_datetime(date.replace(tzinfo=datetime.timezone.utc))
+            item.append(f"<pubDate>{published}</pubDate>")
+        if post.summary:
+            item.append(f"<description>{escape(post.summary)}</description>")
+        item.extend(f"<category>{escape(tag)}</category>" for tag in post.tags)
+        items.append("<item>" + "".join(item) + "</item>")
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(title)}</title>"
+        f"<link>{escape(link(f'/{BLOG_SECTION}/'))}</link>"
+        f"<description>{escape(title)}</description>"
+        + "".join(items)
+        + "</channel></rss>\n"
+    )
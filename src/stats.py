@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Dict, List
+
+
+class BuildStats:
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+
+    def add(self, counts: Dict[str, int]) -> None:
+        for name, value in counts.items():
+            if name.endswith("_max"):
+                self.counts[name] = max(self.counts[name], value)
+            else:
+                self.counts[name] += value
+
+    def utilization(self, stage: str) -> float:
+        capacity = self.counts[f"pipeline_{stage}_capacity_ns"]
+        return self.counts[f"pipeline_{stage}_ns"] / capacity if capacity else 0.0
+
+    def queue_depth(self, name: str) -> str:
+        samples = self.counts[f"pipeline_{name}_queue_samples"]
+        total = self.counts[f"pipeline_{name}_queue_total"]
+        average = total / samples if samples else 0.0
+        return f"{average:.1f} (max {self.counts[f'pipeline_{name}_queue_max']})"
+
+    def cache_lookups(self) -> int:
+        return sum(
+            self.counts[name]
+            for name in ("cache_hits", "cache_disk_hits", "cache_misses")
+        )
+
+    def lines(self) -> List[str]:
+        lines = []
+        lookups = self.cache_lookups()
+        if lookups:
+            hits = self.counts["cache_hits"] + self.counts["cache_disk_hits"]
+            lines.append(
+                f"Block cache: {hits}/{lookups} hits ({hits / lookups:.1%}), "
+                f"{self.counts['cache_disk_hits']} from disk"
+            )
+        pages = self.counts["page_cache_hits"] + self.counts["page_cache_misses"]
+        if pages:
+            lines.append(
+                f"Page cache: {self.counts['page_cache_hits']}/{pages} pages "
+                "reused without parsing"
+            )
+        minified = self.counts["minify_input_bytes"]
+        if minified:
+            saved = minified - self.counts["minify_output_bytes"]
+            seconds = self.counts["minify_ns"] / 1e9 or 1e-9
+            lines.append(
+                f"Minified: {minified} -> {self.counts['minify_output_bytes']} bytes "
+                f"({saved / minified:.1%} saved) at {minified / seconds / 1e6:.1f} MB/s"
+            )
+        if self.counts["pipeline_wall_ns"]:
+            # A full render queue with idle readers and writers means disk
+            # latency is hidden behind rendering.
+            lines.append(
+                f"Pipeline: read {self.utilization('read'):.0%}, render "
+                f"{self.utilization('render'):.0%}, write "
+                f"{self.utilization('write'):.0%} busy; queued to render "
+                f"{self.queue_depth('render')}, to write {self.queue_depth('write')}"
+            )
+        return lines
+
+    def __str__(self) -> str:
+        return "\n".join(self.lines())
@@ -0,0 +1,58 @@
+import re
+from typing import Dict, Iterable, List, Optional, TextIO, Union
+
+from urls import UrlResolver
+
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    def __init__(
+        self,
+        source: str,
+        base_path: str = "/",
+        assets: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.base_path: str = base_path
+        # URLs in the template itself are resolved once, here.
+        self.resolver = UrlResolver(base_path, assets)
+        self.segments: List[str] = []
+        self.slots: List[str] = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            literal = source[position : match.start()]
+            self.segments.append(self.resolver.resolve_html(literal))
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.segments.append(self.resolver.resolve_html(source[position:]))
+
+    @classmethod
+    def from_file(
+        cls, path: str, base_path: str = "/", assets: Optional[Dict[str, str]] = None
+    ) -> "Template":
+        with open(path, "r") as file:
+            return cls(file.read(), base_path, assets)
+
+    def render(self, **context: str) -> str:
+        parts = [self.segments[0]]
+        for name, literal in zip(self.slots, self.segments[1:]):
+            if name not in context:
+                raise ValueError(f"No value for template slot {name}")
+            parts.append(context[name])
+            parts.append(literal)
+        return "".join(parts)
+
+    def write_to(self, fp: TextIO, **context: Union[str, Iterable[str]]) -> None:
+        fp.write(self.segments[0])
+        for name, literal in zip(self.slots, self.segments[1:]):
+            if name not in context:
+                raise ValueError(f"No value for template slot {name}")
+            value = context[name]
+            if isinstance(value, str):
+                fp.write(value)
+            else:
+                fp.writelines(value)
+            fp.write(literal)
+
+    def __repr__(self) -> str:
+        return f"Template(slots={self.slots}, base_path={self.base_path})"
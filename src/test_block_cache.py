@@ -0,0 +1,76 @@
+import unittest
+
+from block_cache import BlockCache, block_key
+from block_parser import BlockType
+from fixtures import SiteTestCase
+from generator import RenderOptions
+from parser import markdown_to_html_node
+from stats import BuildStats
+
+
+class TestBlockCache(SiteTestCase):
+    def test_key_depends_on_type_and_text(self):
+        key = block_key(BlockType.PARAGRAPH, "text")
+        self.assertEqual(key, block_key(BlockType.PARAGRAPH, "text"))
+        self.assertNotEqual(key, block_key(BlockType.QUOTE, "text"))
+        self.assertNotEqual(key, block_key(BlockType.PARAGRAPH, "text "))
+
+    def test_lru_eviction(self):
+        cache = BlockCache(capacity=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(
+            cache.take_counts(),
+            {"cache_hits": 1, "cache_disk_hits": 0, "cache_misses": 1},
+        )
+
+    def test_persists_fragments(self):
+        BlockCache(path=self.root).put("abcdef", "<p>x</p>")
+        cache = BlockCache(path=self.root)
+        self.assertEqual(cache.get("abcdef"), "<p>x</p>")
+        self.assertEqual(cache.disk_hits, 1)
+
+    def test_duplicate_blocks_render_once(self):
+        calls = []
+
+        def render(block_type, text):
+            calls.append(text)
+            return f"<p>{text}</p>"
+
+        cache = BlockCache()
+        for _ in range(3):
+            html = cache.render(BlockType.PARAGRAPH, "same", render)
+        self.assertEqual(html, "<p>same</p>")
+        self.assertEqual(calls, ["same"])
+
+    def test_cached_render_matches_uncached(self):
+        md = "# Title\n\nA **bold** [link](/x)\n\n- a\n- b\n\nA **bold** [link](/x)"
+        cache = BlockCache()
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual(markdown_to_html_node(md, cache=cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md, cache=cache).to_html(), expected)
+        self.assertEqual(cache.hits, 5)
+        self.assertEqual(cache.misses, 3)
+
+
+class TestBuildStats(SiteTestCase):
+    def test_build_reports_hit_rate(self):
+        self.write("template.html", "{{ Title }}{{ Content }}")
+        for name in ("a", "b"):
+            self.write(f"content/{name}.md", f"# Page {name}\n\nShared disclaimer text")
+        stats = BuildStats()
+        options = RenderOptions(cache_size=64, cache_dir=None)
+        self.generate(options=options, stats=stats, manifest=False)
+        self.assertEqual(stats.cache_lookups(), 4)
+        self.assertEqual(stats.counts["cache_hits"], 1)
+        self.assertEqual(
+            stats.lines()[0], "Block cache: 1/4 hits (25.0%), 0 from disk"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
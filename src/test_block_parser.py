@@ -1,5 +1,11 @@
 import unittest
-from block_parser import BlockType, markdown_to_blocks, block_to_block_type
+from block_parser import (
+    Block,
+    BlockType,
+    markdown_to_blocks,
+    block_to_block_type,
+    scan_blocks,
+)
 
 
 class TestBlockParser(unittest.TestCase):
@@ -23,6 +29,73 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nAfter"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```\nfirst\n\n\nsecond\n```", "After"],
+        )
+
+    def test_whitespace_only_line_separates_blocks(self):
+        self.assertEqual(markdown_to_blocks("one\n   \ntwo"), ["one", "two"])
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_typed_blocks_with_line_ranges(self):
+        md = "# Title\n\n- a\n- b\n\n1. x\n2. y\n\n> q\n\n```\ncode\n```\ntext"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                Block(BlockType.HEADING, ["# Title"], 0, 1),
+                Block(BlockType.UNORDERED_LIST, ["- a", "- b"], 2, 4),
+                Block(BlockType.ORDERED_LIST, ["1. x", "2. y"], 5, 7),
+                Block(BlockType.QUOTE, ["> q"], 8, 9),
+                Block(BlockType.CODE, ["```", "code", "```"], 10, 13),
+                Block(BlockType.PARAGRAPH, ["text"], 13, 14),
+            ],
+        )
+
+    def test_unterminated_fence_runs_to_end(self):
+        blocks = list(scan_blocks(["```python", "x = 1", "", "y = 2"]))
+        self.assertEqual(
+            blocks, [Block(BlockType.CODE, ["```python", "x = 1", "", "y = 2"], 0, 4)]
+        )
+
+    def test_accepts_file_lines(self):
+        lines = iter(["para one\n", "still one\n", "\n", "- item\n"])
+        self.assertEqual(
+            [(b.block_type, b.lines) for b in scan_blocks(lines)],
+            [
+                (BlockType.PARAGRAPH, ["para one", "still one"]),
+                (BlockType.UNORDERED_LIST, ["- item"]),
+            ],
+        )
+
+    def test_loose_list_stays_one_block(self):
+        md = "- a\n\n- b\n  - nested\n\n  more a\n\nafter"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                Block(
+                    BlockType.UNORDERED_LIST,
+                    ["- a", "", "- b", "  - nested", "", "  more a"],
+                    0,
+                    6,
+                ),
+                Block(BlockType.PARAGRAPH, ["after"], 7, 8),
+            ],
+        )
+
+    def test_list_split_when_lines_after_gap_are_not_items(self):
+        md = "1. a\n\n2. b\nnot an item"
+        self.assertEqual(
+            list(scan_blocks(md.split("\n"))),
+            [
+                Block(BlockType.ORDERED_LIST, ["1. a"], 0, 1),
+                Block(BlockType.PARAGRAPH, ["2. b", "not an item"], 2, 4),
+            ],
+        )
+
 
 class TestMarkdownBlockTypes(unittest.TestCase):
     def test_heading_block(self):
@@ -65,6 +138,14 @@ class TestMarkdownBlockTypes(unittest.TestCase):
             block_to_block_type(block), BlockType.PARAGRAPH
         )  # not strictly 1., 2., ...
 
+    def test_ordered_list_start_offset(self):
+        block = "9. Nine\n10. Ten\n11. Eleven"
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+    def test_nested_list_block(self):
+        block = "- item one\n  1. sub\n  2. sub\n- item two"
+        self.assertEqual(block_to_block_type(block), BlockType.UNORDERED_LIST)
+
     def test_mixed_block(self):
         block = "- item one\n> quote line"
         self.assertEqual(
@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase
+
+
+class TestBuilderRebuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        self.write("content/index.md", "# Home page\n\nhello")
+        self.write("content/blog/post.md", "# Post title\n\nbody")
+        self.write("static/index.css", "body {}")
+        os.makedirs(self.path("static", "images"))
+        self.builder = self.cached_builder()
+        self.quietly(self.builder.build)
+
+    def cached_builder(self):
+        return self.make_builder(
+            cache_dir=self.path(".build", "blocks"),
+            page_cache_dir=self.path(".build", "pages"),
+        )
+
+    def test_rebuild_changed_page_only(self):
+        self.write(self.path("content", "index.md"), "# Home page\n\nchanged")
+        generated = self.quietly(
+            self.builder.rebuild, [self.path("content", "index.md")]
+        )
+        self.assertEqual(generated, [self.path("docs", "index.html")])
+
+    def test_rebuild_deleted_page(self):
+        os.remove(self.path("content", "blog", "post.md"))
+        self.quietly(self.builder.rebuild, [self.path("content", "blog", "post.md")])
+        self.assertFalse(os.path.exists(self.path("docs", "blog", "post.html")))
+        self.assertNotIn(
+            self.path("content", "blog", "post.md"), self.builder.manifest.pages
+        )
+
+    def test_rebuild_assets(self):
+        self.write(self.path("static", "images", "a.png"), "png")
+        os.remove(self.path("static", "index.css"))
+        generated = self.quietly(
+            self.builder.rebuild,
+            [self.path("static", "images"), self.path("static", "index.css")],
+        )
+        self.assertEqual(generated, [])
+        self.assertTrue(os.path.exists(self.path("docs", "images", "a.png")))
+        self.assertFalse(os.path.exists(self.path("docs", "index.css")))
+        self.assertEqual(
+            self.builder.manifest.assets, [os.path.join("images", "a.png")]
+        )
+
+    def test_template_change_rebuilds_everything(self):
+        self.write(self.path("template.html"), "<h2>{{ Title }}</h2>{{ Content }}")
+        generated = self.quietly(self.builder.rebuild, [self.path("template.html")])
+        self.assertEqual(len(generated), 2)
+
+    def test_turning_gzip_off_removes_copies(self):
+        self.builder.gzip_threshold = 0
+        self.quietly(self.builder.build)
+        self.assertTrue(os.path.exists(self.path("docs", "index.html.gz")))
+        builder = self.cached_builder()
+        self.assertEqual(builder.manifest.gzip, 0)
+        self.quietly(builder.build)
+        self.assertFalse(os.path.exists(self.path("docs", "index.html.gz")))
+        self.assertIsNone(builder.manifest.gzip)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import os
+import unittest
+
+from compressor import compress_file, compress_tree, is_compressed
+from fixtures import SiteTestCase
+
+
+class TestCompressTree(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("index.html", "<p>hello world</p>" * 200)
+        self.write("blog/post.html", "<p>post</p>" * 200)
+        self.write("index.css", "body { margin: 0; }" * 100)
+        self.write("small.html", "<p>tiny</p>")
+        self.write("image.png", "\x89PNG" * 1000)
+
+    def test_compresses_text_files_above_threshold(self):
+        report = compress_tree(self.root, threshold=1024)
+        self.assertEqual(
+            sorted(report.compressed), ["blog/post.html", "index.css", "index.html"]
+        )
+        self.assertFalse(os.path.exists(self.path("small.html.gz")))
+        self.assertFalse(os.path.exists(self.path("image.png.gz")))
+        with gzip.open(self.path("index.html.gz"), "rt") as file:
+            self.assertEqual(file.read(), "<p>hello world</p>" * 200)
+        self.assertLess(report.ratio, 0.2)
+
+    def test_output_is_reproducible(self):
+        compress_file(self.path("index.html"))
+        with open(self.path("index.html.gz"), "rb") as file:
+            first = file.read()
+        compress_file(self.path("index.html"))
+        with open(self.path("index.html.gz"), "rb") as file:
+            self.assertEqual(file.read(), first)
+
+    def test_skips_up_to_date_and_redoes_changed(self):
+        compress_tree(self.root)
+        self.assertTrue(is_compressed(self.path("index.html")))
+        self.write("index.html", "<p>changed</p>" * 200)
+        os.utime(self.path("index.html"), ns=(0, 10**18))
+        report = compress_tree(self.root)
+        self.assertEqual(report.compressed, ["index.html"])
+        self.assertEqual(len(report.unchanged), 2)
+
+    def test_removes_orphans_but_keeps_published_files(self):
+        compress_tree(self.root)
+        os.remove(self.path("blog/post.html"))
+        self.write("archive.json.gz", "not ours")
+        report = compress_tree(self.root, keep=["archive.json.gz"])
+        self.assertEqual(report.removed, ["blog/post.html.gz"])
+        self.assertTrue(os.path.exists(self.path("archive.json.gz")))
+
+    def test_no_threshold_removes_every_copy(self):
+        compress_tree(self.root)
+        self.write("archive.json.gz", "not ours")
+        report = compress_tree(self.root, None, keep=["archive.json.gz"])
+        self.assertEqual(report.compressed, [])
+        self.assertEqual(
+            sorted(report.removed),
+            ["blog/post.html.gz", "index.css.gz", "index.html.gz"],
+        )
+        self.assertTrue(os.path.exists(self.path("archive.json.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
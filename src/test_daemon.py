@@ -0,0 +1,118 @@
+import os
+import threading
+import unittest
+
+from client import request
+from daemon import BuildDaemon
+from fixtures import SiteTestCase
+from main import parse_args
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        self.write("content/index.md", "# Home page\n\nhello")
+        self.write("content/blog/post.md", "# Post title\n\nbody")
+        os.makedirs(self.static)
+        self.args = [
+            "/site/",
+            "--content",
+            self.content,
+            "--static",
+            self.static,
+            "--output",
+            self.docs,
+            "--template",
+            self.template,
+        ]
+        self.builder = self.make_builder("/site/", quiet=True)
+        self.daemon = BuildDaemon(
+            self.builder,
+            self.path("daemon.sock"),
+            vars(parse_args(self.args)),
+            parse_args,
+        )
+
+    def build(self, *args, paths=None):
+        message = {"command": "build", "args": self.args + list(args)}
+        if paths:
+            message["paths"] = paths
+        return self.daemon.handle(message)
+
+    def test_builds_are_incremental_and_timed(self):
+        response = self.build("-q")
+        self.assertTrue(response["ok"], response)
+        self.assertEqual((response["generated"], response["builds"]), (2, 1))
+        self.assertIn("Synced assets", response["output"])
+        self.assertNotIn("Generating page", response["output"])
+        self.assertGreater(response["timings"]["request_ms"], 0)
+        self.assertEqual(self.build()["generated"], 0)
+        self.assertEqual(self.build("--full")["generated"], 2)
+
+    def test_rebuild_paths(self):
+        self.build()
+        index = self.path("content", "index.md")
+        self.write(index, "# Home page\n\nchanged")
+        response = self.build(paths=[index])
+        self.assertEqual(response["generated"], 1)
+        self.assertEqual(
+            set(self.builder.manifest.pages),
+            {index, self.path("content", "blog", "post.md")},
+        )
+
+    def test_other_options_fall_back(self):
+        for args in (["--minify"], ["--watch"], ["--jobs", "nope"]):
+            with self.subTest(args=args):
+                response = self.build(*args)
+                self.assertTrue(response["fallback"])
+                self.assertFalse(response["ok"])
+        response = self.daemon.handle({"command": "build", "cwd": "/elsewhere"})
+        self.assertTrue(response["fallback"])
+
+    def test_manifest_written_by_another_build_is_reloaded(self):
+        self.build()
+        other = self.make_builder("/site/")
+        os.remove(self.path("content", "blog", "post.md"))
+        self.quietly(other.build)
+        self.write(self.path("content", "blog", "post.md"), "# Post title\n\nbody")
+        self.assertEqual(self.build()["generated"], 1)
+
+    def test_socket(self):
+        thread = threading.Thread(target=self.quietly_serve)
+        thread.start()
+        try:
+            while not self.daemon.running:
+                thread.join(0.01)
+            message = {"command": "build", "args": self.args, "cwd": os.getcwd()}
+            response = request(message, self.daemon.socket_path)
+            self.assertEqual(response["generated"], 2)
+            response = request({"command": "ping"}, self.daemon.socket_path)
+            self.assertEqual(response, {"ok": True, "builds": 1})
+        finally:
+            request({"command": "stop"}, self.daemon.socket_path)
+            thread.join()
+        self.assertFalse(os.path.exists(self.daemon.socket_path))
+        with self.assertRaises(OSError):
+            request({"command": "ping"}, self.daemon.socket_path)
+
+    def test_serve_is_a_flag(self):
+        args = parse_args(["--serve", "/site/", "--socket", self.path("d.sock")])
+        self.assertEqual(
+            (args.serve, args.base_path, args.socket),
+            (True, "/site/", self.path("d.sock")),
+        )
+        self.assertIsNone(self.daemon.mismatch({"args": self.args + ["--serve"]}))
+
+    def test_socket_path_must_not_be_a_directory(self):
+        self.daemon.socket_path = self.docs
+        os.makedirs(self.docs)
+        with self.assertRaises(ValueError):
+            self.daemon.serve()
+
+    def quietly_serve(self):
+        self.quietly(self.daemon.serve)
+
+
+if __name__ == "__main__":
+    unittest.main()
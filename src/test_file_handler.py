@@ -0,0 +1,122 @@
+import os
+import sys
+import unittest
+
+from file_handler import PUBLISHERS, publish_file, sync_dir
+from fixtures import SiteTestCase
+
+
+class TestSyncDir(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = self.static
+        self.dest = self.docs
+        os.makedirs(self.dest)
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+
+    def test_first_sync_copies_everything(self):
+        report = sync_dir(self.src, self.dest)
+        self.assertEqual(report.copied, [os.path.join("images", "a.png"), "index.css"])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+
+    def test_unchanged_files_are_not_copied(self):
+        sync_dir(self.src, self.dest)
+        report = sync_dir(self.src, self.dest)
+        self.assertEqual(report.copied + report.updated, [])
+        self.assertEqual(len(report.unchanged), 2)
+
+    def test_changed_file_is_updated(self):
+        sync_dir(self.src, self.dest)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        report = sync_dir(self.src, self.dest)
+        self.assertEqual(report.updated, ["index.css"])
+
+    def test_checksum_ignores_touched_files(self):
+        sync_dir(self.src, self.dest)
+        os.utime(os.path.join(self.src, "index.css"), (0, 0))
+        self.assertEqual(sync_dir(self.src, self.dest, checksum=True).updated, [])
+        self.assertEqual(sync_dir(self.src, self.dest).updated, ["index.css"])
+
+    def test_prunes_only_published_orphans(self):
+        published = sync_dir(self.src, self.dest).assets
+        self.write(os.path.join(self.dest, "index.html"), "generated page")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        report = sync_dir(self.src, self.dest, published=published)
+        self.assertEqual(report.removed, [os.path.join("images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_dry_run_touches_nothing(self):
+        report = sync_dir(self.src, self.dest, dry_run=True)
+        self.assertEqual(
+            report.actions(),
+            [f"copy {os.path.join('images', 'a.png')}", "copy index.css"],
+        )
+        self.assertEqual(os.listdir(self.dest), [])
+
+
+class TestPublishFile(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = self.path("image.png")
+        self.dest = self.path("out.png")
+        with open(self.src, "wb") as file:
+            file.write(os.urandom(200_000))
+
+    def read(self, path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    def check_strategy(self, strategy):
+        try:
+            used = publish_file(self.src, self.dest, strategy)
+        except OSError as e:
+            self.skipTest(f"{strategy} not supported here: {e}")
+        self.assertEqual(used, strategy)
+        self.assertEqual(self.read(self.dest), self.read(self.src))
+        self.assertEqual(
+            os.stat(self.dest).st_mtime_ns, os.stat(self.src).st_mtime_ns
+        )
+
+    def test_copy(self):
+        self.check_strategy("copy")
+
+    def test_hardlink(self):
+        self.check_strategy("hardlink")
+        self.assertTrue(os.path.samefile(self.src, self.dest))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Linux only")
+    def test_reflink(self):
+        self.check_strategy("reflink")
+        self.assertFalse(os.path.samefile(self.src, self.dest))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Linux only")
+    def test_copy_file_range(self):
+        self.check_strategy("copy_file_range")
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Linux only")
+    def test_sendfile(self):
+        self.check_strategy("sendfile")
+
+    def test_auto_falls_back(self):
+        self.assertIn(publish_file(self.src, self.dest), PUBLISHERS)
+        self.assertEqual(self.read(self.dest), self.read(self.src))
+
+    def test_republish_does_not_write_through_hardlink(self):
+        self.check_strategy("hardlink")
+        original = self.read(self.src)
+        other = self.path("other.png")
+        with open(other, "wb") as file:
+            file.write(b"other")
+        publish_file(other, self.dest, "copy")
+        self.assertEqual(self.read(self.src), original)
+        self.assertEqual(self.read(self.dest), b"other")
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            publish_file(self.src, self.dest, "teleport")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import os
+import unittest
+
+from fingerprint import fingerprint_assets, fingerprinted_name
+from fixtures import SiteTestCase
+from template import Template
+from urls import UrlResolver
+
+
+class TestFingerprintAssets(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("index.css", "body {}")
+        self.write("robots.txt", "ok")
+
+    def test_names(self):
+        self.assertEqual(
+            fingerprinted_name("images/a.b.png", "0123456789abcdef"),
+            "images/a.b.0123456789.png",
+        )
+        names, _, hashed = fingerprint_assets(
+            self.root, ["index.css", "robots.txt"], {}
+        )
+        self.assertEqual(list(names), ["index.css"])
+        self.assertRegex(names["index.css"], r"^index\.[0-9a-f]{10}\.css$")
+        self.assertEqual(hashed, ["index.css"])
+
+    def test_unchanged_assets_are_not_rehashed(self):
+        names, cache, _ = fingerprint_assets(self.root, ["index.css"], {})
+        self.assertEqual(fingerprint_assets(self.root, ["index.css"], cache)[2], [])
+        self.write("index.css", "body { margin: 0 }")
+        new_names, _, hashed = fingerprint_assets(self.root, ["index.css"], cache)
+        self.assertEqual(hashed, ["index.css"])
+        self.assertNotEqual(new_names, names)
+
+    def test_assets_referenced_from_css_keep_their_name(self):
+        self.write(
+            "css/site.css",
+            '@import "base.css"; @font-face { src: url( "../fonts/a.woff2?v=2" ) }\n'
+            "body { background: url(/images/bg.png) } a { background: "
+            "url(data:image/png;base64,AAAA) } b { background: url(x.svg#icon) }",
+        )
+        paths = [
+            "css/base.css",
+            "css/site.css",
+            "css/x.svg",
+            "fonts/a.woff2",
+            "images/bg.png",
+            "images/logo.png",
+        ]
+        for path in paths[2:]:
+            self.write(path, path)
+        self.write("css/base.css", "p {}")
+        names, cache, _ = fingerprint_assets(self.root, paths, {})
+        self.assertEqual(sorted(names), ["css/site.css", "images/logo.png"])
+        self.assertEqual(
+            cache["css/site.css"]["references"],
+            ["css/base.css", "css/x.svg", "fonts/a.woff2", "images/bg.png"],
+        )
+        self.assertEqual(fingerprint_assets(self.root, paths, cache)[0], names)
+
+
+class TestRewriteReferences(unittest.TestCase):
+    def test_resolve_html_with_assets(self):
+        assets = {"index.css": "index.abc.css", "images/a.png": "images/a.def.png"}
+        html = (
+            '<link href="/index.css"><img src="/images/a.png"><a href="/blog/">'
+            '<a href="https://example.com/index.css">'
+        )
+        self.assertEqual(
+            UrlResolver("/site/", assets).resolve_html(html),
+            '<link href="/site/index.abc.css"><img src="/site/images/a.def.png">'
+            '<a href="/site/blog/"><a href="https://example.com/index.css">',
+        )
+
+    def test_template_links_fingerprinted_css(self):
+        template = Template(
+            '<link href="/index.css?v=1" />{{ Content }}', "/", {"index.css": "i.1.css"}
+        )
+        self.assertEqual(template.render(Content=""), '<link href="/i.1.css?v=1" />')
+
+
+class TestFingerprintBuild(SiteTestCase):
+    def test_build_publishes_fingerprinted_assets(self):
+        self.write("template.html", '<link href="/index.css">{{ Content }}')
+        self.write("content/index.md", "# Home\n\n![logo](/logo.png)")
+        self.write("static/index.css", "body {}")
+        self.write("static/logo.png", "png")
+        builder = self.make_builder(fingerprint=True)
+        self.quietly(builder.build)
+        names = json.loads(self.read("docs", "asset-manifest.json"))
+        html = self.read("docs", "index.html")
+        self.assertIn(f'href="/{names["index.css"]}"', html)
+        self.assertIn(f'src="/{names["logo.png"]}"', html)
+        self.assertEqual(
+            sorted(os.listdir(self.docs)),
+            sorted(["asset-manifest.json", "index.html", *names.values()]),
+        )
+
+        self.write("static/index.css", "body { margin: 0 }")
+        self.quietly(builder.rebuild, [self.path("static", "index.css")])
+        new_names = json.loads(self.read("docs", "asset-manifest.json"))
+        self.assertNotEqual(new_names["index.css"], names["index.css"])
+        self.assertFalse(os.path.exists(self.path("docs", names["index.css"])))
+        self.assertIn(
+            f'href="/{new_names["index.css"]}"', self.read("docs", "index.html")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import os
+import tracemalloc
+import unittest
+
+from fixtures import SiteTestCase
+from generator import BuildError, RenderOptions, collect_pages, generate_page
+from manifest import Manifest
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home page\n\nhello")
+        self.write("content/blog/post.md", "# Post title\n\nbody")
+
+    def read_outputs(self):
+        outputs = {}
+        for root, _, files in os.walk(self.docs):
+            for file in files:
+                path = os.path.join(root, file)
+                with open(path) as f:
+                    outputs[os.path.relpath(path, self.docs)] = f.read()
+        return outputs
+
+    def test_collect_pages(self):
+        self.assertEqual(
+            collect_pages(self.content, self.docs),
+            [
+                (
+                    os.path.join(self.content, "blog", "post.md"),
+                    os.path.join(self.docs, "blog", "post.html"),
+                ),
+                (
+                    os.path.join(self.content, "index.md"),
+                    os.path.join(self.docs, "index.html"),
+                ),
+            ],
+        )
+
+    def test_only_changed_pages_rebuilt(self):
+        self.assertEqual(len(self.generate()), 2)
+        self.assertEqual(self.generate(), [])
+        self.write(os.path.join(self.content, "index.md"), "# Home page\n\nchanged")
+        self.assertEqual(self.generate(), [os.path.join(self.docs, "index.html")])
+
+    def test_template_and_base_path_rebuild_everything(self):
+        self.generate()
+        self.assertEqual(len(self.generate("/site/")), 2)
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.generate("/site/")), 2)
+
+    def test_parser_change_rebuilds_everything(self):
+        self.generate()
+        manifest = Manifest.load(self.manifest_path)
+        manifest.settings["parser"] = "0"
+        manifest.save()
+        self.assertEqual(len(self.generate()), 2)
+
+    def test_minifier_change_rebuilds_everything(self):
+        options = RenderOptions(minify=True)
+        self.generate(options=options)
+        self.assertEqual(self.generate(options=options), [])
+        manifest = Manifest.load(self.manifest_path)
+        # What builds recorded before the minifier had a version.
+        manifest.settings["minify"] = True
+        manifest.save()
+        self.assertEqual(len(self.generate(options=options)), 2)
+
+    def test_deleted_source_removes_output(self):
+        self.generate()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.generate()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_missing_output_is_regenerated(self):
+        self.generate()
+        os.remove(os.path.join(self.docs, "index.html"))
+        self.assertEqual(self.generate(), [os.path.join(self.docs, "index.html")])
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(6):
+            self.write(
+                os.path.join(self.content, "blog", f"p{i}.md"),
+                f"# Post {i}\n\n**bold** [link](/blog/p{i})",
+            )
+        serial = self.generate()
+        expected = self.read_outputs()
+        os.remove(self.manifest_path)
+        self.assertEqual(self.generate(workers=3), serial)
+        self.assertEqual(self.read_outputs(), expected)
+
+    def test_log_follows_page_order(self):
+        # Early pages are the slowest, so they finish after later ones.
+        for i in range(12):
+            self.write(
+                os.path.join(self.content, "blog", f"p{i:02}.md"),
+                f"# Post {i}\n\n" + "**bold** text\n\n" * (2000 - i * 150),
+            )
+        expected = [src for src, _ in collect_pages(self.content, self.docs)]
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                if os.path.exists(self.manifest_path):
+                    os.remove(self.manifest_path)
+                self.generate(workers=workers)
+                sources = [
+                    line.split()[3]
+                    for line in self.output.splitlines()
+                    if line.startswith("Generating page from")
+                ]
+                self.assertEqual(sources, expected)
+
+    def test_failures_reported_per_page(self):
+        self.write(os.path.join(self.content, "bad.md"), "no title here")
+        self.write(os.path.join(self.content, "blog", "worse.md"), "`unclosed")
+        with self.assertRaises(BuildError) as ctx:
+            self.generate(workers=2)
+        self.assertEqual(
+            sorted(src for src, _ in ctx.exception.failures),
+            [
+                os.path.join(self.content, "bad.md"),
+                os.path.join(self.content, "blog", "worse.md"),
+            ],
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        self.assertNotIn(os.path.join(self.content, "bad.md"), self.read_manifest())
+
+    def read_manifest(self):
+        return Manifest.load(self.manifest_path).pages
+
+
+SECTION = """## Section {n}
+
+Some *text* with a [link](/page/{n}) and `code`.
+
+1. first
+2. second
+
+   more about the second
+
+- a
+  - nested
+
+> quoted
+> lines
+
+```
+<a href="/raw">
+```
+"""
+
+
+class TestStreamingBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(
+            "template.html",
+            '<title>{{ Title }}</title>\n<a href="/">x</a>{{ Content }}',
+        )
+
+    def render(self, base_path="/site/", **options):
+        dest = self.path("page.html")
+        self.quietly(
+            generate_page,
+            base_path,
+            self.path("page.md"),
+            self.template,
+            dest,
+            None,
+            RenderOptions(**options),
+        )
+        return dest
+
+    def page(self, markdown, **options):
+        self.write("page.md", markdown)
+        with open(self.render(**options)) as file:
+            return file.read()
+
+    def test_streamed_page_matches_in_memory_page(self):
+        markdown = "# Big page\n\n" + "".join(SECTION.format(n=n) for n in range(20))
+        for options in ({}, {"cache_size": 16}, {"minify": True}):
+            with self.subTest(**options):
+                self.assertEqual(
+                    self.page(markdown, stream_threshold=0, **options),
+                    self.page(markdown, stream_threshold=None, **options),
+                )
+
+    def test_missing_title(self):
+        with self.assertRaises(ValueError):
+            self.page("no title here", stream_threshold=0)
+
+    def test_peak_memory_is_bounded(self):
+        with open(self.path("page.md"), "w") as file:
+            file.write("# Huge\n\n")
+            for n in range(500):
+                file.write(SECTION.format(n=n))
+                file.write("long paragraph " * 200 + "\n\n")
+        self.assertGreater(os.path.getsize(file.name), 1 << 20)
+        tracemalloc.start()
+        try:
+            self.render(stream_threshold=0)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 256 << 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
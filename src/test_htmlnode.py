@@ -1,4 +1,5 @@
 import unittest
+from io import StringIO
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -25,6 +26,13 @@ class TestHTMLNode(unittest.TestCase):
             ' href="https://www.google.com" target="_blank" class="link"',
         )
 
+    def test_props_resolved_at_serialization(self):
+        node = HTMLNode(props={"href": "/about", "title": "/about"})
+        self.assertEqual(
+            node.props_to_html(lambda url: "/site" + url),
+            ' href="/site/about" title="/about"',
+        )
+
 
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
@@ -57,6 +65,31 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_streams_chunks(self):
+        node = ParentNode(
+            "div",
+            [ParentNode("p", [LeafNode("b", "x"), LeafNode(None, " y")])],
+            props={"class": "c"},
+        )
+        self.assertEqual(
+            list(node.iter_html()),
+            ['<div class="c">', "<p>", "<b>x</b>", " y", "</p>", "</div>"],
+        )
+        out = StringIO()
+        node.write_to(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+
+    def test_deep_tree(self):
+        node = LeafNode("b", "leaf")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 5000 + "<b>leaf</b>"))
+
+    def test_missing_children(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", []).to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
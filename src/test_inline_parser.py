@@ -8,6 +8,7 @@ from inline_parser import (
     split_nodes_link,
     split_nodes_image,
     text_to_textnodes,
+    tokenize,
 )
 
 
@@ -81,6 +82,11 @@ class TestExtractMarkdownImages(unittest.TestCase):
         expected = []  # or raise an error if your function is strict
         self.assertEqual(extract_markdown_images(text), expected)
 
+    def test_many_unclosed_images(self):
+        # Each unmatched "![" stops at the next bracket instead of scanning on.
+        text = "![a " * 20000 + "![b](/b.png)"
+        self.assertEqual(extract_markdown_images(text), [("b", "/b.png")])
+
     def test_mixed_content(self):
         text = """
         # Heading
@@ -483,3 +489,27 @@ class TestTextToTextNodes(unittest.TestCase):
             TextNode("link2", TextType.LINK, "http://link2.com"),
         ]
         self.assertEqual(text_to_textnodes(input_text), expected)
+
+    def test_link_label_keeps_markup(self):
+        self.assertEqual(
+            text_to_textnodes("see [**bold** link](/x) now"),
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("**bold** link", TextType.LINK, "/x"),
+                TextNode(" now", TextType.TEXT),
+            ],
+        )
+
+    def test_code_is_not_split(self):
+        self.assertEqual(
+            text_to_textnodes("`[a](b) and **c**`"),
+            [TextNode("[a](b) and **c**", TextType.CODE)],
+        )
+
+    def test_unclosed_delimiter(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("snake_case")
+        self.assertEqual(
+            tokenize("snake_case", strict=False),
+            [TextNode("snake_case", TextType.TEXT)],
+        )
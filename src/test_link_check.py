@@ -0,0 +1,96 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase
+from link_check import LinkChecker, LinkReport, page_links, scan_links
+
+
+class TestLinkChecker(unittest.TestCase):
+    def setUp(self):
+        self.checker = LinkChecker(
+            "/site/",
+            ["index.html", "blog/index.html", "blog/post.html", "images/a.png"],
+        )
+
+    def test_targets(self):
+        target = self.checker.target
+        self.assertEqual(target("/site/", "blog/post.html"), "index.html")
+        self.assertEqual(target("/site/blog/#top", "index.html"), "blog/index.html")
+        self.assertEqual(target("/site/images/a%20b.png?v=1", ""), "images/a b.png")
+        self.assertEqual(target("../images/a.png", "blog/post.html"), "images/a.png")
+        self.assertEqual(target("./", "blog/post.html"), "blog/index.html")
+        self.assertEqual(target("/elsewhere/", "index.html"), "")
+        self.assertEqual(target("../../x", "blog/post.html"), "")
+        for url in ("https://example.com/", "//cdn.example.com/a.js", "#top"):
+            self.assertIsNone(target(url, "index.html"))
+        self.assertIsNone(target("mailto:someone@example.com", "index.html"))
+
+    def test_broken(self):
+        links = ["/site/blog", "/site/blog/post", "/site/images/a.png", "/site/b.png"]
+        self.assertEqual(self.checker.broken("index.html", links), ["/site/b.png"])
+
+    def test_report(self):
+        report = LinkReport()
+        links = ["/site/", "/site/x"]
+        report.check(self.checker, "index.html", links, "docs/index.html")
+        report.check(self.checker, "blog/post.html", ["../images/a.png"])
+        self.assertEqual(
+            str(report),
+            "Links: 3 checked on 2 page(s), 1 broken\n  docs/index.html: /site/x",
+        )
+
+    def test_scan_links(self):
+        html = ['<a href="/a">x</a>', '<img src="/b.png" alt="b">', "<p>text</p>"]
+        links = set()
+        self.assertEqual(list(scan_links(html, links)), html)
+        self.assertEqual(links, {"/a", "/b.png"})
+        self.assertEqual(page_links("".join(html)), links)
+
+
+class TestLinkCheckBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(
+            "template.html",
+            '<link href="/index.css"><link href="/gone.css">{{ Title }}{{ Content }}',
+        )
+        self.write(
+            "content/index.md",
+            "# Home\n\n[post](/blog/post) ![a](/images/a.png) [x](/missing/)",
+        )
+        self.write("content/blog/post.md", "# Post\n\n[home](/)")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+
+    def builder(self, **kwargs):
+        return self.make_builder("/site/", **kwargs)
+
+    def test_broken_links_reported_per_page(self):
+        for threshold in (None, 0):
+            with self.subTest(stream_threshold=threshold):
+                builder = self.builder(stream_threshold=threshold)
+                self.quietly(builder.build, True)
+                self.assertIn("Links: 6 checked on 3 page(s), 2 broken", self.output)
+                self.assertIn(
+                    f"  {self.path('docs', 'index.html')}: /site/missing/", self.output
+                )
+                self.assertIn(f"  {self.template}: /site/gone.css", self.output)
+
+    def test_skipped_pages_checked_from_recorded_links(self):
+        builder = self.builder()
+        self.quietly(builder.build)
+        post = self.path("content", "blog", "post.md")
+        os.remove(post)
+        self.quietly(builder.rebuild, [post])
+        self.assertNotIn("Generating page", self.output)
+        self.assertIn("/site/blog/post, /site/missing/", self.output)
+
+    def test_disabled(self):
+        builder = self.builder(check_links=False)
+        self.quietly(builder.build)
+        self.assertNotIn("Links:", self.output)
+        self.assertNotIn("links", list(builder.manifest.pages.values())[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from block_parser import BlockType
+from list_parser import ListBlock, parse_list
+from parser import markdown_to_html_node
+
+
+class TestParseList(unittest.TestCase):
+    def test_tight_list(self):
+        block = parse_list(["- one", "- two", "- three"])
+        self.assertEqual(block.list_type, BlockType.UNORDERED_LIST)
+        self.assertFalse(block.loose)
+        self.assertEqual(
+            [item.parts for item in block.items], [[["one"]], [["two"]], [["three"]]]
+        )
+
+    def test_start_offset_and_multi_digit_numbers(self):
+        block = parse_list(["9. nine", "10. ten", "11. eleven"])
+        self.assertTrue(block.ordered)
+        self.assertEqual(block.start, 9)
+        self.assertEqual(len(block.items), 3)
+        self.assertEqual(block.items[2].parts, [["eleven"]])
+
+    def test_nested_lists(self):
+        block = parse_list(["- a", "  1. x", "  2. y", "    - deep", "- b"])
+        self.assertEqual(len(block.items), 2)
+        nested = block.items[0].parts[1]
+        self.assertIsInstance(nested, ListBlock)
+        self.assertTrue(nested.ordered)
+        self.assertEqual(nested.items[1].parts[0], ["y"])
+        self.assertEqual(nested.items[1].parts[1].items[0].parts, [["deep"]])
+
+    def test_continuation_lines_and_paragraphs(self):
+        block = parse_list(["1. first", "   line", "", "   second para", "2. next"])
+        self.assertTrue(block.loose)
+        self.assertEqual(block.items[0].parts, [["first", "line"], ["second para"]])
+
+    def test_not_a_list(self):
+        with self.assertRaises(ValueError):
+            parse_list(["just text"])
+
+
+class TestListHtml(unittest.TestCase):
+    def test_tight_nested_list(self):
+        md = "- a **b**\n- c\n  - d\n  - e\n- f"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ul><li>a <b>b</b></li><li>c<ul><li>d</li><li>e</li></ul></li>"
+            "<li>f</li></ul></div>",
+        )
+
+    def test_ordered_start(self):
+        self.assertEqual(
+            markdown_to_html_node("3. x\n4. y").to_html(),
+            '<div><ol start="3"><li>x</li><li>y</li></ol></div>',
+        )
+
+    def test_loose_list(self):
+        md = "1. a\n\n2. b\n   more\n\n   para\n\nafter"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><ol><li><p>a</p></li><li><p>b more</p><p>para</p></li></ol>"
+            "<p>after</p></div>",
+        )
+
+    def test_dash_inside_item_text(self):
+        self.assertEqual(
+            markdown_to_html_node("- well - mostly\n- done").to_html(),
+            "<div><ul><li>well - mostly</li><li>done</li></ul></div>",
+        )
+
+    def test_empty_items(self):
+        cases = {
+            "# T\n\n- \n\ntext": "<h1> T</h1><ul><li></li></ul><p>text</p>",
+            "- a\n- ": "<ul><li>a</li><li></li></ul>",
+        }
+        for md, html in cases.items():
+            with self.subTest(md=md):
+                self.assertEqual(
+                    markdown_to_html_node(md).to_html(), f"<div>{html}</div>"
+                )
+
+    def test_long_list(self):
+        md = "\n".join(f"{number}. item {number}" for number in range(1, 10001))
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html.count("<li>"), 10000)
+        self.assertIn("<li>item 10000</li></ol>", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from file_handler import sync_dir
+from fixtures import SiteTestCase
+from minifier import HtmlMinifier, MinifyingWriter, minify_css, minify_html
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_collapses_whitespace(self):
+        html = "<html>\n  <head>\n    <title>A   title</title>\n  </head>\n</html>"
+        self.assertEqual(
+            minify_html(html), "<html><head><title>A title</title></head></html>"
+        )
+
+    def test_keeps_single_spaces_between_inline_tags(self):
+        self.assertEqual(
+            minify_html("<p><b>a</b> <i>b</i>\ttext  here</p>"),
+            "<p><b>a</b> <i>b</i> text here</p>",
+        )
+
+    def test_newlines_between_inline_tags_keep_a_space(self):
+        self.assertEqual(
+            minify_html("<p><b>a</b>\n<i>b</i></p>"), "<p><b>a</b> <i>b</i></p>"
+        )
+        self.assertEqual(
+            minify_html("<ul>\n  <li>a <em>b</em>\n  </li>\n</ul>\n"),
+            "<ul><li>a <em>b</em></li></ul>",
+        )
+
+    def test_preserves_pre_content(self):
+        html = (
+            "<div>\n  <pre><code>x  = 1\n\n  if a < b:\n    pass\n</code></pre>\n</div>"
+        )
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>x  = 1\n\n  if a < b:\n    pass\n</code></pre></div>",
+        )
+
+    def test_drops_comments(self):
+        self.assertEqual(
+            minify_html("<p>a<!-- note -->b</p><!--[if IE]>x<![endif]-->"),
+            "<p>ab</p><!--[if IE]>x<![endif]-->",
+        )
+
+    def test_streaming_matches_whole_document(self):
+        html = (
+            "<p>one  two</p>\n<pre>a  b</pre>\n<!-- c -->  <i>x</i>\n"
+            "<span>y</span>\n <b>z</b>\n</div>"
+        )
+        for size in range(1, len(html) + 1):
+            minifier = HtmlMinifier()
+            parts = [
+                minifier.feed(html[i : i + size]) for i in range(0, len(html), size)
+            ]
+            parts.append(minifier.close())
+            self.assertEqual("".join(parts), minify_html(html))
+
+    def test_writer_counts_bytes(self):
+        class Sink:
+            def __init__(self):
+                self.parts = []
+
+            def write(self, text):
+                self.parts.append(text)
+
+        sink = Sink()
+        writer = MinifyingWriter(sink)
+        writer.writelines(["<p>a   ", "b</p>\n", "<p>c</p>"])
+        writer.close()
+        self.assertEqual("".join(sink.parts), "<p>a b</p><p>c</p>")
+        counts = writer.counts()
+        self.assertEqual(counts["minify_input_bytes"], 21)
+        self.assertEqual(counts["minify_output_bytes"], 18)
+
+
+class TestMinifyCss(SiteTestCase):
+    def test_minify_css(self):
+        css = (
+            "/* site */\nbody {\n  margin: 0 auto;\n  font-family: \"A  B\", serif;\n}"
+            "\n\nh1,\nh2 > a {\n  width: calc(1px + 2px);\n}\n"
+        )
+        self.assertEqual(
+            minify_css(css),
+            'body{margin:0 auto;font-family:"A  B",serif}'
+            "h1,h2>a{width:calc(1px + 2px)}",
+        )
+
+    def test_sync_minifies_css_once(self):
+        self.write("static/index.css", "body {\n  margin: 0;\n}\n")
+        self.write("static/logo.png", "png")
+        report = sync_dir(self.static, self.docs, strategy="copy", minify=True)
+        self.assertEqual(report.strategies["minify"], 1)
+        self.assertEqual(report.minify["minify_output_bytes"], 14)
+        self.assertEqual(self.read("docs", "index.css"), "body{margin:0}")
+        self.assertEqual(list(report.minified), ["index.css"])
+        report = self.sync(report, minify=True)
+        self.assertEqual(len(report.unchanged), 2)
+        report = self.sync(report)
+        self.assertEqual(report.updated, ["index.css"])
+        self.assertEqual(report.minified, {})
+
+    def test_already_minified_css_is_not_updated(self):
+        self.write("static/index.css", "body{margin:0}")
+        report = sync_dir(self.static, self.docs, strategy="copy", minify=True)
+        self.assertEqual(report.copied, ["index.css"])
+        report = self.sync(report, minify=True)
+        self.assertEqual((report.updated, report.unchanged), ([], ["index.css"]))
+        report.minified["index.css"] = "made by an older minifier"
+        self.assertEqual(self.sync(report, minify=True).updated, ["index.css"])
+
+    def sync(self, previous, minify=False):
+        return sync_dir(
+            self.static,
+            self.docs,
+            strategy="copy",
+            minify=minify,
+            minified=previous.minified,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import shutil
+import unittest
+
+from fixtures import SiteTestCase
+from generator import RenderOptions
+from page_cache import PageCache
+from stats import BuildStats
+
+
+class TestPageCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = PageCache(self.path("pages"))
+
+    def test_round_trip(self):
+        self.cache.store("content/a.md", "abc", "Title", "<div>body</div>")
+        self.assertEqual(
+            self.cache.load("content/a.md", "abc"), ("Title", "<div>body</div>")
+        )
+        self.assertEqual(self.cache.take_counts()["page_cache_hits"], 1)
+
+    def test_changed_source_misses(self):
+        self.cache.store("content/a.md", "abc", "Title", "<div>body</div>")
+        self.assertIsNone(self.cache.load("content/a.md", "def"))
+        self.assertIsNone(self.cache.load("content/b.md", "abc"))
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_corrupt_entry_misses(self):
+        self.cache.store("content/a.md", "abc", "Title", "body")
+        with open(self.cache.entry_path("content/a.md"), "wb") as file:
+            file.write(b"not a cache entry")
+        cache = PageCache(self.path("pages"))
+        self.assertIsNone(cache.load("content/a.md", "abc"))
+
+    def test_entries_stay_in_memory(self):
+        self.cache.store("content/a.md", "abc", "Title", "body")
+        cache = PageCache(self.path("pages"))
+        self.assertEqual(cache.load("content/a.md", "abc"), ("Title", "body"))
+        shutil.rmtree(self.path("pages"))
+        self.assertEqual(cache.load("content/a.md", "abc"), ("Title", "body"))
+        self.assertIsNone(cache.load("content/a.md", "def"))
+
+    def test_remove(self):
+        self.cache.store("content/a.md", "abc", "Title", "body")
+        self.cache.remove("content/a.md")
+        self.cache.remove("content/a.md")
+        self.assertIsNone(self.cache.load("content/a.md", "abc"))
+
+
+class TestTemplateOnlyRebuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/index.md", "# Home\n\n[link](/about)")
+        self.write("template.html", "{{ Content }}")
+        self.options = RenderOptions(page_cache_dir=self.path("pages"))
+
+    def build(self, base_path="/"):
+        stats = BuildStats()
+        self.generate(base_path, self.options, stats=stats)
+        return stats.counts["page_cache_hits"], self.read("docs", "index.html")
+
+    def test_template_change_reuses_parsed_pages(self):
+        self.assertEqual(self.build()[0], 0)
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        hits, html = self.build()
+        self.assertEqual(hits, 1)
+        self.assertEqual(
+            html,
+            '<h1>Home</h1><div><h1> Home</h1><p><a href="/about">'
+            "link</a></p></div>",
+        )
+
+    def test_base_path_change_reuses_parsed_pages(self):
+        self.assertEqual(self.build()[0], 0)
+        hits, html = self.build("/site/")
+        self.assertEqual(hits, 1)
+        self.assertIn('<a href="/site/about">', html)
+        hits, html = self.build()
+        self.assertEqual(hits, 1)
+        self.assertIn('<a href="/about">', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
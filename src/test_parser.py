@@ -34,3 +34,39 @@ class TestMarkToHtml(unittest.TestCase):
             html,
             "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
         )
+
+    def test_nested_inline(self):
+        md = "A [**bold** link](/x) and **bold _italic_ snake_case**"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><p>A <a href="/x"><b>bold</b> link</a> and '
+            "<b>bold <i>italic</i> snake_case</b></p></div>",
+        )
+
+    def test_nested_empty_spans(self):
+        cases = {
+            "see **``** here": "<p>see <b>``</b> here</p>",
+            "[****](/x)": '<p><a href="/x">****</a></p>',
+            "**____**": "<p><b>____</b></p>",
+            "_``_": "<p><i>``</i></p>",
+        }
+        for md, html in cases.items():
+            with self.subTest(md=md):
+                self.assertEqual(
+                    markdown_to_html_node(md).to_html(), f"<div>{html}</div>"
+                )
+
+    def test_blank_markdown(self):
+        for md in ("", "  \n\n \n"):
+            with self.subTest(md=md):
+                self.assertEqual(
+                    markdown_to_html_node(md).to_html(), "<div><p></p></div>"
+                )
+
+    def test_codeblock_with_blank_lines(self):
+        md = "```\nline one\n\nline **two**\n```\n\nafter"
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><pre><code>\nline one\n\nline **two**\n</code></pre>"
+            "<p>after</p></div>",
+        )
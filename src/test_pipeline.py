@@ -0,0 +1,84 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import Pipeline
+from stats import BuildStats
+
+
+def read(item):
+    if item == "unreadable":
+        raise OSError("cannot read")
+    return item.upper()
+
+
+def render(item, data):
+    if item == "broken":
+        raise ValueError("cannot render")
+    return f"<{data}>"
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.written = {}
+        self.lock = threading.Lock()
+
+    def write(self, item, value):
+        if item == "readonly":
+            raise PermissionError("cannot write")
+        with self.lock:
+            self.written[item] = value
+
+    def run_pipeline(self, items, **kwargs):
+        pipeline = Pipeline(read, render, self.write, **kwargs)
+        results = sorted(pipeline.run(items))
+        return pipeline, results
+
+    def test_every_item_passes_through_every_stage(self):
+        items = [f"page{n}" for n in range(50)]
+        pipeline, results = self.run_pipeline(items, depth=4)
+        self.assertEqual([index for index, _, _ in results], list(range(50)))
+        self.assertEqual(self.written, {item: f"<{item.upper()}>" for item in items})
+        counts = pipeline.counts()
+        self.assertLessEqual(counts["pipeline_render_queue_max"], 4)
+        self.assertLessEqual(counts["pipeline_write_queue_max"], 4)
+        self.assertEqual(counts["pipeline_render_queue_samples"], 50)
+
+    def test_errors_are_reported_per_item(self):
+        items = ["a", "unreadable", "broken", "readonly", "b"]
+        for executor in (None, ThreadPoolExecutor(2)):
+            with self.subTest(executor=executor):
+                _, results = self.run_pipeline(
+                    items, executor=executor, render_workers=2
+                )
+                errors = {items[index]: error for index, error, _ in results}
+                self.assertEqual(
+                    errors,
+                    {
+                        "a": None,
+                        "unreadable": "OSError: cannot read",
+                        "broken": "ValueError: cannot render",
+                        "readonly": "PermissionError: cannot write",
+                        "b": None,
+                    },
+                )
+                self.assertEqual(results[3][2], "<READONLY>")
+                if executor is not None:
+                    executor.shutdown()
+
+    def test_stats_report_utilization(self):
+        pipeline, _ = self.run_pipeline(["a", "b"])
+        stats = BuildStats()
+        stats.add(pipeline.counts())
+        stats.add(pipeline.counts())
+        self.assertEqual(stats.counts["pipeline_render_queue_samples"], 4)
+        self.assertLessEqual(stats.counts["pipeline_render_queue_max"], 2)
+        self.assertTrue(stats.lines()[0].startswith("Pipeline: read "))
+
+    def test_empty(self):
+        pipeline, results = self.run_pipeline([])
+        self.assertEqual(results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
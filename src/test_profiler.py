@@ -0,0 +1,78 @@
+import csv
+import json
+import tracemalloc
+import unittest
+
+from fixtures import SiteTestCase
+from generator import RenderOptions, generate_page
+from profiler import PHASES, BuildProfile, PageProfile
+
+
+class TestBuildProfile(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile = BuildProfile()
+        for name, seconds in (("a.md", 0.2), ("b.md", 0.5), ("c.md", 0.1)):
+            page = PageProfile(name)
+            page.seconds["inline"] = seconds
+            page.seconds["write"] = seconds / 2
+            self.profile.add(page.to_dict())
+        self.profile.finish()
+
+    def test_totals_and_slowest(self):
+        totals = self.profile.totals()
+        self.assertAlmostEqual(totals["inline"]["seconds"], 0.8)
+        self.assertAlmostEqual(totals["inline"]["share"], 2 / 3)
+        self.assertEqual(
+            [record["page"] for record in self.profile.slowest(2)], ["b.md", "a.md"]
+        )
+
+    def test_write_json_and_csv(self):
+        json_path = self.path("report.json")
+        csv_path = self.path("report.csv")
+        self.profile.write(json_path)
+        self.profile.write(csv_path)
+        with open(json_path) as file:
+            report = json.load(file)
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual(set(report["phases"]), set(PHASES))
+        with open(csv_path) as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([row["page"] for row in rows], ["b.md", "a.md", "c.md"])
+
+    def test_generate_page_records_every_phase(self):
+        src = self.write("index.md", "# Title here\n\nSome **bold** text")
+        record = generate_page(
+            "/",
+            src,
+            "template.html",
+            self.path("index.html"),
+            options=RenderOptions(quiet=True, profile=True),
+        )
+        self.assertEqual(record["page"], src)
+        self.assertTrue(all(record["seconds"][name] > 0 for name in PHASES))
+        self.assertNotIn("peak_bytes", record)
+        self.assertEqual(set(record["live_blocks"]), set(PHASES))
+
+    def test_trace_memory(self):
+        self.addCleanup(tracemalloc.stop)
+        text = "# Title here\n\n" + "Some **bold** text\n\n" * 200
+        src = self.write("index.md", text)
+        record = generate_page(
+            "/",
+            src,
+            "template.html",
+            self.path("index.html"),
+            options=RenderOptions(quiet=True, profile=True, trace_memory=True),
+        )
+        self.assertEqual(set(record["peak_bytes"]), set(PHASES))
+        self.assertGreater(record["peak_bytes"]["serialize"], 0)
+        profile = BuildProfile()
+        profile.add(record)
+        profile.finish()
+        self.assertIn("peak_bytes", profile.totals()["serialize"])
+        self.assertIn("peak bytes", str(profile))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import os
+import unittest
+
+from fixtures import SiteTestCase
+from generator import RenderOptions
+from search_index import (
+    PAGES_FILE,
+    SEARCH_DIR,
+    SearchIndex,
+    delta_decode,
+    delta_encode,
+    page_terms,
+    shard_name,
+    shard_of,
+    update_search_index,
+)
+
+
+def identity(url):
+    return url
+
+
+class TestTerms(unittest.TestCase):
+    def test_page_terms(self):
+        title, terms = page_terms(
+            "---\ntags: hidden\n---\n# The Title\n\n"
+            "Some **bold** text with a [link label](https://example.com/path).\n\n"
+            "```\ncodeword\n```\n\n- listed item\n"
+        )
+        self.assertEqual(title, "The Title")
+        self.assertEqual(
+            " ".join(terms), "bold item label link listed some text the title with"
+        )
+
+    def test_delta_round_trip(self):
+        ids = [3, 4, 10, 200]
+        self.assertEqual(delta_encode(ids), [3, 1, 6, 190])
+        self.assertEqual(delta_decode(delta_encode(ids)), ids)
+        self.assertEqual(delta_encode([]), [])
+
+    def test_shard_of(self):
+        # 32-bit FNV-1a, as a browser would compute it.
+        self.assertEqual(shard_of("a"), 0xE40C292C % 64)
+        self.assertEqual(shard_name(10), "0a.json")
+
+
+class TestSearchIndex(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = self.path("search.bin")
+
+    def update(self, pages, force=False):
+        index = SearchIndex.load(self.cache)
+        return update_search_index(index, pages, self.docs, identity, force)
+
+    def read_json(self, name):
+        with open(os.path.join(self.docs, SEARCH_DIR, name)) as file:
+            return json.load(file)
+
+    def postings(self, term):
+        return delta_decode(self.read_json(shard_name(shard_of(term)))[term])
+
+    def test_incremental_updates(self):
+        a = self.write("a.md", "# A\n\nshared alpha")
+        b = self.write("b.md", "# B\n\nshared beta")
+        report = self.update({a: ("1", "/a.html"), b: ("1", "/b.html")})
+        self.assertEqual(report.indexed, 2)
+        self.assertEqual(len(report.shards), 65)
+        self.assertEqual(
+            self.read_json(PAGES_FILE),
+            {"shards": 64, "pages": [["/a.html", "A"], ["/b.html", "B"]]},
+        )
+        self.assertEqual(self.postings("shared"), [0, 1])
+
+        report = self.update({a: ("1", "/a.html"), b: ("1", "/b.html")})
+        self.assertEqual((report.indexed, report.shards), (0, []))
+
+        self.write("b.md", "# B\n\nshared gamma")
+        report = self.update({a: ("1", "/a.html"), b: ("2", "/b.html")})
+        self.assertEqual(report.indexed, 1)
+        changed = {shard_name(shard_of(term)) for term in ("beta", "gamma")}
+        self.assertEqual(set(report.shards), changed | {PAGES_FILE})
+        self.assertNotIn("beta", self.read_json(shard_name(shard_of("beta"))))
+        self.assertEqual(self.postings("gamma"), [1])
+
+    def test_removed_page_ids_are_reused(self):
+        a = self.write("a.md", "# A\n\nshared")
+        b = self.write("b.md", "# B\n\nshared")
+        c = self.write("c.md", "# C\n\nshared")
+        self.update({a: ("1", "/a.html"), b: ("1", "/b.html")})
+        report = self.update({b: ("1", "/b.html")})
+        self.assertEqual(report.removed, 1)
+        self.assertEqual(self.read_json(PAGES_FILE)["pages"], [None, ["/b.html", "B"]])
+        self.update({b: ("1", "/b.html"), c: ("1", "/c.html")})
+        self.assertEqual(self.read_json(PAGES_FILE)["pages"][0], ["/c.html", "C"])
+        self.assertEqual(self.postings("shared"), [0, 1])
+
+
+class TestSearchBuild(SiteTestCase):
+    def test_build_writes_index_with_resolved_urls(self):
+        self.write("template.html", "{{ Title }}{{ Content }}")
+        self.write("content/index.md", "# Home\n\nwelcome")
+        options = RenderOptions(search_cache=self.path("search.bin"))
+        self.generate("/site/", options)
+        self.assertIn("1 indexed", self.output)
+        with open(self.path("docs", SEARCH_DIR, PAGES_FILE)) as file:
+            self.assertEqual(json.load(file)["pages"], [["/site/", "Home"]])
+        self.generate("/site/", options)
+        self.assertIn("0 indexed, 0 removed, 0 files", self.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
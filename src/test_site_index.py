@@ -0,0 +1,226 @@
+import os
+import tempfile
+import unittest
+
+from fixtures import SiteTestCase
+from generator import RenderOptions
+from manifest import Manifest
+from site_index import (
+    PAGE_SIZE,
+    PageMeta,
+    SiteIndex,
+    listing_pages,
+    page_url,
+    read_meta,
+    rss_feed,
+    split_front_matter,
+    strip_front_matter,
+)
+
+POST = """---
+date: {date}
+tags: [{tags}]
+summary: {summary}
+---
+# {title}
+
+Body of {title}.
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        fields, body = split_front_matter("---\ndate: 2024-01-02\n---\n# Title\n")
+        self.assertEqual(fields, {"date": "2024-01-02"})
+        self.assertEqual(body, "# Title\n")
+        self.assertEqual(split_front_matter("# Title\n---\n"), ({}, "# Title\n---\n"))
+
+    def test_strip_lines(self):
+        lines = ["---\n", "tags: a\n", "---\n", "# Title\n", "---\n"]
+        self.assertEqual(list(strip_front_matter(lines)), ["# Title\n", "---\n"])
+        self.assertEqual(list(strip_front_matter(["# Title\n"])), ["# Title\n"])
+
+    def test_invalid_date(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".md") as file:
+            file.write("---\ndate: yesterday\n---\n# Title\n")
+            file.flush()
+            with self.assertRaises(ValueError):
+                read_meta(file.name, "/x/")
+
+
+class TestSiteIndex(unittest.TestCase):
+    def test_read_meta(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".md") as file:
+            file.write(
+                POST.format(
+                    date="2024-03-01", tags="a, b c", summary="Short.", title="A post"
+                )
+            )
+            file.flush()
+            meta = read_meta(file.name, "/blog/a/")
+        self.assertEqual(
+            meta, PageMeta("/blog/a/", "A post", "2024-03-01", ["a", "b c"], "Short.")
+        )
+
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs"), "/")
+        self.assertEqual(page_url("docs/blog/a/index.html", "docs"), "/blog/a/")
+        self.assertEqual(page_url("docs/about.html", "docs"), "/about.html")
+
+    def test_posts_newest_first(self):
+        index = SiteIndex(
+            {
+                "a": PageMeta("/blog/a/", "A", "2024-01-01"),
+                "b": PageMeta("/blog/b/", "B"),
+                "c": PageMeta("/blog/c/", "C", "2024-02-01"),
+                "home": PageMeta("/", "Home", "2025-01-01"),
+            }
+        )
+        self.assertEqual([post.title for post in index.posts()], ["C", "A", "B"])
+
+    def test_pagination_and_tags(self):
+        index = SiteIndex(
+            {
+                str(n): PageMeta(f"/blog/{n}/", f"Post {n}", f"2024-01-{n + 1:02}")
+                for n in range(PAGE_SIZE * 2 + 1)
+            }
+        )
+        for page in index.pages.values():
+            page.tags.append("x")
+        urls = [url for url, _, _ in listing_pages(index)]
+        self.assertEqual(
+            urls,
+            [
+                "/blog/",
+                "/blog/page/2/",
+                "/blog/page/3/",
+                "/tags/",
+                "/tags/x/",
+                "/tags/x/page/2/",
+                "/tags/x/page/3/",
+            ],
+        )
+        _, title, body = list(listing_pages(index))[1]
+        self.assertEqual(title, "Blog (page 2)")
+        self.assertIn(
+            '<p><a href="/blog/">Newer posts</a> '
+            '<a href="/blog/page/3/">Older posts</a></p>',
+            body.to_html(),
+        )
+
+    def test_fields_are_not_parsed(self):
+        post = PageMeta("/blog/a/", "A [b] *c", "2024-01-02", ["<x>"], "my_var `")
+        index = SiteIndex({"a": post})
+        html = {url: body.to_html() for url, _, body in listing_pages(index)}
+        self.assertIn(
+            '<li><a href="/blog/a/">A [b] *c</a> (2024-01-02) my_var `</li>',
+            html["/blog/"],
+        )
+        self.assertIn('<a href="/tags/x/">&lt;x&gt;</a> (1)', html["/tags/"])
+
+    def test_feed(self):
+        posts = [PageMeta("/blog/a/", "A & B", "2024-01-02", ["t"], "Sum")]
+        feed = rss_feed(posts, "Blog", lambda url: "https://x.org" + url)
+        self.assertIn("<title>A &amp; B</title>", feed)
+        self.assertIn("<link>https://x.org/blog/a/</link>", feed)
+        self.assertIn("<pubDate>Tue, 02 Jan 2024 00:00:00 +0000</pubDate>", feed)
+        self.assertIn("<category>t</category>", feed)
+
+
+class TestListingBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home\n\nhello")
+        self.post("one", "2024-01-01", "news", "First")
+        self.post("two", "2024-02-01", "news, misc", "Second")
+
+    def post(self, name, date, tags, title, summary="About it."):
+        self.write(
+            f"content/blog/{name}.md",
+            POST.format(date=date, tags=tags, summary=summary, title=title),
+        )
+
+    def read(self, *path):
+        return super().read("docs", *path)
+
+    def build(self, site_url="https://x.org"):
+        self.generate("/site/", RenderOptions(site_url=site_url))
+        return self.output
+
+    def test_listings_and_feed(self):
+        self.build()
+        self.assertEqual(
+            self.read("blog", "index.html"),
+            "<title>Blog</title><div><h1>Blog</h1><ul>"
+            '<li><a href="/site/blog/two.html">Second</a> (2024-02-01) About it.</li>'
+            '<li><a href="/site/blog/one.html">First</a> (2024-01-01) About it.</li>'
+            "</ul></div>",
+        )
+        self.assertIn("Second", self.read("tags", "misc", "index.html"))
+        self.assertNotIn("First", self.read("tags", "misc", "index.html"))
+        self.assertIn('href="/site/tags/news/"', self.read("tags", "index.html"))
+        self.assertIn(
+            "<link>https://x.org/site/blog/one.html</link>", self.read("feed.xml")
+        )
+        # Front matter is not rendered into the post itself.
+        self.assertEqual(
+            self.read("blog", "one.html"),
+            "<title>First</title><div><h1> First</h1><p>Body of First.</p></div>",
+        )
+
+    def test_no_feed_without_site_url(self):
+        self.build()
+        output = self.build(site_url="")
+        self.assertIn("Skipping feed.xml", output)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "feed.xml")))
+        self.assertIn("Second", self.read("blog", "index.html"))
+
+    def test_only_changed_listings_rewritten(self):
+        self.build()
+        self.assertNotIn("listing", self.build())
+        self.post("one", "2024-01-01", "news", "First", summary="Changed.")
+        output = self.build()
+        self.assertIn("Generated 3 listing page(s)", output)
+        self.assertIn("Changed.", self.read("blog", "index.html"))
+        self.assertIn("Changed.", self.read("feed.xml"))
+
+    def test_summary_markup_is_kept_as_text(self):
+        self.post(
+            "one", "2024-01-01", "a&b", "First [draft]", summary="all about my_var"
+        )
+        output = self.build()
+        self.assertNotIn("Failed", output)
+        self.assertIn(
+            '<a href="/site/blog/one.html">First [draft]</a> (2024-01-01) '
+            "all about my_var</li>",
+            self.read("blog", "index.html"),
+        )
+        self.assertIn(
+            "<title>Tagged a&amp;b</title>", self.read("tags", "a-b", "index.html")
+        )
+
+    def test_failed_listing_does_not_fail_the_build(self):
+        os.makedirs(os.path.join(self.docs, "feed.xml"))
+        feed = self.path("docs", "feed.xml")
+        self.assertIn(f"Failed to generate {feed}", self.build())
+        self.assertIn("Second", self.read("blog", "index.html"))
+        self.assertNotIn(feed, Manifest.load(self.manifest_path).listings)
+        os.rmdir(feed)
+        self.assertIn("Generated 1 listing page(s)", self.build())
+
+    def test_removed_tag_pages_pruned(self):
+        self.build()
+        self.post("two", "2024-02-01", "news", "Second")
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "tags", "misc")))
+        os.remove(os.path.join(self.content, "blog", "one.md"))
+        os.remove(os.path.join(self.content, "blog", "two.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "feed.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "tags")))
+        self.assertEqual(Manifest.load(self.manifest_path).listings, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from io import StringIO
+
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_segments_and_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{Content}}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.segments, ["<title>", "</title><main>", "</main>"])
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}<p>{{ Title }}</p>")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<b>x</b>"),
+            "<h1>Hi</h1><b>x</b><p>Hi</p>",
+        )
+
+    def test_extra_placeholders(self):
+        template = Template("{{ Title }} by {{ Author }}")
+        self.assertEqual(template.render(Title="T", Author="A"), "T by A")
+
+    def test_missing_slot(self):
+        template = Template("{{ Title }}{{ Content }}")
+        with self.assertRaises(ValueError):
+            template.render(Title="only title")
+
+    def test_base_path_applied_at_compile_time(self):
+        template = Template(
+            '<link href="/index.css" /><img src="/a.png" />{{ Content }}',
+            base_path="/site/",
+        )
+        self.assertEqual(
+            template.render(Content='<a href="/x">x</a>'),
+            '<link href="/site/index.css" /><img src="/site/a.png" /><a href="/x">x</a>',
+        )
+
+    def test_write_to_streams_iterables(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        out = StringIO()
+        template.write_to(out, Title="T", Content=iter(["<p>", "a", "</p>"]))
+        self.assertEqual(out.getvalue(), "<title>T</title><p>a</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
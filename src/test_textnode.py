@@ -1,6 +1,7 @@
 import unittest
 
 from textnode import TextNode, TextType, text_node_to_html_node
+from urls import UrlResolver
 
 
 class TestTextNode(unittest.TestCase):
@@ -43,6 +44,11 @@ class TestTextToHTML(unittest.TestCase):
         self.assertEqual(html_node.tag, None)
         self.assertEqual(html_node.value, "This is a text node")
 
+    def test_link_resolved_eagerly(self):
+        node = TextNode("docs", TextType.LINK, "/docs/")
+        html_node = text_node_to_html_node(node, UrlResolver("/site/"))
+        self.assertEqual(html_node.to_html(), '<a href="/site/docs/">docs</a>')
+
 
 if __name__ == "__main__":
     unittest.main()
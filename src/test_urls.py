@@ -0,0 +1,62 @@
+import unittest
+
+from block_cache import BlockCache
+from parser import markdown_to_html_node
+from urls import URL_MARK, UrlResolver, mark_url, resolve_marked
+
+
+class TestUrlResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolve = UrlResolver("/site/", {"index.css": "index.abc.css"})
+
+    def test_root_urls(self):
+        self.assertEqual(self.resolve("/blog/"), "/site/blog/")
+        self.assertEqual(self.resolve("/index.css?v=2#x"), "/site/index.abc.css?v=2#x")
+
+    def test_other_urls_unchanged(self):
+        for url in ("//cdn.example.com/a.js", "https://example.com/", "a.png", "#top"):
+            self.assertEqual(self.resolve(url), url)
+
+    def test_marked_urls(self):
+        html = f'<a href="{mark_url("/index.css")}">{mark_url("x")}</a>'
+        self.assertEqual(
+            resolve_marked(html, self.resolve),
+            '<a href="/site/index.abc.css">x</a>',
+        )
+        self.assertEqual(resolve_marked(html, None), '<a href="/index.css">x</a>')
+        self.assertEqual(resolve_marked(html, mark_url), html)
+
+
+class TestRenderTimeResolving(unittest.TestCase):
+    def test_code_is_not_rewritten(self):
+        markdown = '[a](/a) `href="/b"`\n\n```\n<a href="/c">\n```'
+        html = markdown_to_html_node(markdown).to_html(UrlResolver("/site/"))
+        self.assertIn('<a href="/site/a">a</a>', html)
+        self.assertIn('href="/b"', html)
+        self.assertIn('href="/c"', html)
+        self.assertNotIn("/site/b", html)
+        self.assertNotIn("/site/c", html)
+
+    def test_cached_blocks_are_resolved_on_use(self):
+        cache = BlockCache()
+        markdown = '[a](/a)\n\n`href="/b"`'
+        for base_path in ("/", "/site/", "/"):
+            resolve = UrlResolver(base_path)
+            html = markdown_to_html_node(markdown, cache=cache, resolve=resolve)
+            html = html.to_html(resolve)
+            self.assertIn(f'href="{base_path}a"', html)
+            self.assertIn('<code>href="/b"</code>', html)
+            self.assertNotIn(URL_MARK, html)
+        self.assertEqual(cache.take_counts()["cache_hits"], 4)
+
+    def test_marks_in_markdown_bypass_the_cache(self):
+        cache = BlockCache()
+        markdown = f"[a](/a{URL_MARK})"
+        resolve = UrlResolver("/site/")
+        html = markdown_to_html_node(markdown, cache=cache, resolve=resolve)
+        self.assertIn(f'href="/site/a{URL_MARK}"', html.to_html(resolve))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase
+from watcher import InotifyWatcher, PollingWatcher
+
+
+class WatcherTestMixin:
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.path("content", "blog"))
+        self.write("template.html", "template")
+        self.write("content/index.md", "# Home")
+        self.watcher = self.create([self.content, self.template])
+        self.addCleanup(self.watcher.close)
+
+    def test_reports_created_modified_and_deleted(self):
+        new_post = os.path.join(self.content, "blog", "post.md")
+        self.write(new_post, "# Post")
+        self.write(os.path.join(self.content, "index.md"), "# Home changed")
+        self.write(self.template, "template changed")
+        self.assertEqual(
+            self.collect(),
+            {new_post, os.path.join(self.content, "index.md"), self.template},
+        )
+        os.remove(new_post)
+        self.assertEqual(self.collect(), {new_post})
+
+    def test_ignores_unwatched_siblings(self):
+        self.write(self.path("other.txt"), "noise")
+        self.assertEqual(self.collect(), set())
+
+    def test_new_directories_are_watched(self):
+        os.makedirs(os.path.join(self.content, "new"))
+        self.collect()
+        post = os.path.join(self.content, "new", "post.md")
+        self.write(post, "# New")
+        self.assertIn(post, self.collect())
+
+
+class TestPollingWatcher(WatcherTestMixin, SiteTestCase):
+    def create(self, paths):
+        return PollingWatcher(paths, debounce=0.01, interval=0.01)
+
+    def collect(self):
+        return self.watcher.poll()
+
+
+class TestInotifyWatcher(WatcherTestMixin, SiteTestCase):
+    def create(self, paths):
+        try:
+            return InotifyWatcher(paths, debounce=0.01)
+        except OSError as e:
+            self.skipTest(f"inotify unavailable: {e}")
+
+    def collect(self):
+        changed = set()
+        while more := self.watcher.wait(0.05):
+            changed |= more
+        return changed
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Optional
 
-from htmlnode import LeafNode
+from htmlnode import LeafNode, Resolver
 
 
 class TextType(Enum):
@@ -14,6 +14,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None) -> None:
         self.text: str = text
         self.text_type: TextType = text_type
@@ -30,7 +32,12 @@ class TextNode:
         return f"TextNode({self.text},{self.text_type},{self.url})"
 
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def text_node_to_html_node(
+    text_node: TextNode, resolve: Optional[Resolver] = None
+) -> LeafNode:
+    # With `resolve` the URL is resolved now, and the node must then be
+    # serialized without one; otherwise resolving is left to serialization.
+    url = resolve(text_node.url) if resolve and text_node.url else text_node.url
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(value=text_node.text)
@@ -41,10 +48,8 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
         case TextType.CODE:
             return LeafNode(tag="code", value=text_node.text)
         case TextType.LINK:
-            return LeafNode(
-                tag="a", value=text_node.text, props={"href": text_node.url}
-            )
+            return LeafNode(tag="a", value=text_node.text, props={"href": url})
         case TextType.IMAGE:
             return LeafNode(
-                tag="img", value="", props={"src": text_node.url, "alt": text_node.text}
+                tag="img", value="", props={"src": url, "alt": text_node.text}
             )
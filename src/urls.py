@@ -0,0 +1,50 @@
+import re
+from typing import Callable, Dict, Optional
+
+URL_ATTRIBUTE = re.compile(r'\b(href|src)="([^"]*)"')
+ROOT_URL = re.compile(r"/([^?#]*)(.*)", re.S)
+# Brackets the URLs of HTML that is cached before it is resolved (a private
+# use character, so it does not turn up in markdown by accident).
+URL_MARK = "\ue000"
+
+
+class UrlResolver:
+    # Maps root-relative URLs onto the site: prefixes base_path and swaps in
+    # the fingerprinted name of static assets. Other URLs are left alone.
+    def __init__(
+        self, base_path: str = "/", assets: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.base_path: str = base_path
+        self.assets: Dict[str, str] = assets or {}
+
+    def __call__(self, url: str) -> str:
+        if url.startswith("//"):
+            return url
+        match = ROOT_URL.fullmatch(url)
+        if match is None:
+            return url
+        path, rest = match.groups()
+        return f"{self.base_path}{self.assets.get(path, path)}{rest}"
+
+    def resolve_html(self, html: str) -> str:
+        return URL_ATTRIBUTE.sub(
+            lambda match: f'{match.group(1)}="{self(match.group(2))}"', html
+        )
+
+    def __repr__(self) -> str:
+        return f"UrlResolver(base_path={self.base_path}, assets={len(self.assets)})"
+
+
+def mark_url(url: str) -> str:
+    # A resolver that leaves the URL to resolve_marked(), so the HTML it is
+    # serialized into can be cached whatever the base path and asset names.
+    return f"{URL_MARK}{url}{URL_MARK}"
+
+
+def resolve_marked(html: str, resolve: Optional[Callable[[str], str]]) -> str:
+    if URL_MARK not in html:
+        return html
+    parts = html.split(URL_MARK)
+    if resolve is not None:
+        parts[1::2] = [resolve(url) for url in parts[1::2]]
+    return "".join(parts)
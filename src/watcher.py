@@ -0,0 +1,194 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher:
+    def __init__(self, paths: Iterable[str], debounce: float = 0.1) -> None:
+        self.paths = list(paths)
+        self.debounce: float = debounce
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        raise NotImplementedError
+
+    def changes(self) -> Iterator[Set[str]]:
+        while True:
+            changed = self.wait(None)
+            if not changed:
+                continue
+            # Keep collecting until the burst has been quiet for `debounce`.
+            while more := self.wait(self.debounce):
+                changed |= more
+            yield changed
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PollingWatcher(Watcher):
+    def __init__(
+        self, paths: Iterable[str], debounce: float = 0.1, interval: float = 0.5
+    ) -> None:
+        super().__init__(paths, debounce)
+        self.interval: float = interval
+        self.snapshot: Dict[str, Tuple[int, int]] = self.scan()
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        stack = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                stack.append(path)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Set[str]:
+        snapshot = self.scan()
+        changed = {
+            path
+            for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval
+            if deadline is not None:
+                remaining = min(remaining, max(0.0, deadline - time.monotonic()))
+            time.sleep(remaining)
+            changed = self.poll()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+class InotifyWatcher(Watcher):
+    def __init__(self, paths: Iterable[str], debounce: float = 0.1) -> None:
+        super().__init__(paths, debounce)
+        library = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd: int = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+        # Files are watched through their parent directory so editors that
+        # save by renaming a temporary file are still seen.
+        self.files: Dict[str, Set[str]] = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                self.add_tree(path)
+            else:
+                parent = os.path.dirname(path) or "."
+                self.files.setdefault(parent, set()).add(os.path.basename(path))
+                self.add_dir(parent)
+
+    def add_dir(self, path: str) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed", path)
+        self.dirs[wd] = path
+
+    def add_tree(self, root: str) -> None:
+        for dir_path, _, _ in os.walk(root):
+            self.add_dir(dir_path)
+
+    def read_events(self) -> Set[str]:
+        changed = set()
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.dirs[wd]
+                continue
+            if not name:
+                continue
+            wanted = self.files.get(directory)
+            if wanted is not None and name not in wanted:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_tree(path)
+            changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        return self.read_events()
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(
+    paths: Iterable[str], debounce: float = 0.1, polling: bool = False
+) -> Watcher:
+    paths = list(paths)
+    if not polling:
+        try:
+            return InotifyWatcher(paths, debounce)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths, debounce)